@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Rule Engine Scaling Benchmark
+
+Measures the per-incident cost of evaluating the fallback rule set as the
+number of rules grows. With the compiled Aho-Corasick matcher the cost should
+stay roughly flat, driven by the incident text length rather than rule count.
+
+Usage:
+    python benchmarks/bench_rule_engine.py [--rules 10,100,500,2000]
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda', 'incident-handler'))
+
+from rule_engine import RuleEngine  # noqa: E402
+
+REGIONS = ['us-east-1', 'us-west-2', 'eu-west-1', 'ap-southeast-2']
+
+INCIDENT = {
+    'alarm_name': 'prod-checkout-api-HighCPUUtilization',
+    'reason': (
+        'Threshold Crossed: 3 out of the last 3 datapoints [92.4 (19/10/26 10:03:00), '
+        '95.1 (19/10/26 10:02:00), 91.7 (19/10/26 10:01:00)] were greater than the threshold (80.0).'
+    ),
+    'region': 'us-east-1',
+    'logs': [
+        'ERROR 2026-10-19T10:02:58Z checkout-api worker-3 request timed out after 30000ms',
+        'ERROR 2026-10-19T10:02:59Z checkout-api pool exhausted, 64/64 connections in use',
+        'WARN 2026-10-19T10:03:00Z checkout-api GC pause 1840ms',
+    ] * 4,
+}
+
+
+def synthetic_rules(count: int, seed: int = 7) -> list:
+    """Generate a rule set of the given size with random keyword conditions."""
+    rng = random.Random(seed)
+    rules = []
+    for i in range(count):
+        match = {}
+        for field in rng.sample(['name', 'reason', 'logs'], rng.randint(1, 2)):
+            match[field] = [
+                ''.join(rng.choices(string.ascii_uppercase, k=rng.randint(4, 10)))
+                for _ in range(rng.randint(1, 3))
+            ]
+        if rng.random() < 0.2:
+            match['region'] = [rng.choice(REGIONS)]
+        rules.append({
+            'id': f'rule-{i}',
+            'priority': rng.randint(1, 1000),
+            'match': match,
+            'action': f'action_{i}',
+        })
+
+    # Keep the real-world matches in play so every run resolves a winner
+    rules.append({'id': 'cpu-high', 'priority': 200, 'match': {'name': ['CPU']}, 'action': 'cpu_high_detected'})
+    rules.append({'id': 'default', 'priority': 0, 'action': 'generic_alarm'})
+    return rules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark fallback rule evaluation')
+    parser.add_argument('--rules', default='10,100,500,2000', help='Comma separated rule counts')
+    parser.add_argument('--number', type=int, default=2000, help='Evaluations per timing run')
+    args = parser.parse_args()
+
+    print(f"{'rules':>8} {'compile ms':>12} {'eval us':>10}  winner")
+    for count in (int(n) for n in args.rules.split(',')):
+        rules = synthetic_rules(count)
+
+        compile_s = min(timeit.repeat(lambda: RuleEngine(rules), number=1, repeat=3))
+        engine = RuleEngine(rules)
+
+        def evaluate():
+            return engine.evaluate(
+                INCIDENT['alarm_name'],
+                reason=INCIDENT['reason'],
+                region=INCIDENT['region'],
+                logs=INCIDENT['logs']
+            )
+
+        eval_s = min(timeit.repeat(evaluate, number=args.number, repeat=5)) / args.number
+        print(f"{count:>8} {compile_s * 1000:>12.2f} {eval_s * 1e6:>10.1f}  {evaluate().id}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Similarity Index Query Benchmark
+
+Builds a synthetic index of past incidents, memory-maps it the way the
+incident handler does and times top-k queries. The target is under 10 ms per
+query at 100k incidents.
+
+Usage:
+    python benchmarks/bench_similarity_index.py [--incidents 100000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda', 'incident-handler'))
+
+from similarity_index import (  # noqa: E402
+    DEFAULT_DIMENSIONS, SimilarityIndex, hash_features, incident_text, normalize_rows
+)
+
+SERVICES = ['checkout', 'payments', 'search', 'auth', 'inventory', 'orders', 'email', 'reports']
+METRICS = ['HighCPU', 'HighMemory', 'DiskSpaceLow', 'Latency', '5xxErrors', 'QueueDepth', 'Throttles']
+REASON = 'Threshold Crossed: 3 out of the last 3 datapoints were greater than the threshold ({})'
+
+
+def build_synthetic_index(count: int, dimensions: int, directory: str) -> None:
+    rng = random.Random(11)
+    # Distinct alarm texts are few; vectorise each once and sample rows from them
+    templates = [
+        incident_text(f'prod-{service}-{metric}', REASON.format(threshold))
+        for service in SERVICES for metric in METRICS for threshold in (70, 80, 90)
+    ]
+    template_vectors = np.stack([hash_features(text, dimensions) for text in templates])
+    rows = np.array([rng.randrange(len(templates)) for _ in range(count)])
+
+    idf = np.ones(dimensions, dtype=np.float32)
+    noise = np.random.default_rng(11).normal(0, 0.05, (count, dimensions)).astype(np.float32)
+    np.save(os.path.join(directory, 'vectors.npy'), normalize_rows(template_vectors[rows] + noise))
+    np.save(os.path.join(directory, 'idf.npy'), idf)
+
+    meta = [
+        {'incidentId': f'{i:016x}', 'alarmName': templates[r].split(' ')[0], 'completedAt': '', 'resolvedAt': '',
+         'action': 'cpu_high_detected', 'recommendation': ''}
+        for i, r in enumerate(rows)
+    ]
+    with open(os.path.join(directory, 'meta.json'), 'w') as f:
+        json.dump(meta, f, separators=(',', ':'))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark similar-incident queries')
+    parser.add_argument('--incidents', type=int, default=100000, help='Incidents in the index')
+    parser.add_argument('--dimensions', type=int, default=DEFAULT_DIMENSIONS, help='Hash buckets per vector')
+    parser.add_argument('--number', type=int, default=50, help='Queries per timing run')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        build_synthetic_index(args.incidents, args.dimensions, directory)
+        index = SimilarityIndex.load(directory)
+        text = incident_text('prod-checkout-HighCPU', REASON.format(85))
+
+        load_s = min(timeit.repeat(lambda: SimilarityIndex.load(directory), number=1, repeat=3))
+        query_s = min(timeit.repeat(lambda: index.query(text), number=args.number, repeat=5)) / args.number
+
+        print(f"incidents={args.incidents} dimensions={args.dimensions}")
+        print(f"load: {load_s * 1000:.1f} ms  query: {query_s * 1000:.2f} ms")
+        for match in index.query(text):
+            print(f"  {match['similarity']:.3f} {match['alarmName']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""
+In-process stand-ins for the AWS services the Lambda functions call.
+
+Used by the load harness and micro-benchmarks so the handler modules can be
+imported and run without AWS credentials or network access. install() must
+run before a handler module is imported, since clients are created at import.
+"""
+
+import os
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+from types import SimpleNamespace
+from typing import Any, Dict
+
+import boto3
+from botocore.exceptions import ClientError
+
+HARNESS_ENVIRONMENT = {
+    'AWS_DEFAULT_REGION': 'us-east-1',
+    'INCIDENT_BUCKET': 'load-harness-bucket',
+    'INCIDENT_HISTORY_TABLE': 'load-harness-table',
+    'ALERT_TOPIC_ARN': 'arn:aws:sns:us-east-1:000000000000:load-harness',
+    'BEDROCK_AGENT_ID': 'LOADHARNESS',
+}
+
+
+def client_error(code: str, operation: str) -> ClientError:
+    return ClientError({'Error': {'Code': code, 'Message': f'Simulated {code}'}}, operation)
+
+
+class FakeService:
+    """Base stand-in that adds a fixed latency to every call."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.calls: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def _call(self, operation: str) -> None:
+        with self._lock:
+            self.calls[operation] += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+
+class FakeTable(FakeService):
+    """
+    In-memory DynamoDB table supporting the calls the handler makes.
+
+    Update expressions of the form 'SET a = :x, #b = :y REMOVE c' are applied;
+    condition expressions are not evaluated, which is safe here because every
+    simulated delivery has its own event ID.
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        super().__init__(latency_ms)
+        self.items: Dict[Any, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _key(key: Dict[str, Any]) -> Any:
+        return (key['incidentId'], int(key['timestamp']))
+
+    def get_item(self, Key, **kwargs):
+        self._call('get_item')
+        item = self.items.get(self._key(Key))
+        return {'Item': dict(item)} if item else {}
+
+    def put_item(self, Item, **kwargs):
+        self._call('put_item')
+        self.items[self._key(Item)] = dict(Item)
+        return {}
+
+    def delete_item(self, Key, **kwargs):
+        self._call('delete_item')
+        self.items.pop(self._key(Key), None)
+        return {}
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeNames=None,
+                    ExpressionAttributeValues=None, **kwargs):
+        self._call('update_item')
+        names = ExpressionAttributeNames or {}
+        values = ExpressionAttributeValues or {}
+        item = self.items.setdefault(self._key(Key), dict(Key))
+
+        set_part, _, remove_part = UpdateExpression.partition(' REMOVE ')
+        set_part, _, add_part = set_part.partition(' ADD ')
+        for assignment in set_part.replace('SET ', '', 1).split(','):
+            name, _, value = (part.strip() for part in assignment.partition('='))
+            item[names.get(name, name)] = values.get(value)
+        for increment in (part.split() for part in add_part.split(',') if part.strip()):
+            name = names.get(increment[0], increment[0])
+            item[name] = item.get(name, 0) + values.get(increment[1])
+        for name in (part.strip() for part in remove_part.split(',') if part.strip()):
+            item.pop(names.get(name, name), None)
+        return {}
+
+    def query(self, KeyConditionExpression, ExpressionAttributeValues, Limit=None, **kwargs):
+        """Partition-key lookups only; any sort key condition is ignored."""
+        self._call('query')
+        partition = next(iter(ExpressionAttributeValues.values()))
+        items = [dict(item) for key, item in sorted(self.items.items()) if key[0] == partition]
+        return {'Items': items[:Limit] if Limit else items}
+
+
+class FakeDynamoDB:
+    def __init__(self, table: FakeTable):
+        self.table = table
+
+    def Table(self, name: str) -> FakeTable:
+        return self.table
+
+
+class FakeS3(FakeService):
+    def __init__(self, latency_ms: float = 0.0):
+        super().__init__(latency_ms)
+        self.bytes_written = 0
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self._call('put_object')
+        self.bytes_written += len(Body)
+        return {}
+
+    def download_file(self, bucket, key, path):
+        self._call('download_file')
+        raise client_error('404', 'HeadObject')
+
+
+class FakeSNS(FakeService):
+    def publish(self, **kwargs):
+        self._call('publish')
+        return {'MessageId': uuid.uuid4().hex}
+
+
+class FakeCloudWatch(FakeService):
+    """Returns a noisy synthetic series with a recent level shift for every query."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        super().__init__(latency_ms)
+        self.meta = SimpleNamespace(region_name=HARNESS_ENVIRONMENT['AWS_DEFAULT_REGION'], config=None)
+        self._series: Dict[Any, Any] = {}
+
+    def _synthetic(self, index: int, points: int):
+        # Generated once per shape so the harness measures the handler, not the fake
+        key = (index, points)
+        if key not in self._series:
+            rng = random.Random(index)
+            self._series[key] = [50 + rng.gauss(0, 5) + (40 if i < 20 else 0) for i in range(points)]
+        return self._series[key]
+
+    def get_metric_data(self, MetricDataQueries, StartTime, EndTime, **kwargs):
+        self._call('get_metric_data')
+        points = int((EndTime - StartTime).total_seconds() // 60)
+        timestamps = [EndTime - timedelta(minutes=i + 1) for i in range(points)]
+        return {'MetricDataResults': [
+            {'Id': query['Id'], 'Timestamps': timestamps, 'Values': self._synthetic(index, points)}
+            for index, query in enumerate(MetricDataQueries)
+        ]}
+
+
+class FakeSTS(FakeService):
+    """Reports the account the harness events come from, so their metrics are read."""
+
+    def get_caller_identity(self):
+        self._call('get_caller_identity')
+        return {'Account': '123456789012'}
+
+
+class FakeBedrockAgent(FakeService):
+    """Simulated invoke_agent with a chunked completion stream."""
+
+    def __init__(self, first_byte_ms: float, chunk_ms: float, chunks: int, chunk_bytes: int,
+                 error_rate: float, throttle_rate: float, seed: int = 1):
+        super().__init__(0.0)
+        self.first_byte_ms = first_byte_ms
+        self.chunk_ms = chunk_ms
+        self.chunks = chunks
+        self.chunk_bytes = chunk_bytes
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self._rng = random.Random(seed)
+
+    def invoke_agent(self, **kwargs):
+        self._call('invoke_agent')
+        with self._lock:
+            roll = self._rng.random()
+
+        if roll < self.throttle_rate:
+            time.sleep(0.02)
+            raise client_error('ThrottlingException', 'InvokeAgent')
+
+        time.sleep(self.first_byte_ms / 1000)
+        if roll < self.throttle_rate + self.error_rate:
+            raise client_error('InternalServerException', 'InvokeAgent')
+
+        return {'completion': self._stream()}
+
+    def _stream(self):
+        payload = (b'Scale out the service; CPU saturation caused by traffic spike. ' * 64)[:self.chunk_bytes]
+        for _ in range(self.chunks):
+            time.sleep(self.chunk_ms / 1000)
+            yield {'chunk': {'bytes': payload}}
+
+
+class FakeContext:
+    def __init__(self, timeout_ms: int):
+        self.aws_request_id = uuid.uuid4().hex
+        self._deadline = time.time() * 1000 + timeout_ms
+
+    def get_remaining_time_in_millis(self) -> int:
+        return int(self._deadline - time.time() * 1000)
+
+
+def install(fakes: Dict[str, Any]) -> None:
+    """
+    Route boto3 clients to stand-ins and set the handler environment.
+
+    Args:
+        fakes: Stand-ins by service name; 'table' backs boto3.resource('dynamodb')
+    """
+    generic = FakeService()
+    table = fakes.get('table') or FakeTable()
+    fakes = {'sts': FakeSTS(), **fakes}
+
+    boto3.client = lambda service, *a, **kw: fakes.get(service, generic)
+    boto3.resource = lambda service, *a, **kw: FakeDynamoDB(table)
+
+    for name, value in HARNESS_ENVIRONMENT.items():
+        os.environ.setdefault(name, value)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Incident Handler Load Harness
+
+Runs the incident handler's lambda_handler concurrently against in-process
+stand-ins for S3, DynamoDB, SNS and a simulated Bedrock agent stream, then
+reports throughput, per-stage latency percentiles (from the handler's own
+latency traces), memory use, the fallback rate and the benign pre-filter
+skip rate.
+
+The fake agent streams its answer in chunks with configurable first-byte and
+per-chunk latency, and fails or throttles a configurable share of calls, so
+behaviour during Bedrock degradation (circuit breaker, deadline fallback) can
+be measured as well as the happy path.
+
+Usage:
+    python benchmarks/load_incident_handler.py --incidents 500 --concurrency 50
+    python benchmarks/load_incident_handler.py --error-rate 0.3 --throttle-rate 0.1
+"""
+
+import argparse
+import json
+import math
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import fakes as fakes_module
+from fakes import FakeBedrockAgent, FakeCloudWatch, FakeContext, FakeS3, FakeSNS, FakeTable
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'lambda'))
+sys.path.insert(0, os.path.join(ROOT, 'lambda', 'incident-handler'))
+
+
+def install_fakes(args) -> Dict[str, Any]:
+    """Route boto3 clients to the stand-ins before the handler module is imported."""
+    fakes = {
+        'table': FakeTable(args.dynamodb_ms),
+        's3': FakeS3(args.s3_ms),
+        'sns': FakeSNS(args.sns_ms),
+        'cloudwatch': FakeCloudWatch(args.cloudwatch_ms),
+        'bedrock-agent-runtime': FakeBedrockAgent(
+            args.first_byte_ms, args.chunk_ms, args.chunks, args.chunk_bytes,
+            args.error_rate, args.throttle_rate
+        ),
+    }
+    fakes_module.install(fakes)
+    return fakes
+
+
+def make_event(index: int) -> Dict[str, Any]:
+    """Build a forwarded incident event the way the deduplicator does."""
+    from shared.envelope import IncidentEnvelope
+    from shared.tracing import Trace, now_ms
+
+    now = datetime.now(timezone.utc)
+    alarm = {
+        'version': '0',
+        'id': uuid.uuid4().hex,
+        'detail-type': 'CloudWatch Alarm State Change',
+        'source': 'aws.cloudwatch',
+        'account': '123456789012',
+        'time': now.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'region': 'us-east-1',
+        'detail': {
+            'alarmName': f'load-test-service-{index % 40}-HighCPU',
+            'state': {
+                'value': 'ALARM',
+                'reason': 'Threshold Crossed: 3 out of the last 3 datapoints were greater than the threshold (80.0).',
+                'reasonData': json.dumps({'threshold': 80.0}),
+                'timestamp': now.isoformat(timespec='milliseconds'),
+            },
+            'configuration': {
+                'metrics': [{
+                    'id': 'm1',
+                    'metricStat': {
+                        'metric': {
+                            'namespace': 'AWS/EC2',
+                            'name': 'CPUUtilization',
+                            'dimensions': {'AutoScalingGroupName': f'load-test-service-{index % 40}'},
+                        },
+                        'period': 60,
+                        'stat': 'Average',
+                    },
+                    'returnData': True,
+                }],
+            },
+        },
+    }
+    envelope = IncidentEnvelope(f'{index:016x}', alarm, trace=Trace.start(alarm))
+    envelope.recorded_at = envelope.forwarded_at = now_ms()
+    envelope.processed_at = now.isoformat()
+    return {'id': uuid.uuid4().hex, 'detail': envelope.detail_json}
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Load test the incident handler against simulated AWS services')
+    parser.add_argument('--incidents', type=int, default=200, help='Incidents to process')
+    parser.add_argument('--concurrency', type=int, default=50, help='Concurrent handler invocations')
+    parser.add_argument('--timeout-ms', type=int, default=300000, help='Simulated Lambda timeout')
+    parser.add_argument('--first-byte-ms', type=float, default=800, help='Agent time to first chunk')
+    parser.add_argument('--chunk-ms', type=float, default=50, help='Agent delay between chunks')
+    parser.add_argument('--chunks', type=int, default=20, help='Chunks per agent response')
+    parser.add_argument('--chunk-bytes', type=int, default=256, help='Bytes per chunk')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of agent calls that fail')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Share of agent calls throttled')
+    parser.add_argument('--dynamodb-ms', type=float, default=5, help='Latency per DynamoDB call')
+    parser.add_argument('--s3-ms', type=float, default=20, help='Latency per S3 call')
+    parser.add_argument('--sns-ms', type=float, default=10, help='Latency per SNS call')
+    parser.add_argument('--cloudwatch-ms', type=float, default=30, help='Latency per GetMetricData call')
+    args = parser.parse_args()
+
+    fakes = install_fakes(args)
+    import index as handler
+
+    events = [make_event(i) for i in range(args.incidents)]
+    latencies: List[float] = []
+    statuses: Dict[int, int] = defaultdict(int)
+    fallbacks = 0
+    skipped = 0
+    lock = threading.Lock()
+
+    def invoke(event: Dict[str, Any]) -> None:
+        nonlocal fallbacks, skipped
+        started = time.perf_counter()
+        response = handler.lambda_handler(event, FakeContext(args.timeout_ms))
+        elapsed = (time.perf_counter() - started) * 1000
+        result = json.loads(response['body']).get('result') or {}
+        with lock:
+            latencies.append(elapsed)
+            statuses[response['statusCode']] += 1
+            fallbacks += bool(result.get('fallback_processing'))
+            skipped += bool((result.get('prefilter') or {}).get('skipped'))
+
+    # Handler output is noise at this volume
+    devnull = open(os.devnull, 'w')
+    stdout = sys.stdout
+    tracemalloc.start()
+    started = time.perf_counter()
+    sys.stdout = devnull
+    try:
+        with ThreadPoolExecutor(args.concurrency) as executor:
+            list(executor.map(invoke, events))
+    finally:
+        sys.stdout = stdout
+    wall = time.perf_counter() - started
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stages: Dict[str, List[float]] = defaultdict(list)
+    for item in fakes['table'].items.values():
+        if 'trace' in item:
+            for name, _, duration in json.loads(item['trace'])['s']:
+                stages[name].append(duration)
+    stages['invocation'] = latencies
+
+    print(f"incidents={args.incidents} concurrency={args.concurrency} "
+          f"error_rate={args.error_rate} throttle_rate={args.throttle_rate}")
+    print(f"throughput: {args.incidents / wall:.1f} incidents/s over {wall:.2f}s")
+    print(f"status codes: {dict(statuses)}  fallback rate: {fallbacks / args.incidents:.1%}")
+    print(f"memory: peak traced {peak_bytes / 1e6:.1f} MB, max RSS "
+          f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB")
+    print(f"agent calls: {fakes['bedrock-agent-runtime'].calls['invoke_agent']}  "
+          f"breaker state: {handler.bedrock_breaker.state}  "
+          f"pre-filter skip rate: {skipped / args.incidents:.1%}")
+    print(f"{'stage':<18} {'count':>6} {'p50 ms':>9} {'p99 ms':>9}")
+    for name in sorted(stages):
+        values = sorted(stages[name])
+        print(f"{name:<18} {len(values):>6} {percentile(values, 50):>9.1f} {percentile(values, 99):>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
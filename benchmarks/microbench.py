@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Per-event Hot Path Micro-benchmarks
+
+Times the functions that run for every alarm: incident ID generation, event
+field extraction and validation, event JSON encoding/decoding, context gathering, agent
+prompt building and fallback rule matching, each with realistic small and
+large payloads (long alarm reasons, big log arrays). Each case calls what the
+handler calls with its default settings; opt-in paths are named as such.
+
+--check compares against the stored baseline and exits non-zero if any
+benchmark regressed past the threshold. Each timing is the median of several
+repeats, each repeat divided by a fixed calibration workload run right before
+it, and the normalised values are compared: raw timings on a shared runner
+drift together by tens of percent between runs. Baselines are recorded per
+host and checked against this host's entry, or the most recently recorded
+host when it has none (e.g. a fresh CI runner). A benchmark over the
+threshold is measured once more before it is reported, so a one-off stall
+does not fail the check.
+
+Usage:
+    python benchmarks/microbench.py                  # print timings
+    python benchmarks/microbench.py --save-baseline  # record this host in benchmarks/baseline.json
+    python benchmarks/microbench.py --check          # fail on regressions, e.g. before deploy
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import timeit
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import fakes
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+sys.path.insert(0, os.path.join(ROOT, 'lambda'))
+sys.path.insert(0, os.path.join(ROOT, 'lambda', 'deduplicator'))
+sys.path.insert(0, os.path.join(ROOT, 'lambda', 'incident-handler'))
+
+
+def load_lambda(name: str, directory: str):
+    """Import a Lambda's index.py under a unique module name, quietly."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, 'lambda', directory, 'index.py'))
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+def alarm_event(reason: str) -> Dict[str, Any]:
+    return {
+        'version': '0',
+        'id': 'c4c1c1c9-6542-e61b-6ef0-8c4d36933a92',
+        'detail-type': 'CloudWatch Alarm State Change',
+        'source': 'aws.cloudwatch',
+        'account': '123456789012',
+        'time': '2026-10-19T10:03:00Z',
+        'region': 'us-east-1',
+        'resources': ['arn:aws:cloudwatch:us-east-1:123456789012:alarm:prod-checkout-api-HighCPUUtilization'],
+        'detail': {
+            'alarmName': 'prod-checkout-api-HighCPUUtilization',
+            'state': {
+                'value': 'ALARM',
+                'reason': reason,
+                'reasonData': '{"version":"1.0","queryDate":"2026-10-19T10:03:00.000+0000","statistic":"Average","period":60,"recentDatapoints":[92.4,95.1,91.7],"threshold":80.0}',
+                'timestamp': '2026-10-19T10:03:00.000+0000',
+            },
+            'previousState': {'value': 'OK', 'reason': 'Threshold Crossed', 'timestamp': '2026-10-19T09:40:00.000+0000'},
+            'configuration': {
+                'description': 'CPU above 80% on the checkout API fleet',
+                'metrics': [{
+                    'id': 'm1',
+                    'metricStat': {
+                        'metric': {
+                            'namespace': 'AWS/EC2',
+                            'name': 'CPUUtilization',
+                            'dimensions': {'AutoScalingGroupName': 'prod-checkout-api'},
+                        },
+                        'period': 60,
+                        'stat': 'Average',
+                    },
+                    'returnData': True,
+                }],
+            },
+        },
+    }
+
+
+SHORT_REASON = (
+    'Threshold Crossed: 3 out of the last 3 datapoints [92.4 (19/10/26 10:03:00), 95.1 (19/10/26 10:02:00), '
+    '91.7 (19/10/26 10:01:00)] were greater than the threshold (80.0) (minimum 3 datapoints for OK -> ALARM transition).'
+)
+LONG_REASON = SHORT_REASON + ' Composite alarm children: ' + ', '.join(
+    f'prod-service-{i}-HighCPUUtilization (ALARM)' for i in range(200)
+)
+BIG_LOGS = [
+    f'2026-10-19T10:02:{i % 60:02d}.123Z ERROR [checkout-api] [worker-{i % 16}] '
+    f'request {i:08x} failed: upstream timed out after 30000ms (pool 64/64 in use)'
+    for i in range(500)
+]
+
+
+def build_benchmarks() -> List[Tuple[str, Callable[[], Any]]]:
+    fakes.install({'table': fakes.FakeTable(), 's3': fakes.FakeS3(), 'sns': fakes.FakeSNS(),
+                   'cloudwatch': fakes.FakeCloudWatch()})
+    dedup = load_lambda('deduplicator_index', 'deduplicator')
+    handler = load_lambda('incident_handler_index', 'incident-handler')
+
+    small_event = alarm_event(SHORT_REASON)
+    large_event = alarm_event(LONG_REASON)
+    from shared import jsoncodec
+    from shared.envelope import IncidentEnvelope
+    from shared.incident import Incident, InvalidEventError
+
+    small_detail = json.dumps({'incidentId': '0f3a9c2b7d1e4a56', 'originalEvent': small_event})
+    large_detail = json.dumps({'incidentId': '0f3a9c2b7d1e4a56', 'originalEvent': large_event, 'logs': BIG_LOGS})
+
+    small_incident = Incident.from_event(small_event)
+    with contextlib.redirect_stdout(io.StringIO()):
+        small_context = handler.gather_incident_context(small_incident)
+    large_context = dict(small_context, logs=BIG_LOGS, alarm=dict(small_context['alarm'], reason=LONG_REASON))
+
+    import metric_context
+    import numpy as np
+    metric_matrix = np.random.default_rng(0).normal(50, 5, (6, 1440 + 180))
+
+    def extract_fields(event=small_event):
+        return (
+            event['detail']['alarmName'],
+            event['detail']['state']['value'],
+            event['region'],
+            event['account'],
+        )
+
+    def gather_context():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return handler.gather_incident_context(small_incident)
+
+    bad_event = dict(small_event, account='not-an-account')
+
+    def reject_invalid():
+        try:
+            Incident.from_event(bad_event)
+        except InvalidEventError:
+            pass
+
+    return [
+        ('dedup.generate_incident_id', lambda: dedup.generate_incident_id(
+            'prod-checkout-api-HighCPUUtilization', 'us-east-1', '123456789012')),
+        ('dedup.extract_fields', extract_fields),
+        ('incident.validate_small', lambda: Incident.from_event(small_event)),
+        ('incident.validate_large_reason', lambda: Incident.from_event(large_event)),
+        ('incident.reject_invalid', reject_invalid),
+        ('event.dumps_small', lambda: json.dumps(small_event)),
+        ('event.dumps_large_reason', lambda: json.dumps(large_event)),
+        ('event.loads_small', lambda: json.loads(small_detail)),
+        ('event.loads_large', lambda: json.loads(large_detail)),
+        ('envelope.forward_detail_large', lambda: IncidentEnvelope('0f3a9c2b7d1e4a56', large_event).detail_json),
+        ('envelope.from_detail_large', lambda: IncidentEnvelope.from_detail(large_detail)),
+        ('handler.gather_context', gather_context),
+        ('handler.metric_summary', lambda: metric_context.summarize(metric_matrix, 60, 180)),
+        ('handler.dumps_context_s3', lambda: jsoncodec.dumps_bytes(large_context)),
+        ('handler.build_agent_input_small', lambda: handler.build_agent_input('0f3a9c2b7d1e4a56', small_context)),
+        ('handler.build_agent_input_big_logs', lambda: handler.build_agent_input('0f3a9c2b7d1e4a56', large_context)),
+        ('handler.fallback_rules_small', lambda: handler.fallback_rules.decide(small_context)),
+        ('handler.fallback_rules_large_reason', lambda: handler.fallback_rules.decide(large_context)),
+        # Opt-in path, FALLBACK_RULES_USE_LOGS=true
+        ('handler.fallback_rules_logs_opt_in', lambda: handler.fallback_rules.decide(large_context, use_logs=True)),
+    ]
+
+
+def calibration() -> int:
+    """Fixed pure-Python workload used to normalise timings across machines."""
+    total = 0
+    for i in range(2000):
+        total += len(str(i)) * (i & 7)
+    return total
+
+
+def host_id() -> str:
+    """Key for per-host baselines: CPU model, core count and Python version."""
+    cpu = platform.processor() or platform.machine()
+    try:
+        with open('/proc/cpuinfo') as f:
+            cpu = next(line.split(':', 1)[1].strip() for line in f if line.startswith('model name'))
+    except (OSError, StopIteration):
+        pass
+    return f"{cpu} x{os.cpu_count()} / {platform.python_implementation()} {platform.python_version()}"
+
+
+def calibrated_timer(func: Callable[[], Any], min_time: float) -> Tuple[timeit.Timer, int]:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return timer, max(1, int(number * min_time / 0.2))
+
+
+def measure(func: Callable[[], Any], min_time: float = 0.1, repeat: int = 9) -> Tuple[float, float]:
+    """
+    Median time per call over repeats.
+
+    Each repeat is preceded by a calibration run, so a CPU slowing down or
+    speeding up mid-run shifts both and cancels out of the normalised value.
+
+    Returns:
+        Median nanoseconds per call and median ratio to the calibration workload
+    """
+    timer, number = calibrated_timer(func, min_time)
+    cal_timer, cal_number = calibrated_timer(calibration, min_time / 2)
+
+    ns, normalised = [], []
+    for _ in range(repeat):
+        cal_ns = cal_timer.timeit(cal_number) / cal_number * 1e9
+        call_ns = timer.timeit(number) / number * 1e9
+        ns.append(call_ns)
+        normalised.append(call_ns / cal_ns)
+    return statistics.median(ns), statistics.median(normalised)
+
+
+def load_baseline(path: str, host: str) -> Tuple[Dict[str, Any], Optional[str]]:
+    """
+    Baselines by host, and the one to compare against.
+
+    Returns:
+        All stored host entries and the key of this host's entry, or of the
+        most recently recorded host when this host has none
+    """
+    if not os.path.exists(path):
+        return {}, None
+    with open(path) as f:
+        hosts = json.load(f).get('hosts', {})
+    if host in hosts:
+        return hosts, host
+    if hosts:
+        return hosts, max(hosts, key=lambda key: hosts[key]['recorded'])
+    return hosts, None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Micro-benchmarks for the per-event hot path')
+    parser.add_argument('--save-baseline', action='store_true', help="Store results as this host's baseline")
+    parser.add_argument('--check', action='store_true', help='Fail if any benchmark regressed past the threshold')
+    parser.add_argument('--threshold', type=float, default=0.5, help='Allowed slowdown versus baseline')
+    parser.add_argument('--filter', default='', help='Only run benchmarks whose name contains this')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline file')
+    args = parser.parse_args()
+
+    host = host_id()
+    hosts, baseline_host = load_baseline(args.baseline, host)
+    baseline = hosts[baseline_host]['benchmarks'] if baseline_host else {}
+    if args.check and baseline_host:
+        print(f"Comparing with the baseline of {baseline_host}")
+
+    benchmarks = [(name, func) for name, func in build_benchmarks() if args.filter in name]
+    results: Dict[str, Dict[str, float]] = {}
+    regressions = []
+    print(f"{'benchmark':<40} {'ns/call':>12} {'normalised':>11} {'vs base':>8}")
+
+    for name, func in benchmarks:
+        ns, normalised = measure(func)
+        results[name] = {'ns': round(ns, 1), 'normalised': round(normalised, 5)}
+
+        change = ''
+        if name in baseline:
+            ratio = normalised / baseline[name]['normalised']
+            if args.check and ratio > 1 + args.threshold:
+                # Confirm before reporting; keep the faster of the two runs
+                ns, normalised = min((ns, normalised), measure(func), key=lambda timing: timing[1])
+                results[name] = {'ns': round(ns, 1), 'normalised': round(normalised, 5)}
+                ratio = normalised / baseline[name]['normalised']
+            change = f"{ratio - 1:+.0%}"
+            if ratio > 1 + args.threshold:
+                regressions.append((name, ratio))
+        print(f"{name:<40} {ns:>12,.0f} {normalised:>11.4f} {change:>8}")
+
+    if args.save_baseline:
+        hosts[host] = {'recorded': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'benchmarks': results}
+        with open(args.baseline, 'w') as f:
+            json.dump({'hosts': hosts}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline for {host} saved to {args.baseline}")
+
+    if args.check:
+        if not baseline:
+            print("No baseline to check against; run with --save-baseline first")
+            sys.exit(1)
+        for name, ratio in regressions:
+            print(f"REGRESSION {name}: {ratio:.2f}x baseline (threshold {1 + args.threshold:.2f}x)")
+        sys.exit(1 if regressions else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Architecture Diagram Generator
+
+Renders every architecture diagram described in architecture_model.json.
+Nodes and their icons are declared once in the model, and each diagram picks
+the nodes, clusters and edges it shows. The resolved description of each
+diagram is hashed and recorded in a manifest next to the output, so a run
+only re-renders diagrams whose description changed. Diagrams that do need
+rendering are rendered in parallel worker processes.
+
+Requirements:
+    pip install diagrams
+
+Usage:
+    python generate_diagrams.py
+    python generate_diagrams.py --minimal --only detailed --only costs
+    python generate_diagrams.py --force --jobs 2
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_FILE = '.diagram-manifest.json'
+
+# Bump when rendering changes in a way the model does not capture
+RENDER_VERSION = 1
+
+
+def load_model(path: str) -> Dict[str, Any]:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def as_list(value) -> List[str]:
+    return value if isinstance(value, list) else [value]
+
+
+def diagrams_version() -> Optional[str]:
+    """Installed version of the diagrams package; icon availability depends on it."""
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+        return version('diagrams')
+    except (ImportError, PackageNotFoundError):
+        return None
+
+
+def diagram_spec(model: Dict[str, Any], diagram: Dict[str, Any], minimal: bool, output_format: str) -> Dict[str, Any]:
+    """
+    Resolve one diagram of the model into a self-contained description.
+
+    The description holds everything rendering depends on (labels, icon
+    candidates, clusters, expanded edges), so its hash changes exactly when
+    the rendered diagram would.
+
+    Raises:
+        ValueError: If the diagram refers to an unknown node or icon
+    """
+    used: List[str] = []
+
+    def collect_clusters(clusters: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        resolved = []
+        for cluster in clusters:
+            used.extend(cluster.get('nodes', []))
+            resolved.append({
+                'name': cluster['name'],
+                'nodes': cluster.get('nodes', []),
+                'clusters': collect_clusters(cluster.get('clusters', []))
+            })
+        return resolved
+
+    clusters = collect_clusters(diagram.get('clusters', []))
+    used.extend(diagram.get('nodes', []))
+
+    nodes = {}
+    for node_id in used:
+        if node_id not in model['nodes']:
+            raise ValueError(f"Diagram '{diagram['name']}' uses unknown node '{node_id}'")
+        node = model['nodes'][node_id]
+        if node['icon'] not in model['icons']:
+            raise ValueError(f"Node '{node_id}' uses unknown icon '{node['icon']}'")
+        candidates = model['icons'][node['icon']]
+        nodes[node_id] = {'label': node['label'], 'icons': candidates[-1:] if minimal else candidates}
+
+    edges = []
+    for edge in diagram.get('edges', []):
+        for source in as_list(edge['from']):
+            for target in as_list(edge['to']):
+                if source not in nodes or target not in nodes:
+                    raise ValueError(f"Diagram '{diagram['name']}' has an edge outside its nodes: {source} -> {target}")
+                edges.append([source, target, edge.get('label', '')])
+
+    return {
+        'name': diagram['name'],
+        'title': diagram['title'],
+        'filename': diagram['filename'],
+        'direction': diagram.get('direction', 'TB'),
+        'format': output_format,
+        'clusters': clusters,
+        'nodes': diagram.get('nodes', []),
+        'node_attrs': nodes,
+        'edges': edges,
+        'renderer': [RENDER_VERSION, diagrams_version()]
+    }
+
+
+def spec_hash(spec: Dict[str, Any]) -> str:
+    canonical = json.dumps(spec, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def icon_class(candidates: List[str]):
+    """First importable icon class among the candidates."""
+    for path in candidates:
+        module_name, _, class_name = path.rpartition('.')
+        try:
+            return getattr(importlib.import_module(module_name), class_name)
+        except (ImportError, AttributeError):
+            continue
+    raise ImportError(f"No icon available among {candidates}")
+
+
+def render_diagram(spec: Dict[str, Any], output_dir: str) -> Tuple[str, float]:
+    """Render one diagram; runs in a worker process."""
+    from diagrams import Cluster, Diagram, Edge
+
+    started = time.perf_counter()
+    created = {}
+
+    def add_node(node_id: str) -> None:
+        attrs = spec['node_attrs'][node_id]
+        created[node_id] = icon_class(attrs['icons'])(attrs['label'])
+
+    def add_clusters(clusters: List[Dict[str, Any]]) -> None:
+        for cluster in clusters:
+            with Cluster(cluster['name']):
+                for node_id in cluster['nodes']:
+                    add_node(node_id)
+                add_clusters(cluster['clusters'])
+
+    with Diagram(spec['title'],
+                 show=False,
+                 direction=spec['direction'],
+                 filename=os.path.join(output_dir, spec['filename']),
+                 outformat=spec['format']):
+        add_clusters(spec['clusters'])
+        for node_id in spec['nodes']:
+            add_node(node_id)
+        for source, target, label in spec['edges']:
+            created[source] >> Edge(label=label) >> created[target]
+
+    return spec['name'], time.perf_counter() - started
+
+
+def load_manifest(path: str) -> Dict[str, str]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Render architecture diagrams from the architecture model')
+    parser.add_argument('--model', default=os.path.join(HERE, 'architecture_model.json'), help='Architecture model')
+    parser.add_argument('--output-dir', default='.', help='Directory for rendered diagrams')
+    parser.add_argument('--only', action='append', default=[], metavar='NAME', help='Render only this diagram, repeatable')
+    parser.add_argument('--minimal', action='store_true', help='Use only the basic icon of every node')
+    parser.add_argument('--format', default='png', help='Output format (png, svg, jpg, pdf)')
+    parser.add_argument('--force', action='store_true', help='Re-render even if unchanged')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='Parallel render processes')
+    args = parser.parse_args()
+
+    model = load_model(args.model)
+    selected = [d for d in model['diagrams'] if not args.only or d['name'] in args.only]
+    unknown = set(args.only) - {d['name'] for d in model['diagrams']}
+    if unknown:
+        parser.error(f"Unknown diagram(s): {', '.join(sorted(unknown))}")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest_path = os.path.join(args.output_dir, MANIFEST_FILE)
+    manifest = load_manifest(manifest_path)
+
+    pending = []
+    for diagram in selected:
+        spec = diagram_spec(model, diagram, args.minimal, args.format)
+        digest = spec_hash(spec)
+        output = f"{spec['filename']}.{args.format}"
+        if not args.force and manifest.get(output) == digest and os.path.exists(os.path.join(args.output_dir, output)):
+            print(f"⏭️  Unchanged: {output}")
+            continue
+        pending.append((spec, output, digest))
+
+    if not pending:
+        print("✅ All diagrams are up to date")
+        return
+
+    print(f"🎨 Rendering {len(pending)} of {len(selected)} diagrams with {min(args.jobs, len(pending))} processes...")
+    failures = 0
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=max(1, min(args.jobs, len(pending)))) as executor:
+        futures = {executor.submit(render_diagram, spec, args.output_dir): (output, digest)
+                   for spec, output, digest in pending}
+        for future in as_completed(futures):
+            output, digest = futures[future]
+            try:
+                _, seconds = future.result()
+                manifest[output] = digest
+                print(f"✅ Generated {output} ({seconds:.1f}s)")
+            except ImportError as e:
+                failures += 1
+                print(f"❌ Error rendering {output}: {e}")
+                print("Please install the diagrams package (pip install diagrams) and Graphviz:")
+                print("  - macOS: brew install graphviz")
+                print("  - Ubuntu: sudo apt-get install graphviz")
+            except Exception as e:
+                failures += 1
+                print(f"❌ Error rendering {output}: {e}")
+                print("Make sure you have Graphviz installed and accessible in your PATH")
+
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    print(f"\n📊 Rendered {len(pending) - failures} diagrams in {time.perf_counter() - started:.1f}s")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -19,20 +19,13 @@ fi
 echo "🔄 Activating virtual environment..."
 source venv/bin/activate
 
-# Check if the generator script exists and run the most compatible version
-if [ -f "generate_devops_architecture_minimal.py" ]; then
-    echo "🚀 Running minimal diagram generator (maximum compatibility)..."
-    python generate_devops_architecture_minimal.py
-elif [ -f "generate_devops_architecture_fixed.py" ]; then
-    echo "🚀 Running fixed diagram generator..."
-    python generate_devops_architecture_fixed.py
-elif [ -f "generate_devops_architecture.py" ]; then
-    echo "🚀 Running original diagram generator..."
-    python generate_devops_architecture.py
-else
-    echo "❌ No diagram generator script found in current directory"
+# Render the diagrams whose model changed since the last run (pass --force to render all)
+if [ ! -f "generate_diagrams.py" ]; then
+    echo "❌ generate_diagrams.py not found in current directory"
     exit 1
 fi
+echo "🚀 Running diagram generator..."
+python generate_diagrams.py "$@"
 
 # List generated files
 echo ""
@@ -63,7 +63,7 @@ echo "🎉 Setup completed successfully!"
 echo ""
 echo "To generate architecture diagrams:"
 echo "1. Activate the virtual environment: source venv/bin/activate"
-echo "2. Run the diagram generator: python generate_devops_architecture.py"
+echo "2. Run the diagram generator: python generate_diagrams.py"
 echo "3. Deactivate when done: deactivate"
 echo ""
 echo "📁 Generated diagrams will be saved as PNG files in the current directory."
\ No newline at end of file
@@ -0,0 +1,311 @@
+"""
+Resource-topology Correlation of Related Alarms
+
+Alarms that fire close together on services that depend on each other (an
+API, its queue and the database behind them) are merged into one root
+incident, so a single analysis covers the whole cascade.
+
+Resource identifiers are taken from the alarm's metric dimensions and mapped
+to services through a topology file (service -> resources, dependencies).
+The bundled topology.json is empty, so correlation is off until a deployment
+describes its own services, in that file or one named by TOPOLOGY_FILE;
+topology.example.json shows the format.
+Each service with a recent alarm holds a correlation record pointing at the
+group (root incident) it belongs to. Groups form an incremental union-find
+persisted in the table: when one alarm touches several live groups they are
+unioned, and the parent pointers are stored so every container resolves a
+group to the same root.
+
+The root of a cascade should be its likeliest cause, the alarm furthest
+upstream in the dependency graph, not whichever alarm arrived first. Every
+group has a fixed level, how far upstream its root alarm is (0 for a service
+that depends on nothing), and is always attached under the group that orders
+first by (level, ID); a fixed total order also means pointers written by
+racing containers can never form a cycle. An alarm upstream of the live
+root's level starts its own group, takes over the cascade and is analysed,
+with the earlier root and its members recorded as its members.
+
+Two alarms of a new cascade processed at the same moment by different
+containers can both become roots; the next related alarm unions them.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+CORRELATION_PREFIX = 'corr#'
+GROUP_PREFIX = 'corr-group#'
+MEMBERS_PREFIX = 'corr-members#'
+
+
+def extract_resources(event: Dict[str, Any]) -> Set[str]:
+    """Resource identifiers from the alarm's metric dimensions."""
+    resources = set()
+    configuration = event.get('detail', {}).get('configuration', {})
+
+    for metric in configuration.get('metrics', []):
+        dimensions = metric.get('metricStat', {}).get('metric', {}).get('dimensions', {})
+        resources.update(str(value) for value in dimensions.values())
+
+    return resources
+
+
+class Topology:
+    """Service dependency map with a reverse index from resource IDs to services."""
+
+    def __init__(self, services: Dict[str, Dict[str, Any]]):
+        self.neighbours: Dict[str, Set[str]] = {name: set() for name in services}
+        self.dependencies: Dict[str, Set[str]] = {}
+        self.resource_index: Dict[str, str] = {}
+        self._levels: Dict[str, int] = {}
+
+        for name, service in services.items():
+            self.resource_index[name] = name
+            for resource in service.get('resources', []):
+                self.resource_index[resource] = name
+            self.dependencies[name] = set(service.get('dependsOn', []))
+            for dependency in service.get('dependsOn', []):
+                # Failures propagate both ways along a dependency
+                self.neighbours[name].add(dependency)
+                self.neighbours.setdefault(dependency, set()).add(name)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'Topology':
+        """Load a topology file; a missing file yields an empty topology."""
+        if not os.path.exists(path):
+            print(f"No topology file at {path}, alarm correlation disabled")
+            return cls({})
+
+        with open(path) as f:
+            services = json.load(f)['services']
+        if not services:
+            print(f"Topology file {path} lists no services, alarm correlation disabled")
+        return cls(services)
+
+    def services_for(self, resources: Iterable[str]) -> Set[str]:
+        return {self.resource_index[r] for r in resources if r in self.resource_index}
+
+    def neighbourhood(self, services: Set[str]) -> Set[str]:
+        """The services plus everything they depend on or that depends on them."""
+        related = set(services)
+        for service in services:
+            related.update(self.neighbours.get(service, ()))
+        return related
+
+    def level(self, services: Iterable[str]) -> int:
+        """Level of the most upstream service: 0 if it depends on nothing, else one above its deepest dependency."""
+        return min((self._level(service, set()) for service in services), default=0)
+
+    def _level(self, service: str, visiting: Set[str]) -> int:
+        if service not in self._levels:
+            # A dependency cycle is cut where it closes
+            visiting.add(service)
+            self._levels[service] = max(
+                (self._level(d, visiting) + 1 for d in self.dependencies.get(service, ()) if d not in visiting),
+                default=0
+            )
+            visiting.discard(service)
+        return self._levels[service]
+
+
+class UnionFind:
+    """
+    Union-find over group IDs; unknown IDs are looked up through ``load_parent``.
+
+    Parents always order before their children by (level, ID), so the most
+    upstream group is the root and every chain stays finite even when
+    pointers are written concurrently.
+    """
+
+    def __init__(self, load_parent=None):
+        self.parent: Dict[str, str] = {}
+        self.levels: Dict[str, int] = {}
+        self.load_parent = load_parent
+
+    def add(self, group: str, level: int) -> None:
+        """Make a group and its fixed level known."""
+        self.levels.setdefault(group, level)
+
+    def find(self, group: str) -> str:
+        while True:
+            parent = self.parent.get(group)
+            if parent is None:
+                loaded = self.load_parent(group) if self.load_parent else None
+                if loaded:
+                    parent, level = loaded
+                    self.add(parent, level)
+                self.parent[group] = parent or group
+                parent = parent or group
+            if parent == group:
+                return group
+            # Path halving
+            grandparent = self.parent.get(parent)
+            if grandparent is not None:
+                self.parent[group] = grandparent
+            group = parent
+
+    def union(self, a: str, b: str) -> Optional[Tuple[str, str]]:
+        """Merge two groups; returns (child, new parent) if they were separate."""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return None
+        root, child = sorted((a, b), key=lambda group: (self.levels.get(group, 0), group))
+        self.parent[child] = root
+        return child, root
+
+
+class CorrelationIndex:
+    """Groups alarms on related services into root incidents within a time window."""
+
+    def __init__(self, table, topology: Topology, window_seconds: int = 300, max_group_seconds: int = 3600):
+        self.table = table
+        self.topology = topology
+        self.window_seconds = window_seconds
+        self.max_group_seconds = max_group_seconds
+
+    @classmethod
+    def from_env(cls, table, default_topology_file: str) -> 'CorrelationIndex':
+        """Build an index configured from TOPOLOGY_FILE and CORRELATION_* environment variables."""
+        return cls(
+            table=table,
+            topology=Topology.from_file(os.environ.get('TOPOLOGY_FILE', default_topology_file)),
+            window_seconds=int(os.environ.get('CORRELATION_WINDOW_SECONDS', '300')),
+            max_group_seconds=int(os.environ.get('CORRELATION_MAX_GROUP_SECONDS', '3600'))
+        )
+
+    def correlate(self, incident_id: str, event: Dict[str, Any], now: Optional[int] = None) -> Optional[str]:
+        """
+        Join an alarm to a live group of related alarms, or start a new group.
+
+        Args:
+            incident_id: Fingerprint of the new incident
+            event: CloudWatch alarm event
+            now: Current epoch seconds
+
+        Returns:
+            Root incident ID if the alarm joined an existing group, None if it is a root itself
+        """
+        services = self.topology.services_for(extract_resources(event))
+        if not services:
+            return None
+
+        now = now or int(time.time())
+        level = self.topology.level(services)
+        live = self._live_records(self.topology.neighbourhood(services), now)
+
+        if not live:
+            self._claim(services, incident_id, level, now, now)
+            return None
+
+        # Parent pointers are read fresh each time so merges by other containers are seen
+        groups = UnionFind(self._load_parent)
+        for item in live:
+            groups.add(item['groupId'], int(item.get('rootLevel', 0)))
+        for item in live[1:]:
+            self._union(groups, live[0]['groupId'], item['groupId'], now)
+
+        root = groups.find(live[0]['groupId'])
+
+        if level < groups.levels.get(root, 0):
+            # Upstream of the cascade's root, so a likelier cause: it takes over and is analysed
+            groups.add(incident_id, level)
+            self._union(groups, root, incident_id, now)
+            if groups.find(root) != root:
+                self._adopt(root, groups.find(root), now)
+            root = groups.find(root)
+
+        self._claim(services, root, groups.levels.get(root, 0), min(int(item['startedAt']) for item in live), now)
+
+        # A later occurrence of the root alarm itself is not a member of its own group
+        return None if root == incident_id else root
+
+    def record_member(self, root: str, incident_id: str, event: Dict[str, Any], now_ms: int) -> None:
+        """Record a correlated alarm under its root so the root's analysis can include it."""
+        self.table.put_item(
+            Item={
+                'incidentId': f'{MEMBERS_PREFIX}{root}',
+                'timestamp': now_ms,
+                'memberId': incident_id,
+                'memberAlarm': event['detail']['alarmName'],
+                'memberState': event['detail']['state']['value'],
+                'memberReason': event['detail']['state'].get('reason', ''),
+                'ttl': now_ms // 1000 + 7 * 86400
+            }
+        )
+
+    def _live_records(self, services: Set[str], now: int) -> List[Dict[str, Any]]:
+        keys = [{'incidentId': f'{CORRELATION_PREFIX}{service}', 'timestamp': 0} for service in sorted(services)]
+        items: List[Dict[str, Any]] = []
+
+        # BatchGetItem takes at most 100 keys per call
+        for start in range(0, len(keys), 100):
+            request = {self.table.name: {'Keys': keys[start:start + 100], 'ConsistentRead': True}}
+            while request:
+                response = self.table.meta.client.batch_get_item(RequestItems=request)
+                items.extend(response['Responses'].get(self.table.name, []))
+                request = response.get('UnprocessedKeys') or None
+
+        return [
+            item for item in items
+            if int(item['expiresAt']) >= now and now - int(item['startedAt']) <= self.max_group_seconds
+        ]
+
+    def _claim(self, services: Set[str], group: str, level: int, started_at: int, now: int) -> None:
+        """Point the alarm's services at the group and extend the correlation window."""
+        with self.table.batch_writer() as batch:
+            for service in services:
+                batch.put_item(
+                    Item={
+                        'incidentId': f'{CORRELATION_PREFIX}{service}',
+                        'timestamp': 0,
+                        'groupId': group,
+                        'rootLevel': level,
+                        'startedAt': started_at,
+                        'expiresAt': now + self.window_seconds,
+                        'ttl': now + self.max_group_seconds + 86400
+                    }
+                )
+
+    def _union(self, groups: UnionFind, a: str, b: str, now: int) -> None:
+        merged = groups.union(a, b)
+        if merged:
+            self._save_parent(*merged, groups.levels.get(merged[1], 0), now)
+            print(f"Correlation groups merged: {merged[0]} -> {merged[1]}")
+
+    def _adopt(self, group: str, root: str, now: int) -> None:
+        """Record a root taken over by a more upstream one, and its members, as members of the new root."""
+        members = self.table.query(
+            KeyConditionExpression='incidentId = :members',
+            ExpressionAttributeValues={':members': f'{MEMBERS_PREFIX}{group}'}
+        )['Items']
+        latest = self.table.query(
+            KeyConditionExpression='incidentId = :id AND #ts > :zero',
+            ExpressionAttributeNames={'#ts': 'timestamp'},
+            ExpressionAttributeValues={':id': group, ':zero': 0},
+            ScanIndexForward=False,
+            Limit=1
+        )['Items']
+
+        with self.table.batch_writer() as batch:
+            for item in members:
+                batch.put_item(Item=dict(item, incidentId=f'{MEMBERS_PREFIX}{root}'))
+        if latest and 'originalEvent' in latest[0]:
+            self.record_member(root, group, json.loads(latest[0]['originalEvent']), now * 1000)
+
+        print(f"Correlation root {group} taken over by upstream incident {root}")
+
+    def _load_parent(self, group: str) -> Optional[Tuple[str, int]]:
+        item = self.table.get_item(Key={'incidentId': f'{GROUP_PREFIX}{group}', 'timestamp': 0}).get('Item')
+        return (item['parent'], int(item.get('parentLevel', 0))) if item else None
+
+    def _save_parent(self, group: str, parent: str, parent_level: int, now: int) -> None:
+        self.table.put_item(
+            Item={
+                'incidentId': f'{GROUP_PREFIX}{group}',
+                'timestamp': 0,
+                'parent': parent,
+                'parentLevel': parent_level,
+                'ttl': now + self.max_group_seconds + 86400
+            }
+        )
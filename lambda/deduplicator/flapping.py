@@ -0,0 +1,207 @@
+"""
+Flap Suppression for Alarms Cycling Between ALARM and OK
+
+Keeps the recent ALARM/OK transitions of each fingerprint in a small ring
+buffer stored on a reserved record in the incident history table and runs a
+hysteresis state machine over it:
+
+    stable   -> flapping  when at least ``enter_transitions`` transitions fall
+                          within ``window_seconds``
+    flapping -> stable    once a transition follows the previous one after at
+                          least ``quiet_seconds`` of silence
+
+The first ALARM of a flapping episode forwards one consolidated "flapping"
+incident. After that, and for ordinary alarms, transitions only produce cheap state
+updates for the open incident (OK resolves it, ALARM reopens it) and never
+start a new analysis run. Repeats of the state a container last saw for a
+fingerprint skip the read for a few seconds, so alarm storms do not turn the
+flap record into a hot key.
+"""
+
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+STABLE = 'stable'
+FLAPPING = 'flapping'
+
+# Decisions for the deduplicator
+INCIDENT = 'incident'                     # normal dedup window path
+FLAPPING_INCIDENT = 'flapping_incident'   # forward one consolidated flapping incident
+RESOLVE = 'resolve'                       # forward a resolution update for the open incident
+REOPEN = 'reopen'                         # forward a reopen update for the open incident
+SUPPRESS = 'suppress'                     # nothing to forward
+
+TRACKED_STATES = ('ALARM', 'OK')
+
+
+def state_key(incident_id: str) -> Dict[str, Any]:
+    """Reserved key in the incident history table holding a fingerprint's flap state."""
+    return {'incidentId': f'flap#{incident_id}', 'timestamp': 0}
+
+
+def encode_transition(epoch_seconds: int, alarm_state: str) -> int:
+    """Pack a transition into one number: time in the high bits, ALARM in the low bit."""
+    return epoch_seconds * 2 + (1 if alarm_state == 'ALARM' else 0)
+
+
+def decode_transition(value: int) -> Tuple[int, str]:
+    return value // 2, 'ALARM' if value & 1 else 'OK'
+
+
+def repeat_action(alarm_state: str, mode: str) -> str:
+    """Same state again is not a transition; stable ALARM repeats go through the dedup window."""
+    return INCIDENT if alarm_state == 'ALARM' and mode == STABLE else SUPPRESS
+
+
+class FlapDecision:
+    """What the deduplicator should do with one alarm state change."""
+
+    __slots__ = ('action', 'mode', 'transitions', 'flapping_since', 'changed')
+
+    def __init__(self, action: str, mode: str = STABLE, transitions: Optional[List[int]] = None,
+                 flapping_since: Optional[int] = None, changed: bool = False):
+        self.action = action
+        self.mode = mode
+        self.transitions = transitions or []
+        self.flapping_since = flapping_since
+        self.changed = changed
+
+    def summary(self) -> Dict[str, Any]:
+        """Flap details forwarded with incidents and state updates."""
+        return {
+            'mode': self.mode,
+            'since': self.flapping_since,
+            'transitions': [list(decode_transition(value)) for value in self.transitions]
+        }
+
+
+class FlapDetector:
+    """Per-fingerprint ring buffer of ALARM/OK transitions with hysteresis."""
+
+    def __init__(self, table, ring_size: int = 8, enter_transitions: int = 4,
+                 window_seconds: int = 900, quiet_seconds: int = 1800, max_attempts: int = 3,
+                 cache_seconds: int = 5):
+        self.table = table
+        self.ring_size = ring_size
+        self.enter_transitions = enter_transitions
+        self.window_seconds = window_seconds
+        self.quiet_seconds = quiet_seconds
+        self.max_attempts = max_attempts
+        self.cache_seconds = cache_seconds
+        self._last_seen: Dict[str, Tuple[str, str, float]] = {}
+
+    @classmethod
+    def from_env(cls, table) -> 'FlapDetector':
+        """Build a detector configured from FLAP_* environment variables."""
+        return cls(
+            table=table,
+            ring_size=int(os.environ.get('FLAP_RING_SIZE', '8')),
+            enter_transitions=int(os.environ.get('FLAP_ENTER_TRANSITIONS', '4')),
+            window_seconds=int(os.environ.get('FLAP_WINDOW_SECONDS', '900')),
+            quiet_seconds=int(os.environ.get('FLAP_QUIET_SECONDS', '1800'))
+        )
+
+    def record(self, incident_id: str, alarm_state: str, epoch_seconds: int) -> FlapDecision:
+        """
+        Record an alarm state change and decide how to forward it.
+
+        Args:
+            incident_id: Alarm fingerprint
+            alarm_state: New state value from the alarm event
+            epoch_seconds: Time of the state change
+
+        Returns:
+            Decision; states other than ALARM and OK always take the normal path
+        """
+        if alarm_state not in TRACKED_STATES:
+            return FlapDecision(INCIDENT)
+
+        cached = self._last_seen.get(incident_id)
+        if cached and cached[0] == alarm_state and time.time() - cached[2] < self.cache_seconds:
+            return FlapDecision(repeat_action(alarm_state, cached[1]), cached[1])
+
+        for _ in range(self.max_attempts):
+            item = self.table.get_item(Key=state_key(incident_id), ConsistentRead=True).get('Item') or {}
+            decision, updated = self._transition(item, alarm_state, epoch_seconds)
+
+            try:
+                if updated is not None:
+                    self._save(incident_id, item, updated)
+                if len(self._last_seen) >= 10000:
+                    self._last_seen.clear()
+                self._last_seen[incident_id] = (alarm_state, decision.mode, time.time())
+                return decision
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+                # Another container recorded a transition first; replay on top of it
+
+        raise RuntimeError(f"Flap state for {incident_id} kept changing, gave up after {self.max_attempts} attempts")
+
+    def _transition(self, item: Dict[str, Any], alarm_state: str, now: int):
+        """Apply one state change to a stored flap record; returns (decision, updated fields or None)."""
+        ring = [int(value) for value in item.get('ring', [])]
+        mode = item.get('mode', STABLE)
+        is_open = bool(item.get('open', False))
+        reported = bool(item.get('reported', False))
+        flapping_since = int(item['flappingSince']) if item.get('flappingSince') is not None else None
+
+        if ring:
+            last_time, last_state = decode_transition(ring[-1])
+            if now < last_time:
+                # Late delivery of an older change
+                return FlapDecision(SUPPRESS, mode, ring, flapping_since), None
+            if last_state == alarm_state:
+                return FlapDecision(repeat_action(alarm_state, mode), mode, ring, flapping_since), None
+
+        previous_time = decode_transition(ring[-1])[0] if ring else None
+        ring = (ring + [encode_transition(now, alarm_state)])[-self.ring_size:]
+        recent = sum(1 for value in ring if decode_transition(value)[0] >= now - self.window_seconds)
+
+        if mode == STABLE and recent >= self.enter_transitions:
+            mode, flapping_since, reported = FLAPPING, now, False
+            print(f"Alarm started flapping: {recent} transitions in {self.window_seconds}s")
+        elif mode == FLAPPING and previous_time is not None and now - previous_time >= self.quiet_seconds:
+            mode, flapping_since, reported = STABLE, None, False
+            print(f"Alarm stopped flapping after {now - previous_time}s without transitions")
+
+        if alarm_state == 'OK':
+            action = RESOLVE if is_open else SUPPRESS
+            is_open = False
+        elif mode == FLAPPING and not reported:
+            # The first ALARM of a flapping episode is forwarded once, labelled
+            action = FLAPPING_INCIDENT
+            is_open = reported = True
+        elif mode == FLAPPING:
+            action = REOPEN
+            is_open = True
+        else:
+            # The dedup window decides; a duplicate reopens the incident instead
+            action = INCIDENT
+            is_open = True
+
+        updated = {
+            'ring': ring,
+            'mode': mode,
+            'open': is_open,
+            'reported': reported,
+            'flappingSince': flapping_since,
+            'ttl': now + 7 * 86400
+        }
+        return FlapDecision(action, mode, ring, flapping_since, changed=True), updated
+
+    def _save(self, incident_id: str, item: Dict[str, Any], updated: Dict[str, Any]) -> None:
+        """Write the flap record, failing if another writer got there first."""
+        version = int(item.get('version', 0))
+        new_item = dict(state_key(incident_id), version=version + 1, **updated)
+
+        if item:
+            condition = {'ConditionExpression': 'version = :version',
+                         'ExpressionAttributeValues': {':version': version}}
+        else:
+            condition = {'ConditionExpression': 'attribute_not_exists(incidentId)'}
+
+        self.table.put_item(Item=new_item, **condition)
@@ -2,16 +2,32 @@
 Incident Deduplicator Lambda Function
 
 This function receives CloudWatch alarm events and checks for duplicate incidents
-to prevent unnecessary processing and costs.
+to prevent unnecessary processing and costs. New incidents are recorded together
+with the event that forwards them (a transactional outbox), so a failed forward
+is retried by the outbox sweeper instead of being lost behind the dedup record.
+With FAIR_SCHEDULING on, new incidents go to per-account queues instead and the
+fair scheduler forwards them.
 """
 
 import json
 import os
 import boto3
 import hashlib
+from botocore.exceptions import ClientError
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 
+from shared.envelope import IncidentEnvelope
+from shared.fairqueue import queue_partition, register_account
+from shared.incident import Incident, InvalidEventError
+from shared.outbox import OUTBOX_PARTITION, outbox_item, put_events
+from shared.status import index_occurrence
+from shared.tracing import Trace, now_ms, parse_event_time
+from correlation import CorrelationIndex
+from flapping import FLAPPING_INCIDENT, INCIDENT, REOPEN, RESOLVE, SUPPRESS, FlapDecision, FlapDetector
+from sharding import ShardRouter
+from windows import AdaptiveWindow
+
 # Initialize AWS clients
 dynamodb = boto3.resource('dynamodb')
 events_client = boto3.client('events')
@@ -20,10 +36,29 @@ events_client = boto3.client('events')
 INCIDENT_HISTORY_TABLE = os.environ['INCIDENT_HISTORY_TABLE']
 ENVIRONMENT = os.environ.get('ENVIRONMENT', 'dev')
 LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+# Send the forward right after recording; when false the outbox sweeper sends everything
+OUTBOX_INLINE_FORWARD = os.environ.get('OUTBOX_INLINE_FORWARD', 'true').lower() == 'true'
+# Queue new incidents per account for the fair scheduler instead of forwarding them directly
+FAIR_SCHEDULING = os.environ.get('FAIR_SCHEDULING', 'false').lower() == 'true'
 
 # Initialize DynamoDB table
 incident_table = dynamodb.Table(INCIDENT_HISTORY_TABLE)
 
+# Hot fingerprint detection is per container and lives across warm invocations
+shard_router = ShardRouter.from_env()
+
+# ALARM/OK transition history per fingerprint, for flap suppression
+flap_detector = FlapDetector.from_env(incident_table)
+
+# Dedup window per fingerprint, learned from how often its alarm fires
+dedup_windows = AdaptiveWindow.from_env(incident_table)
+
+# Service topology is loaded once per container (the bundled file is empty; see topology.example.json)
+correlation_index = CorrelationIndex.from_env(
+    incident_table,
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'topology.json')
+)
+
 def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
     """
     Main Lambda handler for incident deduplication.
@@ -35,23 +70,70 @@ def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
     Returns:
         Dict with processing status
     """
-    print(f"Received event: {json.dumps(event)}")
+    # The alarm event is encoded once here and reused for every sink
+    envelope = IncidentEnvelope(None, event, trace=Trace.start(event))
+    trace = envelope.trace
+    
+    print(f"Received event: {envelope.event_json}")
     
     try:
-        # Extract alarm information
-        alarm_name = event['detail']['alarmName']
-        alarm_state = event['detail']['state']['value']
-        region = event['region']
-        account = event['account']
+        # Validate and extract alarm information before any AWS call
+        incident = Incident.from_event(event)
+        alarm_name = incident.alarm_name
+        alarm_state = incident.state
+        region = incident.region
+        account = incident.account
         timestamp = datetime.utcnow()
         
         # Create incident ID based on alarm characteristics
         incident_id = generate_incident_id(alarm_name, region, account)
+        envelope.incident_id = incident_id
         
         print(f"Processing incident: {incident_id}")
         
-        # Check for recent duplicate incidents
-        if is_duplicate_incident(incident_id, timestamp):
+        # Noisy fingerprints spread their dedup traffic over shard keys
+        hot = shard_router.observe(incident_id)
+        
+        # Flapping alarms and OK transitions never start a new analysis run
+        with trace.span('dedup.flap'):
+            flap = check_flapping(incident_id, incident, timestamp)
+        
+        if flap.action == SUPPRESS:
+            print(f"State change suppressed ({flap.mode}): {incident_id}")
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': 'State change suppressed',
+                    'incidentId': incident_id,
+                    'action': 'suppressed'
+                })
+            }
+        
+        if flap.action in (RESOLVE, REOPEN):
+            forward_state_change(incident_id, alarm_state, flap)
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': 'State change forwarded',
+                    'incidentId': incident_id,
+                    'action': 'resolved' if flap.action == RESOLVE else 'reopened'
+                })
+            }
+        
+        # Check for recent duplicate incidents; a flapping incident is forwarded once per episode
+        if flap.action == FLAPPING_INCIDENT:
+            envelope.flapping = flap.summary()
+            duplicate = False
+        else:
+            with trace.span('dedup.check'):
+                window_seconds = dedup_window(incident_id, timestamp, hot)
+                duplicate = is_duplicate_incident(incident_id, timestamp, window_seconds, hot=hot)
+        
+        if duplicate and flap.changed:
+            # Back in ALARM within the window: reopen the incident instead of analysing it again
+            forward_state_change(incident_id, alarm_state, flap)
+        
+        if duplicate:
             print(f"Duplicate incident detected: {incident_id}")
             return {
                 'statusCode': 200,
@@ -62,20 +144,66 @@ def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
                 })
             }
         
-        # Record new incident
-        record_incident(incident_id, event, timestamp)
+        # Alarms on related services join the root incident of their cascade
+        with trace.span('dedup.correlate'):
+            root_id = correlate_incident(incident_id, event, timestamp)
         
-        # Forward to main incident handler
-        forward_to_handler(incident_id, event)
+        envelope.recorded_at = int(timestamp.timestamp() * 1000)
         
-        print(f"New incident forwarded: {incident_id}")
+        # New incidents wait in their account's queue; the fair scheduler forwards them
+        partition = OUTBOX_PARTITION
+        if FAIR_SCHEDULING and not root_id and queue_account(account, envelope.recorded_at):
+            partition = queue_partition(account)
+            envelope.queued_account = account
+        
+        if root_id:
+            entry = correlation_entry(incident_id, root_id)
+        else:
+            entry = new_incident_entry(envelope)
+        
+        # Record new incident and its pending forward in one transaction
+        with trace.span('dedup.record'):
+            outbox_key = record_incident(incident_id, incident, timestamp, envelope.event_json, hot=hot,
+                                         forward=entry, partition=partition)
+        
+        # Forward to main incident handler; the outbox sweeper retries anything left pending
+        forwarded = False
+        if OUTBOX_INLINE_FORWARD and partition == OUTBOX_PARTITION:
+            if not root_id:
+                # Re-stamped so the forwarded trace includes the record span
+                entry = new_incident_entry(envelope)
+            forwarded = forward_pending(incident_id, outbox_key, entry)
+        
+        if root_id:
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': 'Incident correlated with root incident',
+                    'incidentId': incident_id,
+                    'rootIncidentId': root_id,
+                    'action': 'correlated' if forwarded else 'queued'
+                })
+            }
+        
+        print(f"New incident {'forwarded' if forwarded else 'queued for forwarding'}: {incident_id}")
         
         return {
             'statusCode': 200,
             'body': json.dumps({
                 'message': 'New incident processed',
                 'incidentId': incident_id,
-                'action': 'forwarded'
+                'action': 'forwarded' if forwarded else 'queued'
+            })
+        }
+        
+    except InvalidEventError as e:
+        print(f"Rejected event: {str(e)}")
+        return {
+            'statusCode': 400,
+            'body': json.dumps({
+                'message': 'Invalid alarm event',
+                'field': e.field,
+                'error': str(e)
             })
         }
         
@@ -94,83 +222,310 @@ def generate_incident_id(alarm_name: str, region: str, account: str) -> str:
     content = f"{alarm_name}:{region}:{account}"
     return hashlib.md5(content.encode()).hexdigest()[:16]
 
-def is_duplicate_incident(incident_id: str, current_time: datetime, window_minutes: int = 15) -> bool:
+def dedup_window(incident_id: str, timestamp: datetime, hot: bool = False) -> int:
+    """Record the ALARM arrival and return the fingerprint's dedup window; errors fall back to the default."""
+    try:
+        return dedup_windows.observe(incident_id, int(timestamp.timestamp()), hot=hot)
+    except Exception as e:
+        print(f"Error updating dedup window: {str(e)}")
+        return dedup_windows.default_seconds
+
+def is_duplicate_incident(incident_id: str, current_time: datetime, window_seconds: int = 900,
+                          hot: bool = False) -> bool:
     """
     Check if this incident occurred recently (within the time window).
     
     Args:
         incident_id: Unique incident identifier
         current_time: Current timestamp
-        window_minutes: Deduplication window in minutes
+        window_seconds: Deduplication window in seconds
+        hot: Answer from the container's known records or one random shard key
         
     Returns:
         True if duplicate found, False otherwise
     """
     try:
         # Calculate time window
-        window_start = current_time - timedelta(minutes=window_minutes)
+        window_start = current_time - timedelta(seconds=window_seconds)
         window_start_timestamp = int(window_start.timestamp() * 1000)
         
-        # Query recent incidents
-        response = incident_table.query(
-            KeyConditionExpression='incidentId = :incident_id AND #ts >= :window_start',
-            ExpressionAttributeNames={
-                '#ts': 'timestamp'
-            },
-            ExpressionAttributeValues={
-                ':incident_id': incident_id,
-                ':window_start': window_start_timestamp
-            },
-            Limit=1
-        )
-        
-        return len(response['Items']) > 0
+        if not hot:
+            return has_recent_record(incident_id, window_start_timestamp) is not None
+        
+        # A live record already seen in this container answers every repeat in the window
+        if shard_router.known_record(incident_id) >= window_start_timestamp:
+            return True
+        
+        recorded_ms = has_recent_record(shard_router.read_key(incident_id), window_start_timestamp)
+        if recorded_ms is None:
+            # Recorded before the fingerprint turned hot: copy it to the shards once
+            recorded_ms = has_recent_record(incident_id, window_start_timestamp)
+            if recorded_ms is not None:
+                record_shard_copies(incident_id, recorded_ms)
+        if recorded_ms is None:
+            return False
+        
+        shard_router.remember_record(incident_id, recorded_ms)
+        return True
         
     except Exception as e:
         print(f"Error checking for duplicates: {str(e)}")
         return False
 
-def record_incident(incident_id: str, event: Dict[str, Any], timestamp: datetime) -> None:
-    """Record the incident in DynamoDB."""
+def has_recent_record(key: str, window_start_timestamp: int) -> Optional[int]:
+    """Query one dedup key for its newest record at or after the window start (epoch ms)."""
+    response = incident_table.query(
+        KeyConditionExpression='incidentId = :incident_id AND #ts >= :window_start',
+        ProjectionExpression='#ts',
+        ExpressionAttributeNames={
+            '#ts': 'timestamp'
+        },
+        ExpressionAttributeValues={
+            ':incident_id': key,
+            ':window_start': window_start_timestamp
+        },
+        ScanIndexForward=False,
+        Limit=1
+    )
+    
+    return int(response['Items'][0]['timestamp']) if response['Items'] else None
+
+def record_incident(incident_id: str, incident: Incident, timestamp: datetime,
+                    event_json: Optional[str] = None, hot: bool = False,
+                    forward: Optional[Dict[str, str]] = None,
+                    partition: str = OUTBOX_PARTITION) -> Optional[int]:
+    """
+    Record the incident in DynamoDB, reusing the encoded event when given.
+    
+    With a forward entry, the record and an outbox entry holding it are
+    written in one transaction, so the incident is never recorded without
+    its forward pending. The entry goes to the given outbox partition: the
+    shared outbox, or an account's queue with fair scheduling. For a hot
+    fingerprint the record is also copied to every shard key, so duplicate
+    checks can read any one of them.
+    
+    Returns:
+        Sort key of the outbox entry, or None without a forward entry
+    """
+    item = {
+        'incidentId': incident_id,
+        'timestamp': int(timestamp.timestamp() * 1000),
+        'status': 'new',
+        'alarmName': incident.alarm_name,
+        'alarmState': incident.state,
+        'region': incident.region,
+        'account': incident.account,
+        'originalEvent': event_json if event_json is not None else json.dumps(incident.event),
+        'createdAt': timestamp.isoformat(),
+        'ttl': int((timestamp + timedelta(days=90)).timestamp())  # Auto-cleanup after 90 days
+    }
+    
     try:
-        incident_table.put_item(
-            Item={
-                'incidentId': incident_id,
-                'timestamp': int(timestamp.timestamp() * 1000),
-                'status': 'new',
-                'alarmName': event['detail']['alarmName'],
-                'alarmState': event['detail']['state']['value'],
-                'region': event['region'],
-                'account': event['account'],
-                'originalEvent': json.dumps(event),
-                'createdAt': timestamp.isoformat(),
-                'ttl': int((timestamp + timedelta(days=90)).timestamp())  # Auto-cleanup after 90 days
-            }
-        )
+        outbox_key = None
+        if forward is None:
+            incident_table.put_item(Item=item)
+        else:
+            outbox_key = write_with_outbox(item, incident_id, forward, partition)
         print(f"Incident recorded: {incident_id}")
         
+        index_incident(incident_id, incident, item['timestamp'])
+        
+        if hot:
+            record_shard_copies(incident_id, item['timestamp'])
+            shard_router.remember_record(incident_id, item['timestamp'])
+        
+        return outbox_key
+        
     except Exception as e:
         print(f"Error recording incident: {str(e)}")
         raise
 
-def forward_to_handler(incident_id: str, original_event: Dict[str, Any]) -> None:
-    """Forward new incident to the main handler via EventBridge."""
+def write_with_outbox(item: Dict[str, Any], incident_id: str, forward: Dict[str, str],
+                      partition: str = OUTBOX_PARTITION) -> int:
+    """
+    Write an incident record and its outbox entry atomically.
+    
+    Outbox sort keys are write times; step past another entry written in the
+    same millisecond.
+    
+    Returns:
+        Sort key of the outbox entry
+    """
+    # The resource's client serializes native values for every operation, transactions included
+    written_at = now_ms()
+    
+    for offset in range(5):
+        pending = outbox_item(incident_id, forward, written_at + offset, partition=partition)
+        try:
+            incident_table.meta.client.transact_write_items(TransactItems=[
+                {'Put': {'TableName': INCIDENT_HISTORY_TABLE, 'Item': item}},
+                {'Put': {
+                    'TableName': INCIDENT_HISTORY_TABLE,
+                    'Item': pending,
+                    'ConditionExpression': 'attribute_not_exists(incidentId)'
+                }}
+            ])
+            return pending['timestamp']
+        except ClientError as e:
+            reasons = e.response.get('CancellationReasons') or []
+            if len(reasons) < 2 or reasons[1].get('Code') != 'ConditionalCheckFailed':
+                raise
+    
+    raise RuntimeError(f"No free outbox slot for incident {incident_id}")
+
+def index_incident(incident_id: str, incident: Incident, recorded_ms: int) -> None:
+    """Add a recorded incident to the status listing index; a miss only hides it from listings."""
+    try:
+        index_occurrence(incident_table, incident_id, recorded_ms, incident.alarm_name,
+                         incident.region, incident.account)
+    except Exception as e:
+        print(f"Error indexing incident for status listings: {str(e)}")
+
+def queue_account(account: str, now: int) -> bool:
+    """
+    Register an account with the fair scheduler before queueing its incident.
+    
+    Returns:
+        True if the incident can be queued; False forwards it through the shared outbox
+    """
+    try:
+        register_account(incident_table, account, now)
+        return True
+    except Exception as e:
+        # An unregistered queue would never be dispatched; skipping fairness is better than stranding it
+        print(f"Error registering account for fair scheduling: {str(e)}")
+        return False
+
+def forward_pending(incident_id: str, outbox_key: int, entry: Dict[str, str]) -> bool:
+    """
+    Send an outbox entry now and clear it once EventBridge accepted it.
+    
+    Returns:
+        True if sent; False leaves the entry for the outbox sweeper
+    """
+    if put_events(events_client, [entry]):
+        print(f"Forward failed, left in outbox: {incident_id}")
+        return False
+    
+    try:
+        incident_table.delete_item(Key={'incidentId': OUTBOX_PARTITION, 'timestamp': outbox_key})
+    except Exception as e:
+        # The sweeper sends it again; the handler's idempotency claim absorbs the repeat
+        print(f"Error clearing outbox entry: {str(e)}")
+    
+    print(f"Event forwarded to handler: {incident_id} ({entry['DetailType']})")
+    return True
+
+def record_shard_copies(incident_id: str, recorded_ms: int) -> None:
+    """Write key-only copies of an incident record (sort key in epoch ms) to its shard keys."""
+    try:
+        with incident_table.batch_writer() as batch:
+            for key in shard_router.fanout_keys(incident_id):
+                batch.put_item(
+                    Item={
+                        'incidentId': key,
+                        'timestamp': recorded_ms,
+                        'shardOf': incident_id,
+                        'ttl': recorded_ms // 1000 + 86400
+                    }
+                )
+        
+    except Exception as e:
+        # The base record is written; a check that finds its shard empty reads the base key
+        print(f"Error writing dedup shard copies: {str(e)}")
+
+def check_flapping(incident_id: str, incident: Incident, timestamp: datetime) -> FlapDecision:
+    """Record the alarm's state change; errors fall back to the normal dedup path."""
+    changed_at = parse_event_time(incident.state_timestamp)
+    epoch_seconds = changed_at // 1000 if changed_at else int(timestamp.timestamp())
+    
+    try:
+        return flap_detector.record(incident_id, incident.state, epoch_seconds)
+    except Exception as e:
+        print(f"Error checking for flapping: {str(e)}")
+        return FlapDecision(INCIDENT)
+
+def correlate_incident(incident_id: str, event: Dict[str, Any], timestamp: datetime) -> Optional[str]:
+    """
+    Group the incident with live incidents on related services.
+    
+    Returns:
+        Root incident ID if the incident joined a cascade, None to forward it as its own root
+    """
+    try:
+        root_id = correlation_index.correlate(incident_id, event, int(timestamp.timestamp()))
+        if root_id:
+            correlation_index.record_member(root_id, incident_id, event, int(timestamp.timestamp() * 1000))
+            print(f"Incident {incident_id} correlated with root incident {root_id}")
+        return root_id
+        
+    except Exception as e:
+        # Analysing the alarm on its own is better than dropping it
+        print(f"Error correlating incident: {str(e)}")
+        return None
+
+def correlation_entry(incident_id: str, root_id: str) -> Dict[str, str]:
+    """EventBridge entry telling the handler an incident is covered by its root incident's analysis."""
+    return {
+        'Source': 'devops.agent',
+        'DetailType': 'Incident Correlated',
+        'Detail': json.dumps({
+            'incidentId': incident_id,
+            'rootIncidentId': root_id,
+            'processedAt': datetime.utcnow().isoformat()
+        })
+    }
+
+def forward_state_change(incident_id: str, alarm_state: str, flap: FlapDecision) -> None:
+    """
+    Forward a state change for the open incident, without a new analysis run.
+    
+    Args:
+        incident_id: Unique incident identifier
+        alarm_state: ALARM (reopen) or OK (resolve)
+        flap: Flap decision; its transitions travel with the update
+    """
     try:
-        # Create custom event for the main handler
-        custom_event = {
+        events_client.put_events(Entries=[{
             'Source': 'devops.agent',
-            'DetailType': 'New Incident Detected',
+            'DetailType': 'Incident State Changed',
             'Detail': json.dumps({
                 'incidentId': incident_id,
-                'originalEvent': original_event,
+                'alarmState': alarm_state,
+                'flapping': flap.summary(),
                 'processedAt': datetime.utcnow().isoformat()
             })
-        }
-        
-        # Send to EventBridge
-        events_client.put_events(Entries=[custom_event])
-        print(f"Event forwarded to handler: {incident_id}")
+        }])
+        print(f"State change forwarded to handler: {incident_id} -> {alarm_state}")
         
     except Exception as e:
-        print(f"Error forwarding event: {str(e)}")
-        raise
\ No newline at end of file
+        print(f"Error forwarding state change: {str(e)}")
+        raise
+
+def new_incident_entry(envelope: IncidentEnvelope) -> Dict[str, str]:
+    """
+    EventBridge entry forwarding a new incident to the main handler.
+    
+    Each call stamps a fresh detail, so the trace carries the spans recorded
+    so far.
+    
+    Args:
+        envelope: Incident envelope; its trace and recordedAt travel with the event
+    """
+    stamped = IncidentEnvelope(
+        envelope.incident_id,
+        envelope.original_event,
+        event_json=envelope.event_json,
+        processed_at=datetime.utcnow().isoformat(),
+        recorded_at=envelope.recorded_at,
+        forwarded_at=now_ms(),
+        trace=envelope.trace,
+        flapping=envelope.flapping,
+        queued_account=envelope.queued_account
+    )
+    
+    return {
+        'Source': 'devops.agent',
+        'DetailType': 'New Incident Detected',
+        'Detail': stamped.detail_json
+    }
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""
+Write-sharded Dedup Keys for Hot Fingerprints
+
+During an alarm storm every repeat of a noisy alarm checks the same incidentId
+partition. Fingerprints that arrive faster than a threshold are detected per
+container and switched to sharded keys (<incidentId>#s<k>):
+
+    - a new incident record is written to the base key as usual and, for a
+      hot fingerprint, also fanned out to every shard key in one batch write;
+      this happens at most once per dedup window
+    - duplicate checks for a hot fingerprint read one random shard, so the
+      repeat traffic is spread over N partitions instead of one
+
+A record written before the fingerprint turned hot has no shard copies. The
+first hot check in a container that finds its shard empty reads the base key
+once and, if the record is live, fans it out to the shards then. Every live
+record a container has seen for a hot fingerprint is remembered for as long
+as it stays hot, so repeats within the dedup window are answered without any
+read. Shard copies carry only their key, a shardOf pointer and a TTL, so
+history exports that read occurrence attributes skip them.
+"""
+
+import os
+import random
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List
+
+
+class HotKeyDetector:
+    """Per-container sliding-window arrival counter for fingerprints."""
+
+    def __init__(self, threshold: int = 20, window_seconds: int = 60, max_keys: int = 10000):
+        self.threshold = threshold
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._arrivals: 'OrderedDict[str, Deque[float]]' = OrderedDict()
+
+    def observe(self, key: str) -> bool:
+        """
+        Record an arrival for key.
+
+        Returns:
+            True if the key has crossed the hot threshold within the window
+        """
+        now = time.time()
+        arrivals = self._arrivals.get(key)
+        if arrivals is None:
+            arrivals = deque(maxlen=self.threshold)
+            self._arrivals[key] = arrivals
+            if len(self._arrivals) > self.max_keys:
+                self._arrivals.popitem(last=False)
+        else:
+            self._arrivals.move_to_end(key)
+
+        arrivals.append(now)
+        return len(arrivals) >= self.threshold and now - arrivals[0] <= self.window_seconds
+
+
+class ShardRouter:
+    """Chooses base or shard keys for a fingerprint based on its arrival rate."""
+
+    def __init__(self, shards: int, detector: HotKeyDetector):
+        self.shards = shards
+        self.detector = detector
+        # Hot fingerprints and the newest live record seen for each (epoch ms, 0 if none yet)
+        self._hot: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> 'ShardRouter':
+        """Build a router from DEDUP_* environment variables (DEDUP_SHARDS=0 disables sharding)."""
+        return cls(
+            shards=int(os.environ.get('DEDUP_SHARDS', '8')),
+            detector=HotKeyDetector(
+                threshold=int(os.environ.get('DEDUP_HOT_THRESHOLD', '20')),
+                window_seconds=int(os.environ.get('DEDUP_HOT_WINDOW_SECONDS', '60'))
+            )
+        )
+
+    def observe(self, incident_id: str) -> bool:
+        """Record an arrival and return whether the fingerprint is hot."""
+        if self.shards <= 1:
+            return False
+
+        hot = self.detector.observe(incident_id)
+        if hot and incident_id not in self._hot:
+            print(f"Hot fingerprint detected, sharding dedup keys: {incident_id}")
+            self._hot[incident_id] = 0
+        elif not hot:
+            self._hot.pop(incident_id, None)
+        return hot
+
+    def known_record(self, incident_id: str) -> int:
+        """Newest record of a hot fingerprint this container has seen (epoch ms), 0 if none."""
+        return self._hot.get(incident_id, 0)
+
+    def remember_record(self, incident_id: str, recorded_ms: int) -> None:
+        """Remember a live record of a hot fingerprint so repeats skip the table."""
+        if incident_id in self._hot and recorded_ms > self._hot[incident_id]:
+            self._hot[incident_id] = recorded_ms
+
+    @staticmethod
+    def shard_key(incident_id: str, shard: int) -> str:
+        return f"{incident_id}#s{shard}"
+
+    def read_key(self, incident_id: str) -> str:
+        """One random shard key to spread duplicate-check reads."""
+        return self.shard_key(incident_id, random.randrange(self.shards))
+
+    def fanout_keys(self, incident_id: str) -> List[str]:
+        """Every shard key a new incident record is copied to."""
+        return [self.shard_key(incident_id, shard) for shard in range(self.shards)]
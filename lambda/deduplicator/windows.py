@@ -0,0 +1,207 @@
+"""
+Adaptive Dedup Windows from Inter-arrival Statistics
+
+Learns how often each fingerprint's alarm fires and sizes its dedup window
+from that instead of a fixed 15 minutes. Per fingerprint, a small reserved
+record in the incident history table keeps:
+
+    gapEwma    exponentially weighted moving average of the gap between
+               ALARM arrivals (seconds), reacting quickly to a change in cadence
+    gapSketch  decayed histogram of gaps over log-spaced buckets from 10 s to
+               a week, a compact quantile sketch of the longer-run distribution
+
+The window is ``margin`` times the typical gap (the sketch median, or the
+EWMA when it has dropped below it), clamped to the configured bounds:
+
+    - a chronic repeater with a steady cadence (daily batch job) gets a window
+      just past its cadence, so each repeat folds into the open incident
+    - an alarm whose repeats come in quick bursts gets a short window, so the
+      next burst, a new issue, is forwarded quickly
+    - an irregular alarm keeps the default window rather than a long one, and
+      so does any fingerprint with too few arrivals to judge
+"""
+
+import math
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Gap buckets: [0, 10 s), then log-spaced up to a week, then everything longer
+SKETCH_MIN_GAP = 10
+SKETCH_MAX_GAP = 7 * 86400
+SKETCH_BUCKETS = 24
+SKETCH_RATIO = (SKETCH_MAX_GAP / SKETCH_MIN_GAP) ** (1 / (SKETCH_BUCKETS - 2))
+
+# Repeated deliveries of one alarm event arrive within a second; not a gap
+MIN_GAP_SECONDS = 1
+
+
+def stats_key(incident_id: str) -> Dict[str, Any]:
+    """Reserved key in the incident history table holding a fingerprint's arrival statistics."""
+    return {'incidentId': f'dedup-stats#{incident_id}', 'timestamp': 0}
+
+
+def bucket_of(gap: float) -> int:
+    if gap < SKETCH_MIN_GAP:
+        return 0
+    return min(SKETCH_BUCKETS - 1, 1 + int(math.log(gap / SKETCH_MIN_GAP) / math.log(SKETCH_RATIO)))
+
+
+def bucket_value(index: int) -> float:
+    """Representative gap of a bucket (geometric midpoint)."""
+    if index == 0:
+        return SKETCH_MIN_GAP / 2
+    return SKETCH_MIN_GAP * SKETCH_RATIO ** (index - 0.5)
+
+
+class ArrivalStats:
+    """Inter-arrival statistics of one fingerprint."""
+
+    __slots__ = ('arrivals', 'last_seen', 'gap_ewma', 'sketch')
+
+    def __init__(self, arrivals: int = 0, last_seen: Optional[int] = None, gap_ewma: Optional[float] = None,
+                 sketch: Optional[List[float]] = None):
+        self.arrivals = arrivals
+        self.last_seen = last_seen
+        self.gap_ewma = gap_ewma
+        self.sketch = sketch if sketch is not None else [0.0] * SKETCH_BUCKETS
+
+    @classmethod
+    def from_item(cls, item: Optional[Dict[str, Any]]) -> 'ArrivalStats':
+        if not item:
+            return cls()
+        sketch = [float(v) for v in item['gapSketch'].split(',')] if item.get('gapSketch') else None
+        return cls(
+            arrivals=int(item.get('arrivals', 0)),
+            last_seen=int(item['lastSeen']) if 'lastSeen' in item else None,
+            gap_ewma=float(item['gapEwma']) if 'gapEwma' in item else None,
+            sketch=sketch if sketch and len(sketch) == SKETCH_BUCKETS else None
+        )
+
+    def to_item(self, incident_id: str, window_seconds: int) -> Dict[str, Any]:
+        # DynamoDB numbers must not be floats; the sketch travels as one short string
+        item = {
+            **stats_key(incident_id),
+            'arrivals': self.arrivals,
+            'lastSeen': self.last_seen,
+            'gapSketch': ','.join(f"{v:.3g}" for v in self.sketch),
+            'window': window_seconds,
+            'ttl': self.last_seen + 90 * 86400
+        }
+        if self.gap_ewma is not None:
+            item['gapEwma'] = int(round(self.gap_ewma))
+        return item
+
+    def observe(self, epoch_seconds: int, alpha: float, decay: float) -> Optional[int]:
+        """
+        Add one arrival.
+
+        Returns:
+            Gap to the previous arrival in seconds, or None if there is none
+            (first arrival, or a repeat delivery within a second)
+        """
+        previous, self.last_seen = self.last_seen, max(epoch_seconds, self.last_seen or 0)
+        self.arrivals += 1
+        if previous is None or epoch_seconds - previous < MIN_GAP_SECONDS:
+            return None
+
+        gap = epoch_seconds - previous
+        self.gap_ewma = gap if self.gap_ewma is None else alpha * gap + (1 - alpha) * self.gap_ewma
+        self.sketch = [count * decay for count in self.sketch]
+        self.sketch[bucket_of(gap)] += 1.0
+        return gap
+
+    def samples(self) -> float:
+        return sum(self.sketch)
+
+    def quantile(self, q: float) -> Optional[float]:
+        total = self.samples()
+        if total <= 0:
+            return None
+        target = q * total
+        cumulative = 0.0
+        for index, count in enumerate(self.sketch):
+            cumulative += count
+            if cumulative >= target:
+                return bucket_value(index)
+        return bucket_value(SKETCH_BUCKETS - 1)
+
+
+class AdaptiveWindow:
+    """Per-fingerprint dedup window sized from arrival statistics."""
+
+    def __init__(self, table, default_seconds: int = 900, min_seconds: int = 120, max_seconds: int = 36 * 3600,
+                 margin: float = 1.5, regularity: float = 4.0, min_samples: int = 5,
+                 alpha: float = 0.3, decay: float = 0.95):
+        self.table = table
+        self.default_seconds = default_seconds
+        self.min_seconds = min_seconds
+        self.max_seconds = max_seconds
+        self.margin = margin
+        self.regularity = regularity
+        self.min_samples = min_samples
+        self.alpha = alpha
+        self.decay = decay
+        # Last window computed per fingerprint in this container, for hot fingerprints
+        self._windows: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls, table) -> 'AdaptiveWindow':
+        """Build from DEDUP_WINDOW_* environment variables; bounds equal to the default disable adaptation."""
+        return cls(
+            table=table,
+            default_seconds=int(os.environ.get('DEDUP_WINDOW_MINUTES', '15')) * 60,
+            min_seconds=int(os.environ.get('DEDUP_WINDOW_MIN_MINUTES', '2')) * 60,
+            max_seconds=int(os.environ.get('DEDUP_WINDOW_MAX_MINUTES', str(36 * 60))) * 60,
+            margin=float(os.environ.get('DEDUP_WINDOW_MARGIN', '1.5')),
+            min_samples=int(os.environ.get('DEDUP_WINDOW_MIN_SAMPLES', '5'))
+        )
+
+    def window_for(self, stats: ArrivalStats) -> Tuple[int, str]:
+        """
+        Choose the window for a fingerprint.
+
+        Returns:
+            (window seconds, reason) with reason one of 'default', 'learned', 'irregular'
+        """
+        if stats.samples() < self.min_samples:
+            return self.default_seconds, 'default'
+
+        median = stats.quantile(0.5)
+        typical = min(median, stats.gap_ewma) if stats.gap_ewma is not None else median
+        window = self.margin * typical
+
+        # Lengthening is only safe when the cadence is steady
+        spread = stats.quantile(0.75) / stats.quantile(0.25)
+        if window > self.default_seconds and spread > self.regularity:
+            return self.default_seconds, 'irregular'
+
+        return int(min(self.max_seconds, max(self.min_seconds, window))), 'learned'
+
+    def observe(self, incident_id: str, epoch_seconds: Optional[int] = None, hot: bool = False) -> int:
+        """
+        Record an ALARM arrival for a fingerprint and return its dedup window.
+
+        Hot fingerprints reuse the window this container last computed and
+        skip the update, so their statistics record does not become a hot key.
+        Concurrent arrivals may overwrite each other's update; losing a sample
+        only slows learning slightly.
+
+        Returns:
+            Dedup window in seconds
+        """
+        if hot and incident_id in self._windows:
+            return self._windows[incident_id]
+
+        epoch_seconds = epoch_seconds or int(time.time())
+        stats = ArrivalStats.from_item(self.table.get_item(Key=stats_key(incident_id)).get('Item'))
+        stats.observe(epoch_seconds, self.alpha, self.decay)
+        window, reason = self.window_for(stats)
+
+        self.table.put_item(Item=stats.to_item(incident_id, window))
+        if len(self._windows) >= 10000:
+            self._windows.clear()
+        self._windows[incident_id] = window
+        if reason != 'default':
+            print(f"Dedup window for {incident_id}: {window}s ({reason}, {stats.arrivals} arrivals)")
+        return window
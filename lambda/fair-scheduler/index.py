@@ -0,0 +1,279 @@
+"""
+Fair Scheduler Lambda Function
+
+This function runs every minute and, in ticks of a few seconds until the
+invocation is nearly out of time, forwards queued incidents from the
+per-account queues the deduplicator writes (with FAIR_SCHEDULING on) to the
+main incident handler. Each tick picks how many incidents every account may
+send by deficit round-robin over the account weights, within the global
+in-flight limit and each account's cap, and reports per-account queue depth,
+in-flight count and wait time as CloudWatch embedded metrics.
+"""
+
+import json
+import os
+import time
+import boto3
+from botocore.exceptions import ClientError
+from typing import Dict, Any, List, Tuple
+
+from shared.fairqueue import (
+    ACCOUNT_ATTRIBUTE_PREFIX, ACCOUNTS_KEY, DeficitRoundRobin, dispatch_entry, parse_weights,
+    queue_partition, registered_accounts, slot_partition
+)
+from shared.outbox import put_events
+from shared.tracing import now_ms
+
+# Initialize AWS clients
+dynamodb = boto3.resource('dynamodb')
+events_client = boto3.client('events')
+
+# Environment variables
+INCIDENT_HISTORY_TABLE = os.environ['INCIDENT_HISTORY_TABLE']
+# Most incidents in the handler at once, across all accounts
+FAIR_MAX_INFLIGHT = int(os.environ.get('FAIR_MAX_INFLIGHT', '20'))
+# 'account=weight,...'; unlisted accounts weigh 1
+FAIR_ACCOUNT_WEIGHTS = os.environ.get('FAIR_ACCOUNT_WEIGHTS', '')
+# 'account=cap,...' and a cap for unlisted accounts (0 for none)
+FAIR_ACCOUNT_CAPS = os.environ.get('FAIR_ACCOUNT_CAPS', '')
+FAIR_DEFAULT_CAP = int(os.environ.get('FAIR_DEFAULT_CAP', '0'))
+FAIR_TICK_SECONDS = int(os.environ.get('FAIR_TICK_SECONDS', '5'))
+# Longest a dispatched incident holds its slot (a handler that timed out or died before releasing)
+FAIR_INFLIGHT_LEASE_SECONDS = int(os.environ.get('FAIR_INFLIGHT_LEASE_SECONDS', '900'))
+# Accounts with an empty queue and nothing enqueued for this long are dropped from the schedule
+FAIR_IDLE_ACCOUNT_SECONDS = int(os.environ.get('FAIR_IDLE_ACCOUNT_SECONDS', '86400'))
+# Queue entries read per account and tick; also the largest queue depth reported
+FAIR_PEEK_LIMIT = int(os.environ.get('FAIR_PEEK_LIMIT', '100'))
+ENVIRONMENT = os.environ.get('ENVIRONMENT', 'dev')
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+
+# Initialize DynamoDB table
+incident_table = dynamodb.Table(INCIDENT_HISTORY_TABLE)
+
+# Deficits carry over between ticks and warm invocations
+scheduler = DeficitRoundRobin(
+    weights=parse_weights(FAIR_ACCOUNT_WEIGHTS),
+    caps={account: int(cap) for account, cap in parse_weights(FAIR_ACCOUNT_CAPS).items()},
+    default_cap=FAIR_DEFAULT_CAP or None
+)
+
+def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
+    """
+    Main Lambda handler for one scheduling run.
+
+    Args:
+        event: Scheduled event
+        context: Lambda context
+
+    Returns:
+        Dict with processing status
+    """
+    try:
+        ticks = 0
+        dispatched = 0
+
+        while True:
+            dispatched += run_tick()
+            ticks += 1
+
+            # Stop while a full tick still fits in the invocation
+            if context.get_remaining_time_in_millis() < (2 * FAIR_TICK_SECONDS + 5) * 1000:
+                break
+            time.sleep(FAIR_TICK_SECONDS)
+
+        print(f"Fair scheduling run: {dispatched} incidents dispatched in {ticks} ticks")
+
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'message': 'Fair scheduling completed',
+                'ticks': ticks,
+                'dispatched': dispatched
+            })
+        }
+
+    except Exception as e:
+        print(f"Error scheduling incidents: {str(e)}")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({
+                'message': 'Error scheduling incidents',
+                'error': str(e)
+            })
+        }
+
+def run_tick() -> int:
+    """
+    Dispatch one round of queued incidents.
+
+    Returns:
+        Number of incidents EventBridge accepted
+    """
+    now = now_ms()
+    accounts = registered_accounts(incident_table.get_item(Key=ACCOUNTS_KEY, ConsistentRead=True).get('Item'))
+    if not accounts:
+        return 0
+
+    inflight = load_inflight(list(accounts), now)
+    queues = {account: peek_queue(account) for account in accounts}
+    backlog = {account: len(items) for account, items in queues.items() if items}
+
+    for account, last_enqueued in accounts.items():
+        if account not in backlog and not inflight.get(account) \
+                and now - last_enqueued > FAIR_IDLE_ACCOUNT_SECONDS * 1000:
+            prune_account(account, last_enqueued)
+
+    plan = scheduler.plan(backlog, inflight, FAIR_MAX_INFLIGHT - sum(inflight.values()))
+    waits = dispatch(plan, queues, now) if plan else {}
+
+    for account in set(backlog) | {account for account, count in inflight.items() if count}:
+        items = queues.get(account, [])
+        emit_metrics(account, {
+            'QueueDepth': len(items) - len(waits.get(account, [])),
+            'OldestWaitMs': now - int(items[0]['timestamp']) if items else 0,
+            'InFlight': inflight.get(account, 0) + len(waits.get(account, [])),
+            'Dispatched': len(waits.get(account, []))
+        }, waits.get(account, []))
+
+    return sum(len(account_waits) for account_waits in waits.values())
+
+def load_inflight(accounts: List[str], now: int) -> Dict[str, int]:
+    """Count every account's live slots, deleting slots whose lease ran out."""
+    counts: Dict[str, int] = {}
+    expired: List[Dict[str, Any]] = []
+
+    for account in accounts:
+        kwargs = {
+            'KeyConditionExpression': 'incidentId = :slots',
+            'ProjectionExpression': 'incidentId, #ts, expiresAt',
+            'ExpressionAttributeNames': {'#ts': 'timestamp'},
+            'ExpressionAttributeValues': {':slots': slot_partition(account)},
+            'ConsistentRead': True
+        }
+        while True:
+            response = incident_table.query(**kwargs)
+            for item in response['Items']:
+                if int(item['expiresAt']) > now:
+                    counts[account] = counts.get(account, 0) + 1
+                else:
+                    expired.append(item)
+            if 'LastEvaluatedKey' not in response:
+                break
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    if expired:
+        print(f"{len(expired)} in-flight slots expired without a release")
+        clear_entries(expired)
+
+    return counts
+
+def peek_queue(account: str) -> List[Dict[str, Any]]:
+    """Read the oldest queued incidents of an account."""
+    response = incident_table.query(
+        KeyConditionExpression='incidentId = :queue',
+        ExpressionAttributeValues={':queue': queue_partition(account)},
+        Limit=FAIR_PEEK_LIMIT,
+        ConsistentRead=True
+    )
+    return response['Items']
+
+def dispatch(plan: Dict[str, int], queues: Dict[str, List[Dict[str, Any]]], now: int) -> Dict[str, List[int]]:
+    """
+    Forward the planned incidents and take them off their queues.
+
+    Slots are taken before sending, so a concurrent run never overshoots the
+    limits, and given back for entries EventBridge refused.
+
+    Returns:
+        Account -> queue wait in milliseconds of each incident sent
+    """
+    selected: List[Tuple[str, Dict[str, Any]]] = [
+        (account, item) for account, count in plan.items() for item in queues[account][:count]
+    ]
+    slots = [slot_item(account, item, now) for account, item in selected]
+    with incident_table.batch_writer() as batch:
+        for slot in slots:
+            batch.put_item(Item=slot)
+
+    failed = set(put_events(events_client, [dispatch_entry(item) for _, item in selected]))
+
+    refused: Dict[str, int] = {}
+    waits: Dict[str, List[int]] = {}
+    sent: List[Dict[str, Any]] = []
+    for index, (account, item) in enumerate(selected):
+        if index in failed:
+            refused[account] = refused.get(account, 0) + 1
+        else:
+            waits.setdefault(account, []).append(now - int(item['timestamp']))
+            sent.append(item)
+
+    for account, count in refused.items():
+        print(f"{count} incidents of account {account} not accepted, kept queued")
+    clear_entries([slot for index, slot in enumerate(slots) if index in failed])
+    clear_entries(sent)
+
+    return waits
+
+def slot_item(account: str, item: Dict[str, Any], now: int) -> Dict[str, Any]:
+    """Slot a dispatched queue entry holds until the handler releases it or its lease runs out."""
+    expires_at = now + FAIR_INFLIGHT_LEASE_SECONDS * 1000
+    return {
+        'incidentId': slot_partition(account),
+        'timestamp': item['timestamp'],
+        'targetIncidentId': item['targetIncidentId'],
+        'expiresAt': expires_at,
+        'ttl': expires_at // 1000 + 86400
+    }
+
+def clear_entries(items: List[Dict[str, Any]]) -> None:
+    """Delete dispatched queue entries, or slots, with batched writes."""
+    try:
+        with incident_table.batch_writer() as batch:
+            for item in items:
+                batch.delete_item(Key={'incidentId': item['incidentId'], 'timestamp': item['timestamp']})
+
+    except Exception as e:
+        # Left-over entries are dispatched again and the handler's idempotency claim absorbs repeats;
+        # left-over slots are counted until their lease runs out
+        print(f"Error clearing queue entries: {str(e)}")
+
+def prune_account(account: str, last_enqueued: int) -> None:
+    """Drop an idle account from the schedule unless it enqueued again meanwhile."""
+    try:
+        incident_table.update_item(
+            Key=ACCOUNTS_KEY,
+            UpdateExpression='REMOVE #account',
+            ConditionExpression='#account = :seen',
+            ExpressionAttributeNames={'#account': ACCOUNT_ATTRIBUTE_PREFIX + account},
+            ExpressionAttributeValues={':seen': last_enqueued}
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+
+def emit_metrics(account: str, values: Dict[str, int], waits: List[int]) -> None:
+    """Log an account's queue state in CloudWatch embedded metric format."""
+    metrics = [
+        {'Name': 'QueueDepth', 'Unit': 'Count'},
+        {'Name': 'OldestWaitMs', 'Unit': 'Milliseconds'},
+        {'Name': 'InFlight', 'Unit': 'Count'},
+        {'Name': 'Dispatched', 'Unit': 'Count'}
+    ]
+    if waits:
+        # One value per dispatched incident, so percentiles of queue wait are available
+        values = {**values, 'DispatchWaitMs': waits}
+        metrics.append({'Name': 'DispatchWaitMs', 'Unit': 'Milliseconds'})
+
+    print(json.dumps({
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': 'DevOpsAgent/FairScheduler',
+                'Dimensions': [['Environment', 'Account']],
+                'Metrics': metrics
+            }]
+        },
+        'Environment': ENVIRONMENT,
+        'Account': account,
+        **values
+    }))
@@ -0,0 +1,227 @@
+"""
+Incident History Compactor Lambda Function
+
+This function runs on a daily schedule and exports one day of the incident
+history table into a columnar archive in the incident bucket, so volume and
+MTTR analytics read a few compressed files instead of scanning DynamoDB.
+"""
+
+import json
+import os
+import boto3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Any, Iterator, List
+
+from rollups import encode_day, rollup_key
+from shared.status import HOUR_MS, index_bucket
+
+# Initialize AWS clients
+s3_client = boto3.client('s3')
+dynamodb = boto3.resource('dynamodb')
+
+# Environment variables
+INCIDENT_BUCKET = os.environ['INCIDENT_BUCKET']
+INCIDENT_HISTORY_TABLE = os.environ['INCIDENT_HISTORY_TABLE']
+# Concurrent index, occurrence and status reads
+QUERY_WORKERS = int(os.environ.get('QUERY_WORKERS', '8'))
+ENVIRONMENT = os.environ.get('ENVIRONMENT', 'dev')
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+
+# Initialize DynamoDB table
+incident_table = dynamodb.Table(INCIDENT_HISTORY_TABLE)
+
+def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
+    """
+    Main Lambda handler for daily history compaction.
+
+    Args:
+        event: Scheduled event, optionally with a 'date' (YYYY-MM-DD) to compact
+        context: Lambda context
+
+    Returns:
+        Dict with processing status
+    """
+    try:
+        if event.get('date'):
+            day = date.fromisoformat(event['date'])
+        else:
+            day = datetime.now(timezone.utc).date() - timedelta(days=1)
+
+        print(f"Compacting incident history for {day.isoformat()}")
+
+        rows = flatten_history(list(read_day(day)))
+        key = rollup_key(day)
+
+        s3_client.put_object(
+            Bucket=INCIDENT_BUCKET,
+            Key=key,
+            Body=encode_day(rows),
+            ContentType='application/octet-stream'
+        )
+
+        print(f"Rollup stored in S3: s3://{INCIDENT_BUCKET}/{key} ({len(rows)} incidents)")
+
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'message': 'History compacted',
+                'date': day.isoformat(),
+                'incidents': len(rows),
+                'key': key
+            })
+        }
+
+    except Exception as e:
+        print(f"Error compacting history: {str(e)}")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({
+                'message': 'Error compacting history',
+                'error': str(e)
+            })
+        }
+
+def read_day(day: date) -> Iterator[Dict[str, Any]]:
+    """
+    Read the day's occurrence records and the status records of their incidents.
+
+    The incidents recorded that day are listed by the hourly status listing
+    index the deduplicator writes; their occurrences are then queried from
+    each incident's own partition and their status records batch-read, so the
+    read cost follows the day's volume rather than the size of the table.
+
+    Args:
+        day: UTC day to export
+
+    Returns:
+        Iterator over the matching table items
+    """
+    start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    start_ms = int(start.timestamp() * 1000)
+    end_ms = start_ms + 24 * HOUR_MS - 1
+
+    with ThreadPoolExecutor(QUERY_WORKERS) as executor:
+        buckets = [index_bucket(start_ms + hour * HOUR_MS) for hour in range(24)]
+        incident_ids = sorted({incident_id for ids in executor.map(indexed_incidents, buckets) for incident_id in ids})
+        print(f"{len(incident_ids)} incidents indexed for {day.isoformat()}")
+
+        for items in executor.map(lambda incident_id: query_occurrences(incident_id, start_ms, end_ms), incident_ids):
+            yield from items
+
+    yield from load_status_records(incident_ids)
+
+def indexed_incidents(bucket: str) -> List[str]:
+    """Incident IDs in one hourly listing index partition."""
+    incident_ids = []
+    kwargs = {
+        'KeyConditionExpression': 'incidentId = :bucket',
+        'ProjectionExpression': 'targetIncidentId',
+        'ExpressionAttributeValues': {':bucket': bucket}
+    }
+    while True:
+        response = incident_table.query(**kwargs)
+        incident_ids.extend(item['targetIncidentId'] for item in response['Items'])
+        if 'LastEvaluatedKey' not in response:
+            return incident_ids
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def query_occurrences(incident_id: str, start_ms: int, end_ms: int) -> List[Dict[str, Any]]:
+    """Occurrence records of one incident within the day."""
+    items = []
+    kwargs = {
+        'KeyConditionExpression': 'incidentId = :id AND #ts BETWEEN :start AND :end',
+        'ProjectionExpression': 'incidentId, #ts, alarmName, #region, account, #status',
+        'ExpressionAttributeNames': {'#ts': 'timestamp', '#region': 'region', '#status': 'status'},
+        'ExpressionAttributeValues': {':id': incident_id, ':start': start_ms, ':end': end_ms}
+    }
+    while True:
+        response = incident_table.query(**kwargs)
+        items.extend(response['Items'])
+        if 'LastEvaluatedKey' not in response:
+            return items
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def load_status_records(incident_ids: List[str]) -> List[Dict[str, Any]]:
+    """Status records of the given incidents, 100 keys per BatchGetItem call."""
+    items: List[Dict[str, Any]] = []
+
+    for start in range(0, len(incident_ids), 100):
+        request = {INCIDENT_HISTORY_TABLE: {
+            'Keys': [{'incidentId': incident_id, 'timestamp': 0} for incident_id in incident_ids[start:start + 100]],
+            'ProjectionExpression': 'incidentId, #ts, #status, #result, updatedAt, resolvedAt',
+            'ExpressionAttributeNames': {'#ts': 'timestamp', '#status': 'status', '#result': 'result'}
+        }}
+        while request:
+            response = dynamodb.batch_get_item(RequestItems=request)
+            items.extend(response['Responses'].get(INCIDENT_HISTORY_TABLE, []))
+            request = response.get('UnprocessedKeys') or None
+
+    return items
+
+def flatten_history(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Join occurrence records with their status record into flat rows.
+
+    The status record (timestamp 0) holds the latest processing outcome of an
+    incident, so it is attributed to the latest occurrence that precedes it.
+
+    Args:
+        items: Occurrence and status records from the history table
+
+    Returns:
+        One row per occurrence
+    """
+    outcomes = {}
+    occurrences = []
+    for item in items:
+        if int(item['timestamp']) == 0:
+            outcomes[item['incidentId']] = item
+        elif 'alarmName' in item:
+            occurrences.append(item)
+
+    latest = {}
+    for item in occurrences:
+        current = latest.get(item['incidentId'])
+        if current is None or int(item['timestamp']) > int(current['timestamp']):
+            latest[item['incidentId']] = item
+
+    rows = []
+    for item in occurrences:
+        timestamp = int(item['timestamp'])
+        row = {
+            'timestamp': timestamp,
+            'alarm': item['alarmName'],
+            'region': item.get('region', ''),
+            'account': item.get('account', ''),
+            'status': item.get('status', ''),
+            'action': '',
+            'mttr_seconds': None
+        }
+
+        outcome = outcomes.get(item['incidentId'])
+        if outcome is not None and latest[item['incidentId']] is item:
+            row['status'] = outcome.get('status', row['status'])
+            row['action'] = outcome_action(outcome)
+
+            # Time to resolution: the alarm returning to OK, not the end of processing
+            resolved_at = outcome.get('resolvedAt')
+            if resolved_at:
+                resolved_ms = datetime.fromisoformat(resolved_at).replace(tzinfo=timezone.utc).timestamp() * 1000
+                if resolved_ms >= timestamp:
+                    row['mttr_seconds'] = (resolved_ms - timestamp) / 1000
+
+        rows.append(row)
+
+    return rows
+
+def outcome_action(outcome: Dict[str, Any]) -> str:
+    """Extract the action name from a stored processing result."""
+    try:
+        result = json.loads(outcome.get('result') or '{}')
+    except ValueError:
+        return ''
+
+    if result.get('action'):
+        return result['action']
+    return ','.join(result.get('actions_taken', []))
@@ -0,0 +1,204 @@
+"""
+Columnar Incident History Rollups
+
+Daily incident history is stored as one compressed NumPy archive per day at
+analytics/history/<YYYY-MM-DD>.npz in the incident bucket. Each archive holds
+parallel columns, with string columns dictionary-encoded:
+
+    timestamp      int64    occurrence time, epoch milliseconds
+    mttr_seconds   float32  time from occurrence to the alarm resolving, NaN if unknown
+    <name>_codes   int32    index into <name>_values for alarm, region, account,
+                            status and action
+
+Loading several days remaps their dictionaries onto one shared dictionary, so
+counts, percentiles and MTTR over months of data are a handful of vectorised
+NumPy operations.
+"""
+
+import io
+import os
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+ROLLUP_PREFIX = 'analytics/history/'
+STRING_COLUMNS = ('alarm', 'region', 'account', 'status', 'action')
+
+
+def rollup_key(day: date, prefix: str = ROLLUP_PREFIX) -> str:
+    return f"{prefix}{day.isoformat()}.npz"
+
+
+def encode_day(rows: List[Dict[str, Any]]) -> bytes:
+    """
+    Encode one day of flattened history rows as a compressed columnar archive.
+
+    Args:
+        rows: Dicts with timestamp, mttr_seconds and the string columns
+
+    Returns:
+        .npz file contents
+    """
+    columns: Dict[str, np.ndarray] = {
+        'timestamp': np.array([row['timestamp'] for row in rows], dtype=np.int64),
+        'mttr_seconds': np.array(
+            [np.nan if row.get('mttr_seconds') is None else row['mttr_seconds'] for row in rows],
+            dtype=np.float32
+        ),
+    }
+
+    for name in STRING_COLUMNS:
+        values, codes = np.unique(np.array([row.get(name) or '' for row in rows], dtype=str), return_inverse=True)
+        columns[f'{name}_values'] = values
+        columns[f'{name}_codes'] = codes.astype(np.int32)
+
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **columns)
+    return buffer.getvalue()
+
+
+class Rollup:
+    """Columns for a range of days, sharing one dictionary per string column."""
+
+    def __init__(self, columns: Dict[str, np.ndarray], dictionaries: Dict[str, np.ndarray]):
+        self.columns = columns
+        self.dictionaries = dictionaries
+
+    def __len__(self) -> int:
+        return len(self.columns['timestamp'])
+
+    @classmethod
+    def from_archives(cls, archives: Iterable[bytes]) -> 'Rollup':
+        """Concatenate daily archives, remapping their codes to shared dictionaries."""
+        days = [np.load(io.BytesIO(data), allow_pickle=False) for data in archives]
+
+        dictionaries = {
+            name: np.unique(np.concatenate([day[f'{name}_values'] for day in days]))
+            if days else np.array([], dtype=str)
+            for name in STRING_COLUMNS
+        }
+
+        columns: Dict[str, List[np.ndarray]] = {name: [] for name in ('timestamp', 'mttr_seconds') + STRING_COLUMNS}
+        for day in days:
+            columns['timestamp'].append(day['timestamp'])
+            columns['mttr_seconds'].append(day['mttr_seconds'])
+            for name in STRING_COLUMNS:
+                remap = np.searchsorted(dictionaries[name], day[f'{name}_values']).astype(np.int32)
+                columns[name].append(remap[day[f'{name}_codes']])
+
+        return cls(
+            {
+                name: np.concatenate(parts) if parts else np.array([], dtype=np.int64)
+                for name, parts in columns.items()
+            },
+            dictionaries
+        )
+
+    def where(self, **filters: str) -> 'Rollup':
+        """Return the rows whose string columns equal the given values."""
+        mask = np.ones(len(self), dtype=bool)
+        for name, value in filters.items():
+            matches = np.nonzero(self.dictionaries[name] == value)[0]
+            if len(matches) == 0:
+                mask[:] = False
+            else:
+                mask &= self.columns[name] == matches[0]
+        return Rollup({name: column[mask] for name, column in self.columns.items()}, self.dictionaries)
+
+    def counts_per_day(self, by: str = 'alarm') -> Dict[str, Dict[str, int]]:
+        """
+        Count incidents per day for each value of a string column.
+
+        Returns:
+            {value: {YYYY-MM-DD: count}}
+        """
+        days = self.columns['timestamp'] // 86_400_000
+        groups = self.columns[by]
+        unique_days = np.unique(days)
+        day_index = np.searchsorted(unique_days, days)
+
+        counts = np.zeros((len(self.dictionaries[by]), len(unique_days)), dtype=np.int64)
+        np.add.at(counts, (groups, day_index), 1)
+
+        labels = [(date(1970, 1, 1) + timedelta(days=int(d))).isoformat() for d in unique_days]
+        return {
+            str(self.dictionaries[by][g]): {labels[d]: int(counts[g, d]) for d in np.nonzero(counts[g])[0]}
+            for g in np.nonzero(counts.sum(axis=1))[0]
+        }
+
+    def mttr_by(self, by: str = 'action',
+                percentiles: Sequence[float] = (50, 90, 99)) -> Dict[str, Dict[str, float]]:
+        """
+        Summarise MTTR for each value of a string column.
+
+        Returns:
+            {value: {'count': n, 'mean': s, 'p50': s, ...}} in seconds
+        """
+        mttr = self.columns['mttr_seconds']
+        known = ~np.isnan(mttr)
+        groups = self.columns[by][known]
+        mttr = mttr[known]
+
+        order = np.argsort(groups, kind='stable')
+        groups = groups[order]
+        mttr = mttr[order]
+        boundaries = np.flatnonzero(np.diff(groups)) + 1
+
+        summary = {}
+        for values in np.split(np.arange(len(groups)), boundaries):
+            if len(values) == 0:
+                continue
+            samples = mttr[values]
+            stats = {'count': int(len(samples)), 'mean': round(float(samples.mean()), 1)}
+            for p, value in zip(percentiles, np.percentile(samples, percentiles)):
+                stats[f'p{p:g}'] = round(float(value), 1)
+            summary[str(self.dictionaries[by][groups[values[0]]])] = stats
+
+        return summary
+
+
+def day_range(start: date, end: date) -> List[date]:
+    """Days from start to end inclusive."""
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def load_local(directory: str, start: date, end: date, prefix: str = ROLLUP_PREFIX) -> Rollup:
+    """Load the daily archives for a date range from a local mirror of the bucket."""
+    archives = []
+    for day in day_range(start, end):
+        path = os.path.join(directory, rollup_key(day, prefix))
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                archives.append(f.read())
+    return Rollup.from_archives(archives)
+
+
+def load_s3(s3_client, bucket: str, start: date, end: date, prefix: str = ROLLUP_PREFIX,
+            cache_dir: Optional[str] = None) -> Rollup:
+    """
+    Load the daily archives for a date range from the incident bucket.
+
+    Past days never change once compacted, so they are cached in cache_dir when given.
+    """
+    archives = []
+    for day in day_range(start, end):
+        key = rollup_key(day, prefix)
+        cached = os.path.join(cache_dir, key) if cache_dir else None
+        if cached and os.path.exists(cached):
+            with open(cached, 'rb') as f:
+                archives.append(f.read())
+            continue
+
+        try:
+            data = s3_client.get_object(Bucket=bucket, Key=key)['Body'].read()
+        except s3_client.exceptions.NoSuchKey:
+            continue
+
+        archives.append(data)
+        if cached:
+            os.makedirs(os.path.dirname(cached), exist_ok=True)
+            with open(cached, 'wb') as f:
+                f.write(data)
+
+    return Rollup.from_archives(archives)
@@ -0,0 +1,192 @@
+"""
+Circuit Breaker for Bedrock Agent Calls
+
+Tracks recent Bedrock error rates and latency so that, while the agent is
+degraded, incidents go straight to the rule-based fallback without waiting
+for a network call to fail. State is kept per warm container and mirrored
+in the incident history table so all containers open and recover together.
+"""
+
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+from botocore.exceptions import ClientError
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Reserved key in the incident history table holding the shared breaker state
+SHARED_STATE_KEY = {'incidentId': 'circuit-breaker#bedrock', 'timestamp': 0}
+
+
+class CircuitBreaker:
+    """
+    Error-rate and latency based circuit breaker with half-open probing.
+
+    Calls are recorded in a sliding window. Once the window holds at least
+    ``min_calls`` results and the share of failed or slow calls crosses
+    ``failure_threshold`` the breaker opens for ``open_seconds``. After that
+    a single probe call is let through (half-open); its outcome closes the
+    breaker or opens it again.
+    """
+
+    def __init__(self, table=None, failure_threshold: float = 0.5, min_calls: int = 5,
+                 slow_call_ms: int = 20000, window_seconds: int = 60,
+                 open_seconds: int = 60, shared_cache_seconds: int = 5):
+        self.table = table
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.slow_call_ms = slow_call_ms
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.shared_cache_seconds = shared_cache_seconds
+
+        self.state = CLOSED
+        self.opened_until = 0.0
+        self._calls: Deque[Tuple[float, bool]] = deque()
+        self._shared_checked_at = 0.0
+
+    @classmethod
+    def from_env(cls, table=None) -> 'CircuitBreaker':
+        """Build a breaker configured from BEDROCK_CB_* environment variables."""
+        return cls(
+            table=table,
+            failure_threshold=float(os.environ.get('BEDROCK_CB_FAILURE_THRESHOLD', '0.5')),
+            min_calls=int(os.environ.get('BEDROCK_CB_MIN_CALLS', '5')),
+            slow_call_ms=int(os.environ.get('BEDROCK_CB_SLOW_CALL_MS', '20000')),
+            window_seconds=int(os.environ.get('BEDROCK_CB_WINDOW_SECONDS', '60')),
+            open_seconds=int(os.environ.get('BEDROCK_CB_OPEN_SECONDS', '60')),
+        )
+
+    def allow_request(self) -> bool:
+        """
+        Decide whether the next Bedrock call may go out.
+
+        Returns:
+            True if the call should be attempted, False to use the fallback path
+        """
+        now = time.time()
+        self._sync_shared_state(now)
+
+        if self.state == CLOSED:
+            return True
+
+        if now < self.opened_until:
+            return False
+
+        # Cool-down elapsed: exactly one caller across containers gets the probe
+        if self._claim_probe(now):
+            self.state = HALF_OPEN
+            self.opened_until = now + self.open_seconds
+            return True
+
+        self.opened_until = now + self.shared_cache_seconds
+        return False
+
+    def record_success(self, latency_ms: float) -> None:
+        """Record a completed Bedrock call."""
+        if latency_ms >= self.slow_call_ms:
+            self.record_failure(latency_ms)
+            return
+
+        if self.state == HALF_OPEN:
+            print("Bedrock circuit probe succeeded, closing circuit")
+            self._close()
+            return
+
+        self._add_call(True)
+
+    def record_failure(self, latency_ms: float = 0.0) -> None:
+        """Record a failed or too slow Bedrock call."""
+        if self.state == HALF_OPEN:
+            print("Bedrock circuit probe failed, reopening circuit")
+            self._open(time.time())
+            return
+
+        self._add_call(False)
+        total, failures = self._window_stats(time.time())
+        if total >= self.min_calls and failures / total >= self.failure_threshold:
+            print(f"Bedrock circuit opening: {failures}/{total} calls failed or slow")
+            self._open(time.time())
+
+    def _add_call(self, ok: bool) -> None:
+        self._calls.append((time.time(), ok))
+
+    def _window_stats(self, now: float) -> Tuple[int, int]:
+        cutoff = now - self.window_seconds
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
+        failures = sum(1 for _, ok in self._calls if not ok)
+        return len(self._calls), failures
+
+    def _open(self, now: float) -> None:
+        self.state = OPEN
+        self.opened_until = now + self.open_seconds
+        self._calls.clear()
+        self._write_shared_state({'state': OPEN, 'openUntil': int(self.opened_until * 1000)})
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self.opened_until = 0.0
+        self._calls.clear()
+        self._write_shared_state({'state': CLOSED, 'openUntil': 0})
+
+    def _sync_shared_state(self, now: float) -> None:
+        """Pick up an open or recovered circuit recorded by another container."""
+        if self.table is None:
+            return
+        if self.state != CLOSED and now < self.opened_until:
+            return
+        if now - self._shared_checked_at < self.shared_cache_seconds:
+            return
+        self._shared_checked_at = now
+
+        try:
+            item = self.table.get_item(Key=SHARED_STATE_KEY).get('Item')
+        except Exception as e:
+            print(f"Error reading circuit breaker state: {str(e)}")
+            return
+
+        if item and item.get('state') == OPEN:
+            self.state = OPEN
+            self.opened_until = int(item.get('openUntil', 0)) / 1000
+        elif self.state != CLOSED:
+            self.state = CLOSED
+            self.opened_until = 0.0
+
+    def _claim_probe(self, now: float) -> bool:
+        """Take the half-open probe lease so only one container probes at a time."""
+        if self.table is None:
+            return True
+
+        try:
+            self.table.update_item(
+                Key=SHARED_STATE_KEY,
+                UpdateExpression="SET probeUntil = :probe_until",
+                ConditionExpression="attribute_not_exists(probeUntil) OR probeUntil < :now",
+                ExpressionAttributeValues={
+                    ':probe_until': int((now + self.open_seconds) * 1000),
+                    ':now': int(now * 1000),
+                },
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            print(f"Error claiming circuit breaker probe: {str(e)}")
+            return True
+        except Exception as e:
+            print(f"Error claiming circuit breaker probe: {str(e)}")
+            return True
+
+    def _write_shared_state(self, values: Dict[str, Any]) -> None:
+        if self.table is None:
+            return
+
+        try:
+            self.table.put_item(Item={**SHARED_STATE_KEY, **values, 'updatedAt': int(time.time() * 1000)})
+        except Exception as e:
+            print(f"Error writing circuit breaker state: {str(e)}")
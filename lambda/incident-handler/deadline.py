@@ -0,0 +1,57 @@
+"""
+Invocation Deadline Budgeting
+
+Hands each processing stage a time budget taken from the Lambda remaining
+time, minus a reserve that is always kept for persisting the incident status.
+Optional stages are skipped when their minimum budget is not available, and
+the Bedrock call gives way to the rule-based fallback before the hard limit.
+"""
+
+import time
+from typing import Optional
+
+
+class Deadline:
+    """Time left in the current invocation, less the persistence reserve."""
+
+    def __init__(self, deadline_ms: Optional[float], reserve_ms: int = 5000):
+        self.deadline_ms = deadline_ms
+        self.reserve_ms = reserve_ms
+
+    @classmethod
+    def from_context(cls, context, reserve_ms: int = 5000) -> 'Deadline':
+        """Build a deadline from a Lambda context; unbounded if none is available."""
+        if hasattr(context, 'get_remaining_time_in_millis'):
+            return cls(time.time() * 1000 + context.get_remaining_time_in_millis(), reserve_ms)
+        return cls(None, reserve_ms)
+
+    def remaining_ms(self) -> float:
+        """Milliseconds stages may still use before the reserve is reached."""
+        if self.deadline_ms is None:
+            return float('inf')
+        return self.deadline_ms - self.reserve_ms - time.time() * 1000
+
+    def expired(self) -> bool:
+        return self.remaining_ms() <= 0
+
+    def allows(self, stage: str, min_ms: int) -> bool:
+        """
+        Check whether a stage can still get its minimum budget.
+
+        Args:
+            stage: Stage name, used for logging when it is skipped
+            min_ms: Least time the stage needs to be worth starting
+
+        Returns:
+            True if the stage should run
+        """
+        remaining = self.remaining_ms()
+        if remaining >= min_ms:
+            return True
+
+        print(f"Skipping {stage}: {max(remaining, 0):.0f}ms left, needs {min_ms}ms")
+        return False
+
+    def budget_ms(self, cap_ms: float) -> float:
+        """Time a stage may use: its own cap or whatever is left, if less."""
+        return max(0.0, min(cap_ms, self.remaining_ms()))
@@ -0,0 +1,142 @@
+"""
+Idempotent Incident Processing
+
+EventBridge delivers events at least once, so the same "New Incident Detected"
+event can reach the handler more than once. Each delivery claims a record
+keyed on incident ID plus event ID before doing any work:
+
+    - no record, or an expired in-progress lease: the claim succeeds and the
+      caller processes the incident
+    - completed record: the stored result is returned without reprocessing
+    - in-progress record with a live lease: another attempt is still working
+
+Repeat deliveries cost one small consistent read. Claims carry an owner token
+so a crashed attempt that comes back after being taken over cannot overwrite
+the new owner's result.
+"""
+
+import json
+import time
+from typing import Any, Dict, Optional
+
+from botocore.exceptions import ClientError
+
+IN_PROGRESS = 'in_progress'
+COMPLETED = 'completed'
+CLAIMED = 'claimed'
+
+KEY_PREFIX = 'idempotency#'
+
+
+class Claim:
+    """Outcome of claiming an event for processing."""
+
+    __slots__ = ('status', 'result')
+
+    def __init__(self, status: str, result: Optional[Dict[str, Any]] = None):
+        self.status = status
+        self.result = result
+
+    @property
+    def acquired(self) -> bool:
+        return self.status == CLAIMED
+
+
+class IdempotencyStore:
+    """Claim records kept in the incident history table under reserved keys."""
+
+    def __init__(self, table, ttl_days: int = 7):
+        self.table = table
+        self.ttl_days = ttl_days
+
+    @staticmethod
+    def key(incident_id: str, event_id: str) -> Dict[str, Any]:
+        return {'incidentId': f"{KEY_PREFIX}{incident_id}#{event_id}", 'timestamp': 0}
+
+    def claim(self, incident_id: str, event_id: str, owner: str, lease_ms: int) -> Claim:
+        """
+        Claim an event for processing, or report why it should be skipped.
+
+        Args:
+            incident_id: Incident identifier from the deduplicator
+            event_id: EventBridge event ID of this delivery
+            owner: Token identifying this attempt, e.g. the Lambda request ID
+            lease_ms: How long the claim holds before another attempt may take over
+
+        Returns:
+            Claim with status 'claimed', 'completed' (with result) or 'in_progress'
+        """
+        key = self.key(incident_id, event_id)
+        now_ms = int(time.time() * 1000)
+
+        item = self.table.get_item(
+            Key=key,
+            ConsistentRead=True,
+            ProjectionExpression='#status, #result, leaseExpiresAt',
+            ExpressionAttributeNames={'#status': 'status', '#result': 'result'}
+        ).get('Item')
+
+        if item:
+            if item['status'] == COMPLETED:
+                return Claim(COMPLETED, json.loads(item.get('result') or '{}'))
+            if int(item.get('leaseExpiresAt', 0)) > now_ms:
+                return Claim(IN_PROGRESS)
+            print(f"Taking over expired claim for incident {incident_id}")
+
+        try:
+            self.table.put_item(
+                Item={
+                    **key,
+                    'status': IN_PROGRESS,
+                    'owner': owner,
+                    'leaseExpiresAt': now_ms + lease_ms,
+                    'ttl': int(now_ms / 1000) + self.ttl_days * 86400
+                },
+                ConditionExpression='attribute_not_exists(incidentId) OR (#status = :in_progress AND leaseExpiresAt < :now)',
+                ExpressionAttributeNames={'#status': 'status'},
+                ExpressionAttributeValues={':in_progress': IN_PROGRESS, ':now': now_ms}
+            )
+            return Claim(CLAIMED)
+
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                # Another delivery claimed or finished it between the read and the write
+                return Claim(IN_PROGRESS)
+            raise
+
+    def complete(self, incident_id: str, event_id: str, owner: str, result: Dict[str, Any]) -> None:
+        """Store the result of a claimed event so repeat deliveries can return it."""
+        try:
+            self.table.update_item(
+                Key=self.key(incident_id, event_id),
+                UpdateExpression='SET #status = :completed, #result = :result REMOVE leaseExpiresAt',
+                ConditionExpression='#owner = :owner',
+                ExpressionAttributeNames={'#status': 'status', '#result': 'result', '#owner': 'owner'},
+                ExpressionAttributeValues={
+                    ':completed': COMPLETED,
+                    ':result': json.dumps(result),
+                    ':owner': owner
+                }
+            )
+
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                print(f"Claim for incident {incident_id} was taken over, result not stored")
+                return
+            print(f"Error completing idempotency claim: {str(e)}")
+
+        except Exception as e:
+            print(f"Error completing idempotency claim: {str(e)}")
+
+    def release(self, incident_id: str, event_id: str, owner: str) -> None:
+        """Drop a claim after a failed attempt so a retry can start immediately."""
+        try:
+            self.table.delete_item(
+                Key=self.key(incident_id, event_id),
+                ConditionExpression='#owner = :owner',
+                ExpressionAttributeNames={'#owner': 'owner'},
+                ExpressionAttributeValues={':owner': owner}
+            )
+
+        except Exception as e:
+            print(f"Error releasing idempotency claim: {str(e)}")
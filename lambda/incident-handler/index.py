@@ -9,17 +9,66 @@ import json
 import os
 import boto3
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from botocore.config import Config
+from botocore.exceptions import ClientError
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
+
+from circuit_breaker import CircuitBreaker
+from deadline import Deadline
+from idempotency import IN_PROGRESS, IdempotencyStore
+from memory_profile import MemoryProfiler
+from metric_context import MetricContextFetcher, format_metric_summary
+from prefilter import BenignPrefilter, Verdict, emit_metric
+from remediation import RemediationExecutor, parse_actions
+from rule_engine import RuleEngine
+from similarity_index import SimilarityIndex, incident_text
+from shared import jsoncodec
+from shared.envelope import IncidentEnvelope
+from shared.fairqueue import release
+from shared.incident import Incident, InvalidEventError
+from shared.metrics import RegionalClients
+from shared.tracing import Trace, now_ms
+
+# Environment variables used to configure AWS clients
+BEDROCK_CONNECT_TIMEOUT = int(os.environ.get('BEDROCK_CONNECT_TIMEOUT', '3'))
+BEDROCK_READ_TIMEOUT = int(os.environ.get('BEDROCK_READ_TIMEOUT', '30'))
+# Longest the log and metric lookups may take, before the remaining invocation time caps them further
+LOGS_MAX_BUDGET_MS = int(os.environ.get('LOGS_MAX_BUDGET_MS', '5000'))
+METRICS_MAX_BUDGET_MS = int(os.environ.get('METRICS_MAX_BUDGET_MS', '5000'))
+# Longest a remediation action may run; the remediation Lambda client waits a little longer
+REMEDIATION_MAX_TIMEOUT_SECONDS = int(os.environ.get('REMEDIATION_MAX_TIMEOUT_SECONDS', '900'))
 
 # Initialize AWS clients
 s3_client = boto3.client('s3')
 dynamodb = boto3.resource('dynamodb')
-bedrock_agent = boto3.client('bedrock-agent-runtime')
-logs_client = boto3.client('logs')
+# Bounded timeouts and no retries (max_attempts counts the first call) keep incident latency capped when Bedrock is degraded
+bedrock_agent = boto3.client(
+    'bedrock-agent-runtime',
+    config=Config(
+        connect_timeout=BEDROCK_CONNECT_TIMEOUT,
+        read_timeout=BEDROCK_READ_TIMEOUT,
+        retries={'max_attempts': 1, 'mode': 'standard'}
+    )
+)
+# Context lookups time out with their stage budget, so an abandoned call does not linger
+logs_client = boto3.client(
+    'logs',
+    config=Config(read_timeout=max(1, LOGS_MAX_BUDGET_MS // 1000), retries={'max_attempts': 2, 'mode': 'standard'})
+)
+cloudwatch = boto3.client(
+    'cloudwatch',
+    config=Config(read_timeout=max(1, METRICS_MAX_BUDGET_MS // 1000), retries={'max_attempts': 2, 'mode': 'standard'})
+)
 sns_client = boto3.client('sns')
 ssm_client = boto3.client('ssm')
-lambda_client = boto3.client('lambda')
+sts_client = boto3.client('sts')
+# Remediation actions are not idempotent: one attempt each, and the executor times them out before the socket does
+remediation_lambda_client = boto3.client(
+    'lambda',
+    config=Config(read_timeout=REMEDIATION_MAX_TIMEOUT_SECONDS + 10, retries={'max_attempts': 1, 'mode': 'standard'})
+)
 
 # Environment variables
 INCIDENT_BUCKET = os.environ['INCIDENT_BUCKET']
@@ -29,10 +78,61 @@ BEDROCK_AGENT_ID = os.environ.get('BEDROCK_AGENT_ID', 'PLACEHOLDER')
 BEDROCK_AGENT_ALIAS_ID = os.environ.get('BEDROCK_AGENT_ALIAS_ID', 'TSTALIASID')
 ENVIRONMENT = os.environ.get('ENVIRONMENT', 'dev')
 LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+FALLBACK_RULES_FILE = os.environ.get(
+    'FALLBACK_RULES_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules.json')
+)
+# get_recent_logs still returns placeholder lines; log-keyword rules stay off until it fetches real logs
+FALLBACK_RULES_USE_LOGS = os.environ.get('FALLBACK_RULES_USE_LOGS', 'false').lower() == 'true'
+SIMILARITY_INDEX_PREFIX = os.environ.get('SIMILARITY_INDEX_PREFIX', 'similarity-index/')
+SIMILAR_INCIDENTS_TOP_K = int(os.environ.get('SIMILAR_INCIDENTS_TOP_K', '3'))
+# Extra lease time past the invocation deadline before a retry may take over
+IDEMPOTENCY_LEASE_MARGIN_MS = int(os.environ.get('IDEMPOTENCY_LEASE_MARGIN_MS', '30000'))
+# Time always kept back for persisting status, and minimum budgets per stage
+DEADLINE_RESERVE_MS = int(os.environ.get('DEADLINE_RESERVE_MS', '5000'))
+LOGS_MIN_BUDGET_MS = int(os.environ.get('LOGS_MIN_BUDGET_MS', '3000'))
+HISTORY_MIN_BUDGET_MS = int(os.environ.get('HISTORY_MIN_BUDGET_MS', '500'))
+METRICS_MIN_BUDGET_MS = int(os.environ.get('METRICS_MIN_BUDGET_MS', '2000'))
+# How long the verifier watches the alarm metric after remediation
+VERIFICATION_WINDOW_SECONDS = int(os.environ.get('VERIFICATION_WINDOW_SECONDS', '900'))
+# Starting the agent needs at least one full read timeout of headroom
+BEDROCK_MIN_BUDGET_MS = int(os.environ.get('BEDROCK_MIN_BUDGET_MS', str(BEDROCK_READ_TIMEOUT * 1000)))
 
 # Initialize DynamoDB table
 incident_table = dynamodb.Table(INCIDENT_HISTORY_TABLE)
 
+# Circuit breaker state survives across warm invocations of this container
+bedrock_breaker = CircuitBreaker.from_env(incident_table)
+
+# Claims that make repeat EventBridge deliveries return the stored result
+idempotency_store = IdempotencyStore(incident_table)
+
+# Fallback rules are compiled once per container
+fallback_rules = RuleEngine.from_file(FALLBACK_RULES_FILE)
+
+# Agent-requested remediation runs only allowlisted SSM documents and Lambda functions
+remediation_executor = RemediationExecutor.from_env(ssm_client, remediation_lambda_client)
+
+# Alarm metric and related metrics are condensed to a few statistics for the agent,
+# read in the alarm's region with the same timeouts
+metric_fetcher = MetricContextFetcher.from_env(RegionalClients(
+    cloudwatch,
+    lambda region: boto3.client('cloudwatch', region_name=region, config=cloudwatch.meta.config),
+    lambda: sts_client.get_caller_identity()['Account']
+))
+
+# Incidents that look benign with high confidence skip the agent
+benign_prefilter = BenignPrefilter.from_env(incident_table)
+
+# Opt-in tracemalloc profile of each incident, for sizing the function's memory
+memory_profiler = MemoryProfiler.from_env()
+
+# Log and metric lookups run side by side and are waited on only for their stage budget
+context_executor = ThreadPoolExecutor(max_workers=4)
+
+# Past incident index is downloaded and memory-mapped once per container
+similarity_index = SimilarityIndex.load_from_s3(s3_client, INCIDENT_BUCKET, SIMILARITY_INDEX_PREFIX)
+
 def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
     """
     Main Lambda handler for incident processing.
@@ -44,35 +144,78 @@ def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
     Returns:
         Dict with processing status
     """
-    print(f"Received incident event: {json.dumps(event)}")
+    # State changes of an open incident only update its status
+    if event.get('detail-type') == 'Incident State Changed':
+        return apply_state_change(event['detail'])
+    if event.get('detail-type') == 'Incident Correlated':
+        return apply_correlation(event['detail'])
     
     try:
-        # Extract incident information
-        detail = json.loads(event['detail'])
-        incident_id = detail['incidentId']
-        original_event = detail['originalEvent']
+        # Extract incident information, parsing the detail once and validating it before any AWS call
+        envelope = IncidentEnvelope.from_detail(event['detail'])
+        print(f"Received incident event: {envelope.detail_json}")
+        
+        incident = Incident.from_event(envelope.original_event)
+        incident_id = envelope.incident_id
+        original_event = envelope.original_event
+        # An outbox resend is a new EventBridge event carrying the same trace, so claim by trace ID
+        event_id = envelope.trace.trace_id if envelope.trace is not None else event.get('id', '')
+        owner = getattr(context, 'aws_request_id', '') or str(time.time_ns())
+        
+        # Skip work already done or in flight for this delivery
+        claimed = claim_incident_event(envelope, event_id, owner, context)
+        if claimed is not None:
+            return claimed
         
         print(f"Processing incident: {incident_id}")
+        memory_profiler.start()
+        
+        deadline = Deadline.from_context(context, DEADLINE_RESERVE_MS)
+        trace = continue_trace(envelope)
         
         # Update incident status
         update_incident_status(incident_id, 'processing')
         
+        # Opened as of when it was recorded, so an OK arriving while it is processed still counts as quick
+        outcome_history = record_outcome(incident_id, opened=True, at=envelope.recorded_at)
+        
         # Gather context information
-        context_data = gather_incident_context(original_event)
+        with trace.span('handler.context'), memory_profiler.stage('context'):
+            context_data = gather_incident_context(incident, deadline)
+            if envelope.flapping:
+                context_data['flapping'] = envelope.flapping
+            context_data['correlated_alarms'] = find_correlated_alarms(incident_id)
         
         # Store context in S3 for audit
-        store_incident_context(incident_id, context_data)
+        with trace.span('handler.store'), memory_profiler.stage('store'):
+            store_incident_context(incident_id, context_data)
         
         # Check if Bedrock Agent is configured
-        if BEDROCK_AGENT_ID == 'PLACEHOLDER':
-            print("Bedrock Agent not configured, using fallback logic")
-            result = fallback_incident_processing(incident_id, context_data)
-        else:
-            # Invoke Bedrock Agent for decision making
-            result = invoke_bedrock_agent(incident_id, context_data)
+        with trace.span('handler.analyze'), memory_profiler.stage('analyze'):
+            verdict = None
+            if not envelope.flapping:
+                verdict = prefilter_incident(incident_id, context_data, original_event, outcome_history)
+            if verdict is not None and verdict.skip:
+                result = skip_agent(incident_id, context_data, verdict)
+            elif BEDROCK_AGENT_ID == 'PLACEHOLDER':
+                print("Bedrock Agent not configured, using fallback logic")
+                result = fallback_incident_processing(incident_id, context_data)
+            else:
+                # Invoke Bedrock Agent for decision making
+                result = invoke_bedrock_agent(incident_id, context_data, deadline)
+            if verdict is not None:
+                result['prefilter'] = verdict.to_dict()
         
         # Update incident with result
-        update_incident_status(incident_id, 'completed', result)
+        with trace.span('handler.persist'), memory_profiler.stage('persist'):
+            update_incident_status(incident_id, 'completed', result)
+            idempotency_store.complete(incident_id, event_id, owner, result)
+            if any(step['status'] in ('succeeded', 'in_progress') for step in result.get('remediation', [])):
+                register_verification(incident_id, incident)
+        
+        store_trace(incident_id, envelope.recorded_at, trace)
+        release_slot(envelope)
+        memory_profiler.finish(incident_id, context)
         
         print(f"Incident processing completed: {incident_id}")
         
@@ -85,12 +228,31 @@ def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
             })
         }
         
+    except InvalidEventError as e:
+        # Nothing was claimed or recorded yet; alerting would only add noise for a malformed event
+        print(f"Rejected event: {str(e)}")
+        if 'envelope' in locals():
+            release_slot(envelope)
+        return {
+            'statusCode': 400,
+            'body': json.dumps({
+                'message': 'Invalid incident event',
+                'field': e.field,
+                'error': str(e)
+            })
+        }
+        
     except Exception as e:
         print(f"Error processing incident: {str(e)}")
         
         # Update incident status to failed
         if 'incident_id' in locals():
             update_incident_status(incident_id, 'failed', {'error': str(e)})
+            memory_profiler.finish(incident_id, context)
+        if 'owner' in locals():
+            idempotency_store.release(incident_id, event_id, owner)
+        if 'envelope' in locals():
+            release_slot(envelope)
         
         # Send alert to humans
         send_alert(f"Incident processing failed: {str(e)}", 'critical')
@@ -103,34 +265,284 @@ def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
             })
         }
 
-def gather_incident_context(original_event: Dict[str, Any]) -> Dict[str, Any]:
+def apply_state_change(detail: Any) -> Dict[str, Any]:
+    """
+    Apply an ALARM/OK transition of an open incident forwarded by the deduplicator.
+    
+    OK resolves the incident; ALARM reopens it, labelled as flapping when the
+    alarm is cycling. No analysis is run, and the processing status is left
+    as it is.
+    
+    Args:
+        detail: 'Incident State Changed' detail, as JSON text or decoded
+        
+    Returns:
+        Dict with processing status
+    """
+    if isinstance(detail, str):
+        detail = jsoncodec.loads(detail)
+    
+    incident_id = detail['incidentId']
+    flapping = (detail.get('flapping') or {}).get('mode') == 'flapping'
+    
+    if detail['alarmState'] == 'OK':
+        lifecycle = 'resolved'
+        record_outcome(incident_id, opened=False)
+    else:
+        lifecycle = 'flapping' if flapping else 'reopened'
+    
+    update_incident_lifecycle(incident_id, lifecycle)
+    
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'message': 'Incident state updated',
+            'incidentId': incident_id,
+            'lifecycle': lifecycle
+        })
+    }
+
+def apply_correlation(detail: Any) -> Dict[str, Any]:
+    """
+    Mark an incident as covered by the analysis of its root incident.
+    
+    Args:
+        detail: 'Incident Correlated' detail, as JSON text or decoded
+        
+    Returns:
+        Dict with processing status
+    """
+    if isinstance(detail, str):
+        detail = jsoncodec.loads(detail)
+    
+    incident_id = detail['incidentId']
+    root_id = detail['rootIncidentId']
+    
+    update_incident_status(incident_id, 'correlated', {'root_incident_id': root_id})
+    
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'message': 'Incident correlated',
+            'incidentId': incident_id,
+            'rootIncidentId': root_id
+        })
+    }
+
+def claim_incident_event(envelope: IncidentEnvelope, event_id: str, owner: str, context) -> Optional[Dict[str, Any]]:
+    """
+    Claim this delivery of an incident event for processing.
+    
+    Args:
+        envelope: Parsed incident event
+        event_id: EventBridge event ID
+        owner: Token identifying this invocation
+        context: Lambda context, used to size the claim lease
+        
+    Returns:
+        Response to return for a repeat delivery, or None to process the event
+    """
+    incident_id = envelope.incident_id
+    if hasattr(context, 'get_remaining_time_in_millis'):
+        lease_ms = context.get_remaining_time_in_millis() + IDEMPOTENCY_LEASE_MARGIN_MS
+    else:
+        lease_ms = 900000 + IDEMPOTENCY_LEASE_MARGIN_MS
+    
+    try:
+        claim = idempotency_store.claim(incident_id, event_id, owner, lease_ms)
+    except Exception as e:
+        # Processing twice is better than not processing at all
+        print(f"Error claiming incident event, processing without idempotency: {str(e)}")
+        return None
+    
+    if claim.acquired:
+        return None
+    
+    print(f"Repeat delivery of incident {incident_id} ({claim.status}), skipping processing")
+    
+    # A re-dispatched queue entry took its slot again; an attempt still running releases it when done
+    if claim.status != IN_PROGRESS:
+        release_slot(envelope)
+    
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'message': 'Duplicate delivery ignored',
+            'incidentId': incident_id,
+            'status': claim.status,
+            'result': claim.result
+        })
+    }
+
+def continue_trace(envelope: IncidentEnvelope) -> Trace:
+    """
+    Pick up the latency trace started by the deduplicator.
+    
+    The time between forwarding and this invocation starting is recorded as
+    the 'queue' span. Events without a trace start a new one.
+    """
+    started = now_ms()
+    trace = envelope.trace
+    
+    if trace is None:
+        return Trace.start(envelope.original_event)
+    
+    if envelope.forwarded_at:
+        trace.add_span('queue', int(envelope.forwarded_at), started)
+    
+    return trace
+
+def store_trace(incident_id: str, recorded_at: Optional[int], trace: Trace) -> None:
+    """Store the finished trace on the incident occurrence record."""
+    if recorded_at is None:
+        return
+    
+    try:
+        incident_table.update_item(
+            Key={'incidentId': incident_id, 'timestamp': int(recorded_at)},
+            UpdateExpression="SET #trace = :trace, latencyMs = :latency",
+            ExpressionAttributeNames={'#trace': 'trace'},
+            ExpressionAttributeValues={
+                ':trace': trace.encode(),
+                ':latency': trace.end_ms() - trace.origin_ms
+            }
+        )
+        
+        print(f"Trace stored: {trace.trace_id} ({trace.end_ms() - trace.origin_ms}ms end-to-end)")
+        
+    except Exception as e:
+        print(f"Error storing trace: {str(e)}")
+
+def gather_incident_context(incident: Incident, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
     """
     Gather context information about the incident.
     
     Args:
-        original_event: Original CloudWatch alarm event
+        incident: Validated alarm event
+        deadline: Invocation deadline; optional stages are skipped when time is short
         
     Returns:
         Dict containing incident context
     """
-    alarm_name = original_event['detail']['alarmName']
-    region = original_event['region']
+    alarm_name = incident.alarm_name
+    region = incident.region
+    reason = incident.reason
+    
+    # Network lookups start first and are collected within their budgets
+    logs_future = metrics_future = None
+    if deadline is None or deadline.allows('log lookup', LOGS_MIN_BUDGET_MS):
+        logs_future = context_executor.submit(get_recent_logs, alarm_name)
+    # An alarm from another account has no metrics this function can read; say so rather than show none
+    metrics_readable = metric_fetcher.readable(incident.event)
+    if metrics_readable and (deadline is None or deadline.allows('metric lookup', METRICS_MIN_BUDGET_MS)):
+        metrics_future = context_executor.submit(get_metric_context, incident.event)
+    
+    if deadline is None or deadline.allows('similar incident lookup', HISTORY_MIN_BUDGET_MS):
+        similar_incidents = find_similar_incidents(alarm_name, reason)
+    else:
+        similar_incidents = []
+    
+    logs = collect_within_budget('log lookup', logs_future, deadline, LOGS_MAX_BUDGET_MS)
+    metrics = collect_within_budget('metric lookup', metrics_future, deadline, METRICS_MAX_BUDGET_MS)
     
     context = {
         'alarm': {
             'name': alarm_name,
-            'state': original_event['detail']['state']['value'],
-            'reason': original_event['detail']['state'].get('reason', ''),
-            'timestamp': original_event['detail']['state'].get('timestamp', ''),
+            'state': incident.state,
+            'reason': reason,
+            'timestamp': incident.state_timestamp,
         },
         'region': region,
-        'account': original_event['account'],
-        'logs': get_recent_logs(alarm_name),
+        'account': incident.account,
+        'logs': logs,
+        'metrics': metrics,
+        'metrics_readable': metrics_readable,
+        'similar_incidents': similar_incidents,
         'timestamp': datetime.utcnow().isoformat()
     }
     
     return context
 
+def collect_within_budget(stage: str, future, deadline: Optional[Deadline], cap_ms: int) -> List[Any]:
+    """
+    Wait for a context lookup no longer than its budget.
+    
+    Args:
+        stage: Stage name, used for logging
+        future: Pending lookup, or None if the stage was skipped
+        deadline: Invocation deadline; None waits up to the cap
+        cap_ms: Longest the stage may take
+        
+    Returns:
+        The lookup's result, or an empty list if skipped or out of time
+    """
+    if future is None:
+        return []
+    
+    budget_ms = deadline.budget_ms(cap_ms) if deadline is not None else cap_ms
+    try:
+        return future.result(timeout=budget_ms / 1000)
+    except FutureTimeoutError:
+        # The call ends on its client read timeout; its result is discarded
+        print(f"Skipping {stage}: no result within its {budget_ms:.0f}ms budget")
+        return []
+
+def find_correlated_alarms(incident_id: str) -> List[Dict[str, Any]]:
+    """
+    List alarms on related services the deduplicator merged into this incident.
+    
+    Alarms correlated after the analysis starts are recorded but not analysed again.
+    """
+    try:
+        response = incident_table.query(
+            KeyConditionExpression='incidentId = :members',
+            ExpressionAttributeValues={':members': f'corr-members#{incident_id}'},
+            Limit=50
+        )
+        
+        return [
+            {
+                'incidentId': item['memberId'],
+                'alarmName': item['memberAlarm'],
+                'state': item.get('memberState', ''),
+                'reason': item.get('memberReason', '')
+            }
+            for item in response['Items']
+        ]
+        
+    except Exception as e:
+        print(f"Error finding correlated alarms: {str(e)}")
+        return []
+
+def find_similar_incidents(alarm_name: str, reason: str) -> List[Dict[str, Any]]:
+    """
+    Look up resolved past incidents similar to the current alarm.
+    
+    Args:
+        alarm_name: CloudWatch alarm name
+        reason: Alarm state reason text
+        
+    Returns:
+        Top matching past incidents with their outcomes
+    """
+    if similarity_index is None:
+        return []
+    
+    try:
+        return similarity_index.query(incident_text(alarm_name, reason), top_k=SIMILAR_INCIDENTS_TOP_K)
+        
+    except Exception as e:
+        print(f"Error querying similar incidents: {str(e)}")
+        return []
+
+def get_metric_context(original_event: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Summarise the alarm metric and related metrics; empty on any error."""
+    try:
+        return metric_fetcher.fetch(original_event)
+    except Exception as e:
+        print(f"Error fetching metric context: {str(e)}")
+        return []
+
 def get_recent_logs(alarm_name: str, minutes: int = 15) -> List[str]:
     """
     Get recent error logs related to the alarm.
@@ -174,7 +586,7 @@ def store_incident_context(incident_id: str, context_data: Dict[str, Any]) -> No
         s3_client.put_object(
             Bucket=INCIDENT_BUCKET,
             Key=key,
-            Body=json.dumps(context_data, indent=2),
+            Body=jsoncodec.dumps_bytes(context_data),
             ContentType='application/json'
         )
         print(f"Context stored in S3: s3://{INCIDENT_BUCKET}/{key}")
@@ -182,33 +594,30 @@ def store_incident_context(incident_id: str, context_data: Dict[str, Any]) -> No
     except Exception as e:
         print(f"Error storing context: {str(e)}")
 
-def invoke_bedrock_agent(incident_id: str, context_data: Dict[str, Any]) -> Dict[str, Any]:
+def invoke_bedrock_agent(incident_id: str, context_data: Dict[str, Any], deadline: Optional[Deadline] = None) -> Dict[str, Any]:
     """
     Invoke Bedrock Agent to analyze incident and decide on actions.
     
     Args:
         incident_id: Unique incident identifier
         context_data: Incident context information
+        deadline: Invocation deadline; falls back to rules when the agent cannot finish in time
         
     Returns:
         Dict containing agent decision and actions taken
     """
+    if deadline is not None and not deadline.allows('Bedrock Agent', BEDROCK_MIN_BUDGET_MS):
+        return fallback_incident_processing(incident_id, context_data)
+    
+    if not bedrock_breaker.allow_request():
+        print("Bedrock circuit open, using fallback logic")
+        return fallback_incident_processing(incident_id, context_data)
+    
+    started = time.monotonic()
+    
     try:
         # Prepare input for Bedrock Agent
-        input_text = f"""
-        Incident Analysis Request:
-        
-        Incident ID: {incident_id}
-        Alarm: {context_data['alarm']['name']}
-        State: {context_data['alarm']['state']}
-        Reason: {context_data['alarm']['reason']}
-        Region: {context_data['region']}
-        
-        Recent Logs:
-        {chr(10).join(context_data['logs'])}
-        
-        Please analyze this incident and recommend appropriate remediation actions.
-        """
+        input_text = build_agent_input(incident_id, context_data)
         
         print(f"Invoking Bedrock Agent with input: {input_text[:200]}...")
         
@@ -223,25 +632,126 @@ def invoke_bedrock_agent(incident_id: str, context_data: Dict[str, Any]) -> Dict
         # Process agent response
         completion = ""
         for event in response['completion']:
+            if deadline is not None and deadline.expired():
+                raise TimeoutError("Invocation deadline reached while streaming agent response")
             if 'chunk' in event:
                 completion += event['chunk']['bytes'].decode('utf-8')
         
-        print(f"Bedrock Agent response: {completion}")
+        bedrock_breaker.record_success((time.monotonic() - started) * 1000)
         
-        # Parse agent response and execute actions
-        # This is a simplified implementation
-        # In production, you would parse structured tool responses
-        
-        return {
-            'agent_response': completion,
-            'actions_taken': ['analysis_completed'],
-            'confidence': 0.8,
-            'recommendation': 'Monitor situation'
-        }
+        print(f"Bedrock Agent response: {completion}")
         
     except Exception as e:
         print(f"Error invoking Bedrock Agent: {str(e)}")
+        bedrock_breaker.record_failure((time.monotonic() - started) * 1000)
         return fallback_incident_processing(incident_id, context_data)
+    
+    # Carry out the remediation steps the agent asked for
+    remediation = execute_remediation(incident_id, completion, deadline)
+    succeeded = [step['id'] for step in remediation if step['status'] == 'succeeded']
+    
+    return {
+        'agent_response': completion,
+        'actions_taken': succeeded or ['analysis_completed'],
+        'remediation': remediation,
+        'confidence': 0.8,
+        'recommendation': 'Monitor situation'
+    }
+
+def execute_remediation(incident_id: str, agent_response: str, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+    """
+    Run the remediation actions in an agent response.
+    
+    Args:
+        incident_id: Unique incident identifier
+        agent_response: Agent completion text, possibly containing an actions block
+        deadline: Invocation deadline; steps still running when it passes keep running
+        
+    Returns:
+        Result per requested action
+    """
+    actions = parse_actions(agent_response)
+    if not actions:
+        return []
+    
+    print(f"Executing {len(actions)} remediation actions for incident {incident_id}")
+    
+    try:
+        return remediation_executor.execute(actions, deadline)
+    except Exception as e:
+        print(f"Error executing remediation: {str(e)}")
+        send_alert(f"Remediation for incident {incident_id} failed: {str(e)}", 'high')
+        return []
+
+def build_agent_input(incident_id: str, context_data: Dict[str, Any]) -> str:
+    """
+    Build the analysis request sent to the Bedrock Agent.
+    
+    Args:
+        incident_id: Unique incident identifier
+        context_data: Incident context information
+        
+    Returns:
+        Agent input text
+    """
+    return f"""
+        Incident Analysis Request:
+        
+        Incident ID: {incident_id}
+        Alarm: {context_data['alarm']['name']}
+        State: {context_data['alarm']['state']}
+        Reason: {context_data['alarm']['reason']}
+        Region: {context_data['region']}
+        {format_flapping(context_data.get('flapping'))}
+        Metric Signals (z-scores vs trailing and same-time-yesterday baselines):
+        {chr(10).join(format_metric_summary(m) for m in context_data.get('metrics', [])) or format_no_metrics(context_data)}
+        
+        Recent Logs:
+        {chr(10).join(context_data['logs'])}
+        
+        Correlated Alarms (same cascade, related services):
+        {chr(10).join(f"- {a['alarmName']} ({a['state']}): {a['reason']}" for a in context_data.get('correlated_alarms', [])) or 'None'}
+        
+        Similar Past Incidents:
+        {chr(10).join(format_similar_incident(i) for i in context_data.get('similar_incidents', [])) or 'None found'}
+        
+        Please analyze this incident and recommend appropriate remediation actions.
+        To run remediation, include a JSON object of the form
+        {{"actions": [{{"id": "...", "type": "ssm_automation", "document": "...", "parameters": {{}}, "timeout_seconds": 300}},
+                      {{"id": "...", "type": "lambda", "function": "...", "payload": {{}}, "depends_on": ["..."]}}]}}
+        Actions without depends_on run in parallel.
+        """
+
+def format_flapping(flapping: Optional[Dict[str, Any]]) -> str:
+    """Describe a flapping alarm's recent transitions for the agent, or nothing."""
+    if not flapping:
+        return ''
+    
+    transitions = ', '.join(
+        f"{state} at {datetime.utcfromtimestamp(seconds).strftime('%H:%M:%S')}"
+        for seconds, state in flapping.get('transitions', [])
+    )
+    return f"Flapping: alarm is cycling between ALARM and OK (recent transitions: {transitions})\n"
+
+def format_no_metrics(context_data: Dict[str, Any]) -> str:
+    """Why the agent input has no metric signals."""
+    if context_data.get('metrics_readable', True):
+        return 'None available'
+    return f"Not readable: alarm is in account {context_data.get('account')}, outside this function's account"
+
+def format_similar_incident(incident: Dict[str, Any]) -> str:
+    """Format a similar past incident as one line of agent input."""
+    if 'completedAt' not in incident:
+        # Indexes built before completedAt was added hold the completion time as resolvedAt
+        when = f"handled {incident.get('resolvedAt', '')}"
+    elif incident.get('resolvedAt'):
+        when = f"resolved {incident['resolvedAt']}"
+    else:
+        when = f"handled {incident['completedAt']}"
+    return (
+        f"- {incident['alarmName']} (similarity {incident['similarity']}, {when}): "
+        f"action={incident['action']}; {incident['recommendation']}"
+    )
 
 def fallback_incident_processing(incident_id: str, context_data: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -256,16 +766,8 @@ def fallback_incident_processing(incident_id: str, context_data: Dict[str, Any])
     """
     alarm_name = context_data['alarm']['name']
     
-    # Simple rule-based fallback logic
-    if 'CPU' in alarm_name.upper():
-        action = 'cpu_high_detected'
-        recommendation = 'Consider scaling out or investigating high CPU usage'
-    elif 'MEMORY' in alarm_name.upper():
-        action = 'memory_high_detected'
-        recommendation = 'Check for memory leaks or scale up instance'
-    else:
-        action = 'generic_alarm'
-        recommendation = 'Manual investigation required'
+    # Compiled rule-based fallback logic
+    decision = fallback_rules.decide(context_data, use_logs=FALLBACK_RULES_USE_LOGS)
     
     # Send notification for human review
     send_alert(
@@ -275,11 +777,111 @@ def fallback_incident_processing(incident_id: str, context_data: Dict[str, Any])
     
     return {
         'fallback_processing': True,
-        'action': action,
-        'recommendation': recommendation,
+        **decision,
         'human_notified': True
     }
 
+def prefilter_incident(incident_id: str, context_data: Dict[str, Any], original_event: Dict[str, Any],
+                       history: Optional[Tuple[int, int]] = None) -> Optional[Verdict]:
+    """Score the incident with the benign pre-filter; errors send it to the agent."""
+    try:
+        verdict = benign_prefilter.evaluate(incident_id, context_data, original_event['detail']['state'], history)
+        if verdict is not None:
+            emit_metric(verdict, benign_prefilter.mode, ENVIRONMENT)
+        return verdict
+    except Exception as e:
+        print(f"Error in benign pre-filter: {str(e)}")
+        return None
+
+def skip_agent(incident_id: str, context_data: Dict[str, Any], verdict: Verdict) -> Dict[str, Any]:
+    """
+    Handle an incident the pre-filter scored as benign without invoking the agent.
+    
+    In 'fallback' mode the rule-based fallback runs and notifies humans as
+    usual; in 'auto_close' mode the incident is closed with no notification.
+    """
+    print(f"Benign pre-filter skipped agent for {incident_id} (score {verdict.score:.3f})")
+    
+    if benign_prefilter.mode == 'auto_close':
+        return {
+            'action': 'auto_closed',
+            'recommendation': 'Matches a known benign pattern: metric recovered and this alarm usually resolves on its own',
+            'actions_taken': [],
+            'human_notified': False
+        }
+    return fallback_incident_processing(incident_id, context_data)
+
+def record_outcome(incident_id: str, opened: bool, at: Optional[int] = None) -> Optional[Tuple[int, int]]:
+    """
+    Count an opened incident, or a quick self-resolution, in the pre-filter's outcome history.
+    
+    Returns:
+        For an opening, the (opened, quick_resolved) counts from before it; otherwise None
+    """
+    try:
+        if opened:
+            return benign_prefilter.history.record_opened(incident_id, at or now_ms())
+        if benign_prefilter.history.record_resolved(incident_id, at or now_ms()):
+            print(f"Quick self-resolution recorded: {incident_id}")
+    except Exception as e:
+        print(f"Error recording incident outcome: {str(e)}")
+    return None
+
+def release_slot(envelope: IncidentEnvelope) -> None:
+    """Give back the fair scheduler's in-flight slot for an incident it dispatched."""
+    if envelope.queued_account is None or envelope.queued_slot is None:
+        return
+    
+    try:
+        release(incident_table, envelope.queued_account, envelope.queued_slot)
+    except Exception as e:
+        # The scheduler stops counting a slot once its lease runs out
+        print(f"Error releasing fair scheduling slot: {str(e)}")
+
+def register_verification(incident_id: str, incident: Incident) -> None:
+    """
+    Hand an incident with remediation in flight to the remediation verifier.
+    
+    The verifier reads the alarm's metric definition and threshold from the
+    stored configuration and state.
+    """
+    metrics = incident.metrics
+    if not metrics:
+        print(f"No metric definition on alarm, skipping verification: {incident_id}")
+        return
+    
+    registered_at = now_ms()
+    item = {
+        'incidentId': 'verification#pending',
+        'targetIncidentId': incident_id,
+        'targetAlarmName': incident.alarm_name,
+        'targetRegion': incident.region,
+        'targetAccount': incident.account,
+        'metrics': json.dumps(metrics),
+        'state': json.dumps(incident.event['detail']['state']),
+        'phase': 'watching',
+        'registeredAt': registered_at,
+        'verifyUntil': registered_at + VERIFICATION_WINDOW_SECONDS * 1000,
+        'ttl': registered_at // 1000 + VERIFICATION_WINDOW_SECONDS + 86400
+    }
+    
+    try:
+        # Sort keys are registration times; step past another incident registered in the same millisecond
+        for offset in range(5):
+            try:
+                incident_table.put_item(
+                    Item=dict(item, timestamp=registered_at + offset),
+                    ConditionExpression='attribute_not_exists(incidentId)'
+                )
+                print(f"Incident registered for verification: {incident_id}")
+                return
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+        
+    except Exception as e:
+        print(f"Error registering verification: {str(e)}")
+
 def update_incident_status(incident_id: str, status: str, result: Optional[Dict[str, Any]] = None) -> None:
     """Update incident status in DynamoDB."""
     try:
@@ -306,6 +908,36 @@ def update_incident_status(incident_id: str, status: str, result: Optional[Dict[
     except Exception as e:
         print(f"Error updating incident status: {str(e)}")
 
+def update_incident_lifecycle(incident_id: str, lifecycle: str) -> None:
+    """
+    Record whether an incident's alarm is resolved, reopened or flapping.
+    
+    Kept apart from status, which stays the processing outcome (MTTR and the
+    similarity index read 'completed') and may still be written by a run in
+    progress.
+    """
+    try:
+        update_expression = "SET #lifecycle = :lifecycle, lifecycleAt = :now"
+        if lifecycle == 'resolved':
+            update_expression += ", resolvedAt = :now"
+        else:
+            update_expression += " REMOVE resolvedAt"
+        
+        incident_table.update_item(
+            Key={'incidentId': incident_id, 'timestamp': 0},
+            UpdateExpression=update_expression,
+            ExpressionAttributeNames={'#lifecycle': 'lifecycle'},
+            ExpressionAttributeValues={
+                ':lifecycle': lifecycle,
+                ':now': datetime.utcnow().isoformat()
+            }
+        )
+        
+        print(f"Incident lifecycle updated: {incident_id} -> {lifecycle}")
+        
+    except Exception as e:
+        print(f"Error updating incident lifecycle: {str(e)}")
+
 def send_alert(message: str, severity: str = 'medium') -> None:
     """Send alert notification via SNS."""
     try:
@@ -0,0 +1,108 @@
+"""
+Opt-in Memory Profiling per Invocation
+
+With MEMORY_PROFILING on, the handler traces Python allocations with
+tracemalloc for the length of each incident and logs one compact line:
+
+    MEMORY_PROFILE {"id":"inc-...","limit":512,"rss":143,"s":[["context",18.2,1.1],...],"top":[["index.py:460",6.4,812],...]}
+
+    limit  configured Lambda memory in MB
+    rss    peak resident set size of the container so far in MB, what Lambda
+           compares with the limit
+    s      per stage: [name, peak MB allocated during the stage, MB still held
+           when it ended]
+    top    largest allocation sites still live at the end: [file:line, MB, blocks]
+
+scripts/memory_report.py aggregates these lines into memory size
+recommendations. Tracing slows allocation-heavy code noticeably, so leave it
+off except while sizing.
+"""
+
+import json
+import os
+import resource
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional
+
+MB = 1024 * 1024
+
+# Allocations made by the profiler and the import system are not the handler's
+IGNORED_FILES = (
+    __file__, tracemalloc.__file__, '<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>'
+)
+
+
+class MemoryProfiler:
+    """Per-stage peak allocations and top allocation sites of one invocation."""
+
+    def __init__(self, enabled: bool = False, top_n: int = 5, frames: int = 1):
+        self.enabled = enabled
+        self.top_n = top_n
+        self.frames = frames
+        self.stages: List[List[Any]] = []
+        self._active = False
+
+    @classmethod
+    def from_env(cls) -> 'MemoryProfiler':
+        """Build from MEMORY_PROFILING, MEMORY_PROFILE_TOP and MEMORY_PROFILE_FRAMES."""
+        return cls(
+            enabled=os.environ.get('MEMORY_PROFILING', 'false').lower() == 'true',
+            top_n=int(os.environ.get('MEMORY_PROFILE_TOP', '5')),
+            frames=int(os.environ.get('MEMORY_PROFILE_FRAMES', '1'))
+        )
+
+    def start(self) -> None:
+        """Start tracing allocations for this invocation."""
+        if not self.enabled:
+            return
+        self.stages = []
+        tracemalloc.start(self.frames)
+        self._active = True
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Record the peak and retained allocations of the enclosed block."""
+        if not self._active:
+            yield
+            return
+
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self.stages.append([name, round((peak - base) / MB, 1), round((current - base) / MB, 1)])
+
+    def top_sites(self, snapshot: tracemalloc.Snapshot) -> List[List[Any]]:
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, path) for path in IGNORED_FILES])
+        sites = []
+        for stat in snapshot.statistics('lineno')[:self.top_n]:
+            frame = stat.traceback[0]
+            sites.append([f"{os.path.basename(frame.filename)}:{frame.lineno}", round(stat.size / MB, 2), stat.count])
+        return sites
+
+    def finish(self, incident_id: Optional[str], context) -> None:
+        """Log the invocation's profile and stop tracing."""
+        if not self._active:
+            return
+
+        try:
+            profile = {
+                'id': incident_id,
+                'limit': int(getattr(context, 'memory_limit_in_mb', 0) or 0),
+                # ru_maxrss is in KB on Linux
+                'rss': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024),
+                's': self.stages,
+                'top': self.top_sites(tracemalloc.take_snapshot())
+            }
+            print('MEMORY_PROFILE ' + json.dumps(profile, separators=(',', ':')))
+
+        except Exception as e:
+            print(f"Error writing memory profile: {str(e)}")
+
+        finally:
+            # Stopping also frees the traces, so warm invocations start clean
+            tracemalloc.stop()
+            self._active = False
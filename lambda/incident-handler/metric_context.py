@@ -0,0 +1,274 @@
+"""
+Metric Context Enrichment
+
+Fetches the alarm metric and a few related metrics of the same resource with
+a single GetMetricData call covering the lookback window plus the same window
+one day earlier, and condenses every series into a handful of numbers for the
+agent: current level against the trailing baseline (z-score), rate of change,
+the seasonal baseline from the previous day and the most likely change point.
+
+All series are aligned on one time grid and the statistics are computed for
+all of them at once with NumPy, so only the compact summary reaches the
+agent input, never raw datapoints. Metrics are read in the alarm's region;
+an alarm in another account cannot be read and is reported as such.
+"""
+
+import os
+import warnings
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from shared.metrics import RegionalClients, alarm_metric_queries, get_metric_data
+
+SEASON_SECONDS = 86400
+
+# Related metrics fetched for a resource whose alarm metric is in one of these namespaces
+RELATED_METRICS = {
+    'AWS/EC2': [('CPUUtilization', 'Average'), ('NetworkIn', 'Sum'), ('NetworkOut', 'Sum'),
+                ('StatusCheckFailed', 'Maximum')],
+    'AWS/RDS': [('CPUUtilization', 'Average'), ('DatabaseConnections', 'Average'), ('ReadLatency', 'Average'),
+                ('WriteLatency', 'Average'), ('FreeableMemory', 'Average')],
+    'AWS/ApplicationELB': [('TargetResponseTime', 'p99'), ('HTTPCode_Target_5XX_Count', 'Sum'),
+                           ('RequestCount', 'Sum')],
+    'AWS/Lambda': [('Errors', 'Sum'), ('Throttles', 'Sum'), ('Duration', 'p99'), ('Invocations', 'Sum')],
+    'AWS/SQS': [('ApproximateNumberOfMessagesVisible', 'Maximum'), ('ApproximateAgeOfOldestMessage', 'Maximum')],
+    'AWS/DynamoDB': [('ThrottledRequests', 'Sum'), ('SuccessfulRequestLatency', 'Average')],
+}
+
+
+def related_metric_queries(metrics: List[Dict[str, Any]], period: int) -> List[Tuple[Dict[str, Any], str]]:
+    """Queries for related metrics of the resources the alarm watches, with display labels."""
+    queries = []
+    seen = set()
+
+    for metric in metrics:
+        stat = metric.get('metricStat')
+        if not stat:
+            continue
+        namespace = stat['metric']['namespace']
+        dimensions = stat['metric'].get('dimensions', {})
+        for name, statistic in RELATED_METRICS.get(namespace, []):
+            key = (namespace, name, tuple(sorted(dimensions.items())))
+            if name == stat['metric']['name'] or key in seen:
+                continue
+            seen.add(key)
+            queries.append(({
+                'Id': f"r{len(queries)}",
+                'MetricStat': {
+                    'Metric': {
+                        'Namespace': namespace,
+                        'MetricName': name,
+                        'Dimensions': [{'Name': k, 'Value': str(v)} for k, v in dimensions.items()]
+                    },
+                    'Period': period,
+                    'Stat': statistic
+                },
+                'ReturnData': True
+            }, f"{namespace} {name} {statistic}"))
+
+    return queries
+
+
+def align(series: List[Tuple[list, list]], start: datetime, period: int, columns: int) -> np.ndarray:
+    """Place every series on a shared time grid; missing datapoints are NaN."""
+    matrix = np.full((len(series), columns), np.nan)
+    origin = start.timestamp()
+
+    for row, (timestamps, values) in enumerate(series):
+        if not timestamps:
+            continue
+        first = (timestamps[0].timestamp() - origin) // period
+        last = (timestamps[-1].timestamp() - origin) // period
+        if abs(last - first) == len(timestamps) - 1:
+            # Gapless series (the usual case): the grid index follows from the endpoints
+            index = np.linspace(first, last, len(timestamps)).astype(np.int64)
+        else:
+            index = ((np.array([t.timestamp() for t in timestamps]) - origin) // period).astype(np.int64)
+        keep = (index >= 0) & (index < columns)
+        matrix[row, index[keep]] = np.asarray(values, dtype=np.float64)[keep]
+
+    return matrix
+
+
+def summarize(matrix: np.ndarray, period: int, lookback_points: int, recent_points: int = 5,
+              slope_points: int = 15) -> Dict[str, np.ndarray]:
+    """
+    Vectorised anomaly statistics for every row of an aligned series matrix.
+
+    The last ``lookback_points`` columns are the current window; the same
+    number of columns one season (a day) earlier are the seasonal baseline.
+
+    Returns:
+        Arrays with one value per series: current, baseline mean/std, z-score,
+        slope per minute, seasonal mean and z-score, change point age in
+        minutes and the mean shift at the change point
+    """
+    window = matrix[:, -lookback_points:]
+    season_offset = SEASON_SECONDS // period
+    seasonal = matrix[:, -lookback_points - season_offset:matrix.shape[1] - season_offset]
+
+    # Series without data produce NaN statistics; NumPy's empty-slice warnings are expected
+    with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        current = np.nanmean(window[:, -recent_points:], axis=1)
+        history = window[:, :-recent_points]
+        baseline_mean = np.nanmean(history, axis=1)
+        baseline_std = np.nanstd(history, axis=1)
+        zscore = (current - baseline_mean) / np.where(baseline_std > 0, baseline_std, np.nan)
+
+        # Least-squares slope over the last points, ignoring gaps
+        tail = window[:, -slope_points:]
+        x = np.broadcast_to(np.arange(slope_points, dtype=np.float64) * period / 60, tail.shape)
+        mask = ~np.isnan(tail)
+        n = mask.sum(axis=1)
+        x_mean = np.where(mask, x, 0).sum(axis=1) / n
+        y_mean = np.nansum(tail, axis=1) / n
+        dx = np.where(mask, x - x_mean[:, None], 0)
+        dy = np.where(mask, tail - y_mean[:, None], 0)
+        slope = (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1)
+
+        seasonal_mean = np.nanmean(seasonal, axis=1)
+        seasonal_std = np.nanstd(seasonal, axis=1)
+        seasonal_z = (current - seasonal_mean) / np.where(seasonal_std > 0, seasonal_std, np.nan)
+
+        change_age, change_shift = change_points(window, period)
+
+    return {
+        'current': current,
+        'baseline_mean': baseline_mean,
+        'baseline_std': baseline_std,
+        'zscore': zscore,
+        'slope_per_min': slope,
+        'seasonal_mean': seasonal_mean,
+        'seasonal_z': seasonal_z,
+        'change_minutes_ago': change_age,
+        'change_shift': change_shift,
+    }
+
+
+def change_points(window: np.ndarray, period: int, min_segment: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Single most likely mean shift per series (binary segmentation, one split).
+
+    Gaps are filled with the series mean first. The split maximises the
+    standardised difference of the means on either side, computed for every
+    split of every series at once from cumulative sums.
+    """
+    rows, columns = window.shape
+    if columns < 2 * min_segment:
+        return np.full(rows, np.nan), np.full(rows, np.nan)
+
+    filled = np.where(np.isnan(window), np.nanmean(window, axis=1)[:, None], window)
+    filled = np.nan_to_num(filled)
+    cumulative = np.cumsum(filled, axis=1)
+    total = cumulative[:, -1:]
+
+    left_n = np.arange(1, columns, dtype=np.float64)
+    right_n = columns - left_n
+    left_mean = cumulative[:, :-1] / left_n
+    right_mean = (total - cumulative[:, :-1]) / right_n
+    score = np.abs(right_mean - left_mean) * np.sqrt(left_n * right_n / columns)
+
+    valid = (left_n >= min_segment) & (right_n >= min_segment)
+    score[:, ~valid] = -np.inf
+    split = np.argmax(score, axis=1)
+
+    shift = right_mean[np.arange(rows), split] - left_mean[np.arange(rows), split]
+    minutes_ago = (columns - 1 - split) * period / 60
+    return minutes_ago, shift
+
+
+def _round(value: float) -> Optional[float]:
+    if value is None or not np.isfinite(value):
+        return None
+    return float(f"{value:.3g}")
+
+
+class MetricContextFetcher:
+    """Fetches and condenses the metrics around an alarm for the agent."""
+
+    def __init__(self, clients: RegionalClients, lookback_minutes: int = 180, period: int = 60):
+        self.clients = clients
+        self.lookback_minutes = lookback_minutes
+        self.period = period
+
+    @classmethod
+    def from_env(cls, clients: RegionalClients) -> 'MetricContextFetcher':
+        """Build a fetcher configured from METRIC_CONTEXT_* environment variables."""
+        return cls(
+            clients,
+            lookback_minutes=int(os.environ.get('METRIC_CONTEXT_LOOKBACK_MINUTES', '180')),
+            period=int(os.environ.get('METRIC_CONTEXT_PERIOD', '60'))
+        )
+
+    def readable(self, original_event: Dict[str, Any]) -> bool:
+        """Whether the alarm's metrics can be read, i.e. the alarm is in this function's account."""
+        return self.clients.for_alarm(original_event.get('region'), original_event.get('account')) is not None
+
+    def fetch(self, original_event: Dict[str, Any], now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Summarise the alarm metric and related metrics of the alarmed resource.
+
+        Args:
+            original_event: CloudWatch alarm event
+            now: End of the window (default: current time)
+
+        Returns:
+            One compact summary per metric; empty if the alarm has no metric
+            definition or is not readable
+        """
+        metrics = original_event['detail'].get('configuration', {}).get('metrics', [])
+        cloudwatch = self.clients.for_alarm(original_event.get('region'), original_event.get('account'))
+        if not metrics or cloudwatch is None:
+            return []
+
+        alarm_queries, alarm_series = alarm_metric_queries(metrics, 'a_')
+        queries = list(alarm_queries)
+        labels = {alarm_series: 'alarm ' + alarm_label(metrics)} if alarm_series else {}
+        for query, label in related_metric_queries(metrics, self.period):
+            queries.append(query)
+            labels[query['Id']] = label
+        if not labels:
+            return []
+
+        now = now or datetime.now(timezone.utc)
+        lookback_points = self.lookback_minutes * 60 // self.period
+        columns = SEASON_SECONDS // self.period + lookback_points
+        start = now - timedelta(seconds=columns * self.period)
+
+        series = get_metric_data(cloudwatch, [queries], start, now)
+        ids = list(labels)
+        matrix = align([series.get(i, ([], [])) for i in ids], start, self.period, columns)
+        stats = summarize(matrix, self.period, lookback_points)
+
+        summaries = []
+        for row, query_id in enumerate(ids):
+            if np.isnan(stats['current'][row]) and np.isnan(stats['baseline_mean'][row]):
+                continue
+            summaries.append({
+                'metric': labels[query_id],
+                **{name: _round(values[row]) for name, values in stats.items()}
+            })
+        return summaries
+
+
+def alarm_label(metrics: List[Dict[str, Any]]) -> str:
+    for metric in metrics:
+        if metric.get('returnData', True):
+            if 'metricStat' in metric:
+                stat = metric['metricStat']
+                return f"{stat['metric']['namespace']} {stat['metric']['name']} {stat['stat']}"
+            return metric.get('label') or metric.get('expression', '')
+    return ''
+
+
+def format_metric_summary(summary: Dict[str, Any]) -> str:
+    """One line of agent input per metric."""
+    parts = [f"now={summary['current']}", f"baseline={summary['baseline_mean']}±{summary['baseline_std']}",
+             f"z={summary['zscore']}", f"slope/min={summary['slope_per_min']}",
+             f"yesterday={summary['seasonal_mean']} (z={summary['seasonal_z']})"]
+    if summary.get('change_minutes_ago') is not None:
+        parts.append(f"shift {summary['change_shift']} about {summary['change_minutes_ago']:g} min ago")
+    return f"- {summary['metric']}: " + ', '.join(parts)
@@ -0,0 +1,197 @@
+"""
+Benign Incident Pre-filter
+
+Scores each incident with a small logistic model before the Bedrock Agent is
+called. The features come from the metric summary already in the incident
+context (is the alarm metric back on the OK side of its threshold, is it
+moving towards it, how unusual is it against the trailing and same-time-
+yesterday baselines) and from the fingerprint's history: how often its past
+incidents resolved on their own shortly after opening.
+
+Incidents scored benign with high confidence skip the agent and go to the
+rule-based fallback, or are closed automatically. Every decision is logged
+as a CloudWatch embedded metric so the skip rate can be graphed.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from botocore.exceptions import ClientError
+
+from shared.metrics import alarm_threshold, breaching
+
+FEATURES = ('not_breaching', 'recovering', 'abs_zscore', 'abs_seasonal_z', 'history')
+
+# Hand-set weights: a recovered, unremarkable metric alone is not enough;
+# the fingerprint must also have a record of resolving on its own
+DEFAULT_WEIGHTS = (2.5, 1.0, -0.4, -0.3, 6.0)
+DEFAULT_BIAS = -2.0
+
+MODES = ('off', 'shadow', 'fallback', 'auto_close')
+
+
+class OutcomeHistory:
+    """Per-fingerprint counts of incidents opened and of those that resolved on their own quickly."""
+
+    def __init__(self, table, quick_resolve_seconds: int = 600):
+        self.table = table
+        self.quick_resolve_seconds = quick_resolve_seconds
+
+    @staticmethod
+    def key(incident_id: str) -> Dict[str, Any]:
+        return {'incidentId': f'outcomes#{incident_id}', 'timestamp': 0}
+
+    def get(self, incident_id: str) -> Tuple[int, int]:
+        """Returns (opened, quick_resolved)."""
+        item = self.table.get_item(Key=self.key(incident_id)).get('Item') or {}
+        return int(item.get('opened', 0)), int(item.get('quickResolved', 0))
+
+    def record_opened(self, incident_id: str, opened_ms: int) -> Tuple[int, int]:
+        """Count an opening at the given time; returns (opened, quick_resolved) from before it."""
+        item = self.table.update_item(
+            Key=self.key(incident_id),
+            UpdateExpression='SET lastOpenedAt = :opened ADD opened :one',
+            ExpressionAttributeValues={':opened': opened_ms, ':one': 1},
+            ReturnValues='ALL_OLD'
+        ).get('Attributes') or {}
+        return int(item.get('opened', 0)), int(item.get('quickResolved', 0))
+
+    def record_resolved(self, incident_id: str, now_ms: int) -> bool:
+        """Count a resolution if it came soon after the latest opening and was not counted yet."""
+        try:
+            self.table.update_item(
+                Key=self.key(incident_id),
+                UpdateExpression='SET lastResolvedAt = :now ADD quickResolved :one',
+                ConditionExpression=(
+                    'lastOpenedAt >= :since AND '
+                    '(attribute_not_exists(lastResolvedAt) OR lastResolvedAt < lastOpenedAt)'
+                ),
+                ExpressionAttributeValues={
+                    ':now': now_ms,
+                    ':one': 1,
+                    ':since': now_ms - self.quick_resolve_seconds * 1000
+                }
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
+
+
+class Verdict:
+    """Pre-filter decision for one incident."""
+
+    __slots__ = ('score', 'skip', 'features')
+
+    def __init__(self, score: float, skip: bool, features: Dict[str, float]):
+        self.score = score
+        self.skip = skip
+        self.features = features
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'score': round(self.score, 4), 'skipped': self.skip, 'features': self.features}
+
+
+class BenignPrefilter:
+    """Logistic benign-incident score over metric and history features."""
+
+    def __init__(self, history: OutcomeHistory, threshold: float = 0.9, mode: str = 'fallback',
+                 weights=DEFAULT_WEIGHTS, bias: float = DEFAULT_BIAS, full_confidence_incidents: int = 10):
+        if mode not in MODES:
+            raise ValueError(f"Unknown pre-filter mode: {mode}")
+        self.history = history
+        self.threshold = threshold
+        self.mode = mode
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = bias
+        self.full_confidence_incidents = full_confidence_incidents
+
+    @classmethod
+    def from_env(cls, table) -> 'BenignPrefilter':
+        """Build a pre-filter configured from PREFILTER_* environment variables."""
+        return cls(
+            OutcomeHistory(table, int(os.environ.get('PREFILTER_QUICK_RESOLVE_SECONDS', '600'))),
+            threshold=float(os.environ.get('PREFILTER_BENIGN_THRESHOLD', '0.9')),
+            mode=os.environ.get('PREFILTER_MODE', 'fallback')
+        )
+
+    def features(self, metrics: List[Dict[str, Any]], alarm_state: Dict[str, Any],
+                 opened: int, quick_resolved: int) -> np.ndarray:
+        """Feature vector in FEATURES order; missing signals take their least benign value."""
+        summary = next((m for m in metrics if m['metric'].startswith('alarm ')), None)
+        threshold, comparison = alarm_threshold(alarm_state)
+
+        not_breaching = recovering = 0.0
+        abs_z = abs_seasonal_z = 10.0
+        if summary is not None:
+            current = summary.get('current')
+            if current is not None and threshold is not None and comparison is not None:
+                not_breaching = float(not breaching(current, threshold, comparison))
+                slope = summary.get('slope_per_min') or 0.0
+                recovering = float(slope < 0 if comparison.startswith('Greater') else slope > 0)
+            if summary.get('zscore') is not None:
+                abs_z = min(abs(summary['zscore']), 10.0)
+            if summary.get('seasonal_z') is not None:
+                abs_seasonal_z = min(abs(summary['seasonal_z']), 10.0)
+
+        # Laplace-smoothed self-resolution rate, trusted more as incidents accumulate
+        rate = (quick_resolved + 1) / (opened + 2)
+        history = (rate - 0.5) * min(1.0, opened / self.full_confidence_incidents)
+
+        return np.array([not_breaching, recovering, abs_z, abs_seasonal_z, history])
+
+    def evaluate(self, incident_id: str, context_data: Dict[str, Any],
+                 alarm_state: Dict[str, Any], history: Optional[Tuple[int, int]] = None) -> Optional[Verdict]:
+        """
+        Score an incident.
+
+        Args:
+            incident_id: Unique incident identifier
+            context_data: Incident context with the metric summaries
+            alarm_state: 'detail.state' from the alarm event, for the threshold
+            history: (opened, quick_resolved) from before this incident, if already known
+
+        Returns:
+            Verdict, or None when the pre-filter is off
+        """
+        if self.mode == 'off':
+            return None
+
+        try:
+            opened, quick_resolved = history if history is not None else self.history.get(incident_id)
+        except Exception as e:
+            print(f"Error reading outcome history: {str(e)}")
+            opened = quick_resolved = 0
+
+        x = self.features(context_data.get('metrics', []), alarm_state, opened, quick_resolved)
+        score = float(1 / (1 + np.exp(-(self.bias + self.weights @ x))))
+        skip = score >= self.threshold and self.mode != 'shadow'
+
+        return Verdict(score, skip, {name: round(float(v), 3) for name, v in zip(FEATURES, x)})
+
+
+def emit_metric(verdict: Verdict, mode: str, environment: str) -> None:
+    """Log the decision in CloudWatch embedded metric format (one line, no API call)."""
+    print(json.dumps({
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': 'DevOpsAgent/Prefilter',
+                'Dimensions': [['Environment', 'Mode']],
+                'Metrics': [
+                    {'Name': 'Scored', 'Unit': 'Count'},
+                    {'Name': 'AgentSkipped', 'Unit': 'Count'},
+                    {'Name': 'BenignScore', 'Unit': 'None'}
+                ]
+            }]
+        },
+        'Environment': environment,
+        'Mode': mode,
+        'Scored': 1,
+        'AgentSkipped': int(verdict.skip),
+        'BenignScore': round(verdict.score, 4)
+    }))
@@ -0,0 +1,335 @@
+"""
+Parallel Remediation Executor
+
+Turns the actions requested by the Bedrock Agent into SSM Automation
+executions and Lambda invocations. Actions run concurrently up to a cap,
+respecting any ``depends_on`` ordering between them, so a multi-step
+remediation takes about as long as its slowest chain of steps instead of the
+sum of all steps.
+
+SSM executions are polled with exponential backoff, with one batched
+DescribeAutomationExecutions call per poll cycle covering every execution in
+flight. Lambda actions are invoked synchronously on worker threads, through
+a client that never retries and outwaits the longest action timeout, so an
+invocation is never repeated behind the executor's back. Every action has its
+own timeout, capped at the executor's maximum, and its own recorded result.
+Only SSM documents and Lambda functions on the configured allowlists are ever
+started.
+"""
+
+import json
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+SSM_AUTOMATION = 'ssm_automation'
+LAMBDA = 'lambda'
+
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+TIMED_OUT = 'timed_out'
+SKIPPED = 'skipped'
+IN_PROGRESS = 'in_progress'
+
+SSM_SUCCESS = {'Success', 'CompletedWithSuccess'}
+SSM_FAILURE = {
+    'Failed', 'TimedOut', 'Cancelled', 'Rejected', 'CompletedWithFailure',
+    'ChangeCalendarOverrideRejected'
+}
+
+# DescribeAutomationExecutions accepts at most 10 values per filter
+DESCRIBE_BATCH_SIZE = 10
+
+ACTIONS_BLOCK = re.compile(r'\{\s*"actions"\s*:', re.MULTILINE)
+
+
+class RemediationAction:
+    """One remediation step requested by the agent."""
+
+    __slots__ = ('action_id', 'kind', 'target', 'parameters', 'timeout_seconds', 'depends_on')
+
+    def __init__(self, action_id: str, kind: str, target: str, parameters: Dict[str, Any],
+                 timeout_seconds: int, depends_on: List[str]):
+        self.action_id = action_id
+        self.kind = kind
+        self.target = target
+        self.parameters = parameters
+        self.timeout_seconds = timeout_seconds
+        self.depends_on = depends_on
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], index: int, default_timeout: int) -> 'RemediationAction':
+        kind = data['type']
+        if kind == SSM_AUTOMATION:
+            target, parameters = data['document'], data.get('parameters', {})
+        elif kind == LAMBDA:
+            target, parameters = data['function'], data.get('payload', {})
+        else:
+            raise ValueError(f"Unknown remediation action type: {kind}")
+
+        return cls(
+            action_id=str(data.get('id') or f'action-{index}'),
+            kind=kind,
+            target=target,
+            parameters=parameters,
+            timeout_seconds=int(data.get('timeout_seconds', default_timeout)),
+            depends_on=[str(d) for d in data.get('depends_on', [])]
+        )
+
+
+def parse_actions(agent_response: str, default_timeout: int = 300) -> List[RemediationAction]:
+    """
+    Extract the JSON actions block from an agent response.
+
+    The agent is asked to answer with an object like
+    {"actions": [{"id": ..., "type": "ssm_automation", "document": ..., "parameters": {...}},
+                 {"id": ..., "type": "lambda", "function": ..., "payload": {...}, "depends_on": [...]}]}
+    anywhere in its text. Responses without one yield no actions.
+    """
+    match = ACTIONS_BLOCK.search(agent_response)
+    if match is None:
+        return []
+
+    try:
+        block, _ = json.JSONDecoder().raw_decode(agent_response, match.start())
+    except ValueError as e:
+        print(f"Error parsing agent actions: {str(e)}")
+        return []
+
+    actions = []
+    for index, data in enumerate(block.get('actions', [])):
+        try:
+            actions.append(RemediationAction.from_dict(data, index, default_timeout))
+        except (KeyError, ValueError, TypeError) as e:
+            print(f"Skipping malformed agent action {index}: {str(e)}")
+    return actions
+
+
+class RemediationExecutor:
+    """Runs remediation actions concurrently with a cap, backoff polling and per-action timeouts."""
+
+    def __init__(self, ssm_client, lambda_client, max_concurrency: int = 4,
+                 allowed_documents: Optional[List[str]] = None, allowed_functions: Optional[List[str]] = None,
+                 poll_initial_seconds: float = 1.0, poll_max_seconds: float = 15.0,
+                 max_timeout_seconds: int = 900):
+        self.ssm_client = ssm_client
+        self.lambda_client = lambda_client
+        self.max_concurrency = max_concurrency
+        self.allowed_documents = set(allowed_documents or [])
+        self.allowed_functions = set(allowed_functions or [])
+        self.poll_initial_seconds = poll_initial_seconds
+        self.poll_max_seconds = poll_max_seconds
+        self.max_timeout_seconds = max_timeout_seconds
+
+    @classmethod
+    def from_env(cls, ssm_client, lambda_client) -> 'RemediationExecutor':
+        """Build an executor configured from REMEDIATION_* environment variables."""
+        return cls(
+            ssm_client,
+            lambda_client,
+            max_concurrency=int(os.environ.get('REMEDIATION_MAX_CONCURRENCY', '4')),
+            allowed_documents=[d for d in os.environ.get('REMEDIATION_ALLOWED_DOCUMENTS', '').split(',') if d],
+            allowed_functions=[f for f in os.environ.get('REMEDIATION_ALLOWED_FUNCTIONS', '').split(',') if f],
+            poll_max_seconds=float(os.environ.get('REMEDIATION_POLL_MAX_SECONDS', '15')),
+            max_timeout_seconds=int(os.environ.get('REMEDIATION_MAX_TIMEOUT_SECONDS', '900'))
+        )
+
+    def execute(self, actions: List[RemediationAction], deadline=None) -> List[Dict[str, Any]]:
+        """
+        Run actions and wait for them, within the invocation deadline.
+
+        Args:
+            actions: Actions to run; ``depends_on`` delays an action until its dependencies succeed
+            deadline: Invocation deadline; actions still running when it passes are left running
+                and reported as in progress
+
+        Returns:
+            One result per action, in the order given
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        pending = list(actions)
+        ids = {action.action_id for action in actions}
+        running_ssm: Dict[str, Any] = {}        # execution ID -> (action, started, timeout at)
+        running_lambda: Dict[Any, Any] = {}     # future -> (action, started, timeout at)
+        poll_interval = self.poll_initial_seconds
+        next_poll = 0.0
+
+        # Not a context manager: timed-out invocations must not hold up the handler. A timed-out
+        # invocation keeps its thread until the call returns, so there is one thread per Lambda
+        # action and the cap on running actions is enforced above the pool, not by its size
+        pool = ThreadPoolExecutor(max(1, sum(1 for action in actions if action.kind == LAMBDA)))
+        try:
+            while pending or running_ssm or running_lambda:
+                now = time.monotonic()
+
+                if deadline is not None and deadline.expired():
+                    self._abandon(running_ssm, running_lambda, pending, results, now)
+                    break
+
+                # Start every ready action while there is capacity
+                for action in list(pending):
+                    if len(running_ssm) + len(running_lambda) >= self.max_concurrency:
+                        break
+                    unmet = [d for d in action.depends_on if d in ids and results.get(d, {}).get('status') != SUCCEEDED]
+                    if any(d in results for d in unmet):
+                        pending.remove(action)
+                        results[action.action_id] = self._result(action, SKIPPED, now, error='dependency did not succeed')
+                    elif not unmet:
+                        pending.remove(action)
+                        if action.kind == SSM_AUTOMATION:
+                            # Backoff restarts for each new execution
+                            next_poll, poll_interval = now + self.poll_initial_seconds, self.poll_initial_seconds
+                        self._start(action, pool, now, running_ssm, running_lambda, results)
+
+                if running_ssm and now >= next_poll:
+                    self._poll_ssm(running_ssm, results, now)
+                    next_poll = now + poll_interval
+                    poll_interval = min(poll_interval * 2, self.poll_max_seconds)
+
+                self._expire_lambda(running_lambda, results, now)
+
+                if not (running_ssm or running_lambda):
+                    if pending and not any(self._ready(a, ids, results) for a in pending):
+                        # Dependencies that can never be met (unknown or cyclic)
+                        for action in pending:
+                            results[action.action_id] = self._result(action, SKIPPED, now, error='unresolvable dependencies')
+                        pending = []
+                    continue
+
+                wake_at = [next_poll] if running_ssm else []
+                wake_at.extend(timeout_at for _, _, timeout_at in running_lambda.values())
+                wait_seconds = max(0.0, min(wake_at) - time.monotonic())
+                if deadline is not None:
+                    wait_seconds = min(wait_seconds, max(0.0, deadline.remaining_ms() / 1000))
+
+                if running_lambda:
+                    done, _ = wait(list(running_lambda), timeout=wait_seconds, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._finish_lambda(future, running_lambda.pop(future), results)
+                else:
+                    time.sleep(wait_seconds)
+        finally:
+            pool.shutdown(wait=False)
+
+        return [results[action.action_id] for action in actions if action.action_id in results]
+
+    @staticmethod
+    def _ready(action: RemediationAction, ids, results) -> bool:
+        return all(results.get(d, {}).get('status') == SUCCEEDED for d in action.depends_on if d in ids)
+
+    @staticmethod
+    def _result(action: RemediationAction, status: str, started: float, **extra) -> Dict[str, Any]:
+        return {
+            'id': action.action_id,
+            'type': action.kind,
+            'target': action.target,
+            'status': status,
+            'duration_ms': int((time.monotonic() - started) * 1000),
+            **extra
+        }
+
+    def _start(self, action: RemediationAction, pool, now: float, running_ssm, running_lambda, results) -> None:
+        allowed = self.allowed_documents if action.kind == SSM_AUTOMATION else self.allowed_functions
+        if action.target not in allowed:
+            print(f"Remediation target not allowed, skipping: {action.target}")
+            results[action.action_id] = self._result(action, SKIPPED, now, error='target not on allowlist')
+            return
+
+        timeout_at = now + min(action.timeout_seconds, self.max_timeout_seconds)
+        try:
+            if action.kind == SSM_AUTOMATION:
+                response = self.ssm_client.start_automation_execution(
+                    DocumentName=action.target,
+                    Parameters={k: v if isinstance(v, list) else [str(v)] for k, v in action.parameters.items()}
+                )
+                running_ssm[response['AutomationExecutionId']] = (action, now, timeout_at)
+                print(f"Started SSM automation {action.target}: {response['AutomationExecutionId']}")
+            else:
+                future = pool.submit(
+                    self.lambda_client.invoke,
+                    FunctionName=action.target,
+                    InvocationType='RequestResponse',
+                    Payload=json.dumps(action.parameters).encode('utf-8')
+                )
+                running_lambda[future] = (action, now, timeout_at)
+                print(f"Invoking remediation Lambda {action.target}")
+        except Exception as e:
+            print(f"Error starting remediation {action.action_id}: {str(e)}")
+            results[action.action_id] = self._result(action, FAILED, now, error=str(e))
+
+    def _poll_ssm(self, running_ssm, results, now: float) -> None:
+        """Check every in-flight execution with one describe call per batch of IDs."""
+        execution_ids = list(running_ssm)
+        statuses: Dict[str, Dict[str, Any]] = {}
+
+        for start in range(0, len(execution_ids), DESCRIBE_BATCH_SIZE):
+            batch = execution_ids[start:start + DESCRIBE_BATCH_SIZE]
+            try:
+                response = self.ssm_client.describe_automation_executions(
+                    Filters=[{'Key': 'ExecutionId', 'Values': batch}],
+                    MaxResults=DESCRIBE_BATCH_SIZE
+                )
+            except Exception as e:
+                print(f"Error polling SSM automations: {str(e)}")
+                continue
+            for metadata in response.get('AutomationExecutionMetadataList', []):
+                statuses[metadata['AutomationExecutionId']] = metadata
+
+        for execution_id in execution_ids:
+            action, started, timeout_at = running_ssm[execution_id]
+            status = statuses.get(execution_id, {}).get('AutomationExecutionStatus')
+
+            if status in SSM_SUCCESS:
+                results[action.action_id] = self._result(action, SUCCEEDED, started, execution_id=execution_id)
+            elif status in SSM_FAILURE:
+                results[action.action_id] = self._result(
+                    action, FAILED, started, execution_id=execution_id,
+                    error=statuses[execution_id].get('FailureMessage', status)
+                )
+            elif now >= timeout_at:
+                try:
+                    self.ssm_client.stop_automation_execution(AutomationExecutionId=execution_id, Type='Cancel')
+                except Exception as e:
+                    print(f"Error cancelling SSM automation {execution_id}: {str(e)}")
+                results[action.action_id] = self._result(action, TIMED_OUT, started, execution_id=execution_id)
+            else:
+                continue
+
+            del running_ssm[execution_id]
+            print(f"Remediation {action.action_id}: {results[action.action_id]['status']}")
+
+    def _finish_lambda(self, future, entry, results) -> None:
+        action, started, _ = entry
+        try:
+            response = future.result()
+            payload = response['Payload'].read().decode('utf-8') if 'Payload' in response else ''
+            if response.get('FunctionError'):
+                results[action.action_id] = self._result(action, FAILED, started, error=payload[:1000])
+            else:
+                results[action.action_id] = self._result(action, SUCCEEDED, started, output=payload[:1000])
+        except Exception as e:
+            results[action.action_id] = self._result(action, FAILED, started, error=str(e))
+        print(f"Remediation {action.action_id}: {results[action.action_id]['status']}")
+
+    def _expire_lambda(self, running_lambda, results, now: float) -> None:
+        # A synchronous invocation cannot be cancelled; stop waiting for it
+        for future, (action, started, timeout_at) in list(running_lambda.items()):
+            if now >= timeout_at and not future.done():
+                del running_lambda[future]
+                results[action.action_id] = self._result(action, TIMED_OUT, started)
+                print(f"Remediation {action.action_id}: timed out")
+
+    def _abandon(self, running_ssm, running_lambda, pending, results, now: float) -> None:
+        """Deadline reached: report what is still running and skip what never started."""
+        print("Invocation deadline reached, leaving remaining remediation running")
+        for execution_id, (action, started, _) in running_ssm.items():
+            results[action.action_id] = self._result(action, IN_PROGRESS, started, execution_id=execution_id)
+        for action, started, _ in running_lambda.values():
+            results[action.action_id] = self._result(action, IN_PROGRESS, started)
+        for action in pending:
+            results[action.action_id] = self._result(action, SKIPPED, now, error='invocation deadline reached')
+        running_ssm.clear()
+        running_lambda.clear()
+        pending.clear()
@@ -0,0 +1,232 @@
+"""
+Compiled Rule Engine for Fallback Incident Processing
+
+Loads the declarative rule file (rules.json) once per container and compiles
+it into one Aho-Corasick automaton per text field, so evaluating every rule
+against an incident costs a single pass over the incident text regardless of
+how many rules exist.
+
+Rule format:
+    {
+        "id": "cpu-high",
+        "priority": 200,
+        "match": {
+            "name": ["CPU"],            # any keyword in the alarm name
+            "reason": ["threshold"],    # any keyword in the state reason
+            "logs": ["OutOfMemory"],    # any keyword in the recent logs
+            "region": ["us-east-1"]     # exact region match
+        },
+        "action": "cpu_high_detected",
+        "recommendation": "Consider scaling out or investigating high CPU usage"
+    }
+
+Keywords are case-insensitive substrings. All listed fields must match; a rule
+with no "match" block is a default. The highest priority wins, ties going to
+the rule listed first.
+"""
+
+import json
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Text fields matched by keyword, with the bit each one sets in a rule's mask
+TEXT_FIELDS = {'name': 1, 'reason': 2, 'logs': 4}
+REGION_BIT = 8
+
+
+class Rule:
+    """A single compiled rule."""
+
+    __slots__ = ('id', 'priority', 'order', 'required_mask', 'action', 'recommendation')
+
+    def __init__(self, rule_id: str, priority: int, order: int, required_mask: int,
+                 action: str, recommendation: str):
+        self.id = rule_id
+        self.priority = priority
+        self.order = order
+        self.required_mask = required_mask
+        self.action = action
+        self.recommendation = recommendation
+
+    def rank(self) -> Tuple[int, int]:
+        return (self.priority, -self.order)
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton mapping keywords to the rule indexes that use them."""
+
+    def __init__(self, keywords: Iterable[Tuple[str, int]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Set[int]] = [set()]
+
+        for keyword, rule_index in keywords:
+            node = 0
+            for ch in keyword.upper():
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(set())
+                node = nxt
+            self._out[node].add(rule_index)
+
+        self._build_failure_links()
+        # Outputs are fixed once failure links have been merged in
+        self._outputs = [frozenset(out) for out in self._out]
+        # Transitions resolved through failure links are cached per node, so
+        # warm containers converge on a plain DFA walk of one lookup per char
+        self._delta: List[Dict[str, int]] = [dict(edges) for edges in self._goto]
+
+    def _build_failure_links(self) -> None:
+        # Children of the root fail back to the root
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(ch, 0)
+                self._out[child] |= self._out[self._fail[child]]
+
+    def search(self, text: str) -> Set[int]:
+        """Return the indexes of every rule with a keyword found in text."""
+        delta = self._delta
+        outputs = self._outputs
+        hits: Set[int] = set()
+        node = 0
+
+        for ch in text.upper():
+            nxt = delta[node].get(ch)
+            if nxt is None:
+                nxt = self._resolve(node, ch)
+            node = nxt
+            if outputs[node]:
+                hits |= outputs[node]
+
+        return hits
+
+    def _resolve(self, node: int, ch: str) -> int:
+        state = node
+        while state and ch not in self._goto[state]:
+            state = self._fail[state]
+        nxt = self._goto[state].get(ch, 0)
+        self._delta[node][ch] = nxt
+        return nxt
+
+
+class RuleEngine:
+    """Evaluates all rules against an incident in one pass per field."""
+
+    def __init__(self, rules: List[Dict[str, Any]]):
+        self.rules: List[Rule] = []
+        self._default: Optional[Rule] = None
+        keywords: Dict[str, List[Tuple[str, int]]] = {field: [] for field in TEXT_FIELDS}
+        self._regions: Dict[str, List[int]] = {}
+
+        for order, spec in enumerate(rules):
+            match = spec.get('match', {})
+            required_mask = 0
+
+            for field, bit in TEXT_FIELDS.items():
+                if match.get(field):
+                    required_mask |= bit
+                    keywords[field].extend((keyword, order) for keyword in match[field])
+
+            if match.get('region'):
+                required_mask |= REGION_BIT
+                for region in match['region']:
+                    self._regions.setdefault(region, []).append(order)
+
+            rule = Rule(
+                rule_id=spec['id'],
+                priority=int(spec.get('priority', 0)),
+                order=order,
+                required_mask=required_mask,
+                action=spec['action'],
+                recommendation=spec.get('recommendation', '')
+            )
+            self.rules.append(rule)
+
+            if required_mask == 0 and (self._default is None or rule.rank() > self._default.rank()):
+                self._default = rule
+
+        self._matchers = {
+            field: KeywordMatcher(field_keywords)
+            for field, field_keywords in keywords.items() if field_keywords
+        }
+
+    @classmethod
+    def from_file(cls, path: str) -> 'RuleEngine':
+        """Load and compile a rule file."""
+        with open(path) as f:
+            spec = json.load(f)
+
+        engine = cls(spec['rules'])
+        print(f"Loaded {len(engine.rules)} fallback rules from {path}")
+        return engine
+
+    def evaluate(self, alarm_name: str, reason: str = '', region: str = '',
+                 logs: Optional[List[str]] = None) -> Optional[Rule]:
+        """
+        Find the highest priority rule matching an incident.
+
+        Args:
+            alarm_name: CloudWatch alarm name
+            reason: Alarm state reason text
+            region: AWS region of the alarm
+            logs: Recent log messages
+
+        Returns:
+            Winning rule, or the default rule when nothing else matches
+        """
+        texts = {'name': alarm_name, 'reason': reason, 'logs': '\n'.join(logs) if logs else ''}
+        masks: Dict[int, int] = {}
+
+        for field, matcher in self._matchers.items():
+            bit = TEXT_FIELDS[field]
+            for index in matcher.search(texts[field]):
+                masks[index] = masks.get(index, 0) | bit
+
+        for index in self._regions.get(region, ()):
+            masks[index] = masks.get(index, 0) | REGION_BIT
+
+        best = self._default
+        for index, mask in masks.items():
+            rule = self.rules[index]
+            if mask == rule.required_mask and (best is None or rule.rank() > best.rank()):
+                best = rule
+
+        return best
+
+    def evaluate_context(self, context_data: Dict[str, Any]) -> Optional[Rule]:
+        """Evaluate the rules against an incident context built by the handler."""
+        return self.evaluate(
+            context_data['alarm']['name'],
+            reason=context_data['alarm'].get('reason', ''),
+            region=context_data.get('region', ''),
+            logs=context_data.get('logs')
+        )
+
+    def decide(self, context_data: Dict[str, Any], use_logs: bool = False) -> Dict[str, Any]:
+        """
+        Fallback decision for an incident context, as the handler makes it.
+
+        Log keywords are matched only with use_logs: the handler's log lookup
+        still returns placeholder lines, which would trip log-keyword rules
+        for almost every alarm. Re-analysis uses this too, so its results stay
+        comparable with the live handler.
+
+        Returns:
+            rule_id, action and recommendation
+        """
+        rule = self.evaluate_context(context_data if use_logs else dict(context_data, logs=[]))
+        return {
+            'rule_id': rule.id if rule else None,
+            'action': rule.action if rule else 'generic_alarm',
+            'recommendation': rule.recommendation if rule else 'Manual investigation required'
+        }
@@ -0,0 +1,145 @@
+"""
+Similar Past Incident Index
+
+Incidents are turned into hashed n-gram vectors (signed feature hashing with
+sublinear term frequency and IDF weighting) so that resolved incidents can be
+retrieved by cosine similarity. The index is built offline by
+scripts/build_similarity_index.py and stored in the incident bucket as:
+
+    <prefix>vectors.npy   float32 matrix, one L2-normalised row per incident
+    <prefix>idf.npy       float32 IDF weight per hash bucket
+    <prefix>meta.json     incident id, alarm name and outcome per row
+
+The handler downloads the files to /tmp once per container and memory-maps the
+matrix, so a query is one matrix-vector product over the whole history.
+"""
+
+import json
+import os
+import re
+import zlib
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# A 100k-incident matrix at 128 float32 buckets is ~50 MB, which one
+# memory-bound matrix-vector product scans in about 5 ms
+DEFAULT_DIMENSIONS = 128
+INDEX_FILES = ('vectors.npy', 'idf.npy', 'meta.json')
+
+_TOKEN_RE = re.compile(r'[a-z][a-z0-9]+')
+
+
+def incident_text(alarm_name: str, reason: str = '', logs: Optional[List[str]] = None) -> str:
+    """Build the text an incident is indexed by; the alarm name is counted twice."""
+    parts = [alarm_name, alarm_name, reason]
+    if logs:
+        parts.extend(logs)
+    return ' '.join(parts)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split CamelCase and delimiters into lowercase word tokens."""
+    text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
+    return _TOKEN_RE.findall(text.lower())
+
+
+def hash_features(text: str, dimensions: int = DEFAULT_DIMENSIONS) -> np.ndarray:
+    """
+    Hash word unigrams and bigrams of text into a signed term-frequency vector.
+
+    Args:
+        text: Incident text
+        dimensions: Number of hash buckets
+
+    Returns:
+        float32 vector of length dimensions with sublinear term frequencies
+    """
+    tokens = tokenize(text)
+    grams = tokens + [f'{a} {b}' for a, b in zip(tokens, tokens[1:])]
+
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for gram in grams:
+        h = zlib.crc32(gram.encode())
+        vector[h % dimensions] += 1.0 if h & 0x80000000 else -1.0
+
+    return np.sign(vector) * np.log1p(np.abs(vector))
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalise each row, leaving all-zero rows untouched."""
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+class SimilarityIndex:
+    """Memory-mapped incident vectors with their metadata."""
+
+    def __init__(self, vectors: np.ndarray, idf: np.ndarray, meta: List[Dict[str, Any]]):
+        self.vectors = vectors
+        self.idf = idf
+        self.meta = meta
+        self.dimensions = vectors.shape[1]
+
+    @classmethod
+    def load(cls, directory: str) -> 'SimilarityIndex':
+        """Load an index directory, memory-mapping the vector matrix."""
+        vectors = np.load(os.path.join(directory, 'vectors.npy'), mmap_mode='r')
+        idf = np.load(os.path.join(directory, 'idf.npy'))
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+
+        print(f"Loaded similarity index with {vectors.shape[0]} incidents")
+        return cls(vectors, idf, meta)
+
+    @classmethod
+    def load_from_s3(cls, s3_client, bucket: str, prefix: str,
+                     directory: str = '/tmp/similarity-index') -> Optional['SimilarityIndex']:
+        """
+        Download the index files to local storage and load them.
+
+        Returns:
+            Loaded index, or None if the index has not been built yet
+        """
+        try:
+            os.makedirs(directory, exist_ok=True)
+            for name in INDEX_FILES:
+                path = os.path.join(directory, name)
+                if not os.path.exists(path):
+                    s3_client.download_file(bucket, f"{prefix}{name}", path)
+            return cls.load(directory)
+
+        except Exception as e:
+            print(f"Similarity index not available: {str(e)}")
+            return None
+
+    def vectorize(self, text: str) -> np.ndarray:
+        """Turn incident text into a normalised query vector."""
+        return normalize_rows(hash_features(text, self.dimensions) * self.idf)
+
+    def query(self, text: str, top_k: int = 3, min_score: float = 0.2) -> List[Dict[str, Any]]:
+        """
+        Find the resolved incidents most similar to text.
+
+        Args:
+            text: Incident text built with incident_text()
+            top_k: Number of incidents to return
+            min_score: Minimum cosine similarity to include
+
+        Returns:
+            List of metadata dicts with a 'similarity' score, best first
+        """
+        count = self.vectors.shape[0]
+        if count == 0:
+            return []
+
+        scores = self.vectors @ self.vectorize(text)
+        k = min(top_k, count)
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(scores[top])[::-1]]
+
+        return [
+            {**self.meta[i], 'similarity': round(float(scores[i]), 3)}
+            for i in top if scores[i] >= min_score
+        ]
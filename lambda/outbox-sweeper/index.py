@@ -0,0 +1,106 @@
+"""
+Outbox Sweeper Lambda Function
+
+This function runs every minute and sends the EventBridge events the
+deduplicator recorded in its outbox but could not forward (or, with inline
+forwarding disabled, did not try to). Pending entries are read in sort-key
+order, sent with as few PutEvents calls as possible and deleted in batches
+once EventBridge accepted them, so a backlog after an outage is caught up in
+a handful of calls.
+"""
+
+import json
+import os
+import boto3
+from typing import Dict, Any, List
+
+from shared.outbox import OUTBOX_PARTITION, outbox_entry, put_events
+from shared.tracing import now_ms
+
+# Initialize AWS clients
+dynamodb = boto3.resource('dynamodb')
+events_client = boto3.client('events')
+
+# Environment variables
+INCIDENT_HISTORY_TABLE = os.environ['INCIDENT_HISTORY_TABLE']
+# Entries younger than this may still be forwarded inline by the deduplicator
+OUTBOX_GRACE_MS = int(os.environ.get('OUTBOX_GRACE_MS', '30000'))
+# Most entries sent per run; the rest wait for the next run
+OUTBOX_SWEEP_LIMIT = int(os.environ.get('OUTBOX_SWEEP_LIMIT', '1000'))
+ENVIRONMENT = os.environ.get('ENVIRONMENT', 'dev')
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+
+# Initialize DynamoDB table
+incident_table = dynamodb.Table(INCIDENT_HISTORY_TABLE)
+
+def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
+    """
+    Main Lambda handler for one sweep.
+
+    Args:
+        event: Scheduled event
+        context: Lambda context
+
+    Returns:
+        Dict with processing status
+    """
+    try:
+        pending = load_pending(now_ms() - OUTBOX_GRACE_MS, OUTBOX_SWEEP_LIMIT)
+        if not pending:
+            return {'statusCode': 200, 'body': json.dumps({'message': 'Outbox empty', 'pending': 0})}
+
+        failed = set(put_events(events_client, [outbox_entry(item) for item in pending]))
+        sent = [item for index, item in enumerate(pending) if index not in failed]
+        clear_entries(sent)
+
+        if failed:
+            oldest = min(int(pending[i]['timestamp']) for i in failed)
+            print(f"{len(failed)} outbox entries not accepted, oldest written {now_ms() - oldest}ms ago")
+        print(f"Outbox sweep: {len(sent)} sent, {len(failed)} left pending")
+
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'message': 'Outbox sweep completed',
+                'pending': len(pending),
+                'sent': len(sent),
+                'failed': len(failed)
+            })
+        }
+
+    except Exception as e:
+        print(f"Error sweeping outbox: {str(e)}")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({
+                'message': 'Error sweeping outbox',
+                'error': str(e)
+            })
+        }
+
+def load_pending(written_before: int, limit: int) -> List[Dict[str, Any]]:
+    """Read up to `limit` outbox entries written before the given time, oldest first."""
+    items: List[Dict[str, Any]] = []
+    kwargs = {
+        'KeyConditionExpression': 'incidentId = :outbox AND #ts < :before',
+        'ExpressionAttributeNames': {'#ts': 'timestamp'},
+        'ExpressionAttributeValues': {':outbox': OUTBOX_PARTITION, ':before': written_before}
+    }
+    while len(items) < limit:
+        response = incident_table.query(Limit=limit - len(items), **kwargs)
+        items.extend(response['Items'])
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    return items
+
+def clear_entries(items: List[Dict[str, Any]]) -> None:
+    """Delete sent entries with batched writes."""
+    try:
+        with incident_table.batch_writer() as batch:
+            for item in items:
+                batch.delete_item(Key={'incidentId': OUTBOX_PARTITION, 'timestamp': item['timestamp']})
+
+    except Exception as e:
+        # Left-over entries are sent again next run; the handler's idempotency claim absorbs repeats
+        print(f"Error clearing outbox entries: {str(e)}")
@@ -0,0 +1,236 @@
+"""
+Remediation Verifier Lambda Function
+
+This function runs every minute and checks whether the alarm metrics of
+incidents with remediation in flight have recovered. All tracked incidents
+are fetched together with one batched GetMetricData call per cycle, so the
+cost of a cycle stays flat as the number of incidents grows (one call per
+alarm region). Incidents are marked recovered or regressed, and regressions
+are escalated; alarms in another account, whose metrics this function cannot
+read, are marked unverifiable rather than judged on missing data.
+"""
+
+import json
+import os
+import boto3
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+from shared.metrics import RegionalClients, alarm_metric_queries, alarm_threshold, breaching, get_metric_data
+
+# Initialize AWS clients
+cloudwatch = boto3.client('cloudwatch')
+dynamodb = boto3.resource('dynamodb')
+sns_client = boto3.client('sns')
+sts_client = boto3.client('sts')
+
+# Environment variables
+INCIDENT_HISTORY_TABLE = os.environ['INCIDENT_HISTORY_TABLE']
+ALERT_TOPIC_ARN = os.environ['ALERT_TOPIC_ARN']
+# Consecutive datapoints needed to call a metric recovered, or regressed after recovering
+VERIFY_DATAPOINTS = int(os.environ.get('VERIFY_DATAPOINTS', '3'))
+ENVIRONMENT = os.environ.get('ENVIRONMENT', 'dev')
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+
+# Reserved partition holding one record per incident under verification
+PENDING_PARTITION = 'verification#pending'
+
+# Initialize DynamoDB table
+incident_table = dynamodb.Table(INCIDENT_HISTORY_TABLE)
+
+# CloudWatch clients for the region of each alarm
+cloudwatch_clients = RegionalClients(
+    cloudwatch,
+    lambda region: boto3.client('cloudwatch', region_name=region),
+    lambda: sts_client.get_caller_identity()['Account']
+)
+
+def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
+    """
+    Main Lambda handler for one verification cycle.
+
+    Args:
+        event: Scheduled event
+        context: Lambda context
+
+    Returns:
+        Dict with processing status
+    """
+    try:
+        pending = load_pending()
+        if not pending:
+            return {'statusCode': 200, 'body': json.dumps({'message': 'Nothing to verify', 'pending': 0})}
+
+        now = datetime.now(timezone.utc)
+        series = fetch_series(pending, now)
+
+        outcomes: Dict[str, int] = {}
+        for record in pending:
+            outcome = evaluate(record, series, now)
+            if outcome is not None:
+                apply_outcome(record, outcome, now)
+                outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+        print(f"Verified {len(pending)} incidents: {outcomes}")
+
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'message': 'Verification cycle completed',
+                'pending': len(pending),
+                'outcomes': outcomes
+            })
+        }
+
+    except Exception as e:
+        print(f"Error verifying remediation: {str(e)}")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({
+                'message': 'Error verifying remediation',
+                'error': str(e)
+            })
+        }
+
+def load_pending() -> List[Dict[str, Any]]:
+    """Read every incident under verification from the pending partition."""
+    records = []
+    kwargs = {
+        'KeyConditionExpression': 'incidentId = :pending',
+        'ExpressionAttributeValues': {':pending': PENDING_PARTITION}
+    }
+    while True:
+        response = incident_table.query(**kwargs)
+        records.extend(response['Items'])
+        if 'LastEvaluatedKey' not in response:
+            return records
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def fetch_series(pending: List[Dict[str, Any]], now: datetime) -> Dict[str, Tuple[list, list]]:
+    """
+    Fetch the alarm metrics of all pending incidents, one batched request per region.
+
+    Each record's queries get a unique ID prefix, and the series the alarm
+    evaluates is remembered on the record as '_series'. Records registered
+    before the alarm's region and account were stored are read in this
+    function's region. Records of alarms in another account are flagged
+    '_unreadable' and not queried.
+    """
+    query_groups: Dict[str, List[List[Dict[str, Any]]]] = {}
+    clients = {}
+    for index, record in enumerate(pending):
+        client = cloudwatch_clients.for_alarm(record.get('targetRegion'), record.get('targetAccount'))
+        if client is None:
+            record['_unreadable'] = True
+            continue
+
+        queries, series_id = alarm_metric_queries(json.loads(record['metrics']), f"i{index}_")
+        record['_series'] = series_id
+        if queries:
+            region = record.get('targetRegion') or cloudwatch_clients.home_region
+            clients[region] = client
+            query_groups.setdefault(region, []).append(queries)
+
+    if not query_groups:
+        return {}
+
+    start = datetime.fromtimestamp(min(int(r['registeredAt']) for r in pending) / 1000, timezone.utc)
+    series: Dict[str, Tuple[list, list]] = {}
+    for region, groups in query_groups.items():
+        series.update(get_metric_data(clients[region], groups, start - timedelta(minutes=1), now))
+    return series
+
+def evaluate(record: Dict[str, Any], series: Dict[str, Tuple[list, list]], now: datetime) -> Optional[str]:
+    """
+    Decide the verification outcome for one incident.
+
+    Returns:
+        'recovered' when the metric first has enough healthy datapoints,
+        'regressed' when it breaches again after recovering or never recovers
+        in the window, 'unverified' when no usable data arrived, 'closed' when
+        a recovered incident stays healthy for the whole window,
+        'unverifiable' when the alarm's metrics are in another account, else None
+    """
+    if record.get('_unreadable'):
+        return 'unverifiable'
+
+    registered_at = datetime.fromtimestamp(int(record['registeredAt']) / 1000, timezone.utc)
+    expired = now.timestamp() * 1000 >= int(record['verifyUntil'])
+    threshold, comparison = alarm_threshold(json.loads(record['state']))
+
+    timestamps, values = series.get(record.get('_series'), ([], []))
+    values = [v for t, v in zip(timestamps, values) if t >= registered_at]
+
+    if threshold is None or comparison is None or not values:
+        return 'unverified' if expired else None
+
+    # Streak lengths counted from the newest datapoint
+    healthy = next((i for i, v in enumerate(values) if breaching(v, threshold, comparison)), len(values))
+    breached = next((i for i, v in enumerate(values) if not breaching(v, threshold, comparison)), len(values))
+
+    if record.get('phase') == 'recovered':
+        if breached >= VERIFY_DATAPOINTS:
+            return 'regressed'
+        return 'closed' if expired else None
+
+    if healthy >= VERIFY_DATAPOINTS:
+        return 'recovered'
+    return 'regressed' if expired else None
+
+def apply_outcome(record: Dict[str, Any], outcome: str, now: datetime) -> None:
+    """Mark the incident, escalate regressions, and stop tracking finished incidents."""
+    incident_id = record['targetIncidentId']
+    key = {'incidentId': PENDING_PARTITION, 'timestamp': record['timestamp']}
+
+    try:
+        if outcome == 'recovered':
+            # Keep watching until the window ends in case the metric breaches again
+            incident_table.update_item(
+                Key=key,
+                UpdateExpression='SET phase = :phase',
+                ExpressionAttributeValues={':phase': 'recovered'}
+            )
+        else:
+            incident_table.delete_item(Key=key)
+
+        if outcome != 'closed':
+            update_verification_status(incident_id, outcome, now)
+
+        if outcome in ('regressed', 'unverified'):
+            send_alert(
+                f"Incident {incident_id} ({record.get('targetAlarmName', '')}) {outcome} after remediation; "
+                f"human follow-up needed",
+                'critical' if outcome == 'regressed' else 'medium'
+            )
+
+        print(f"Incident verification: {incident_id} -> {outcome}")
+
+    except Exception as e:
+        print(f"Error applying verification outcome: {str(e)}")
+
+def update_verification_status(incident_id: str, outcome: str, now: datetime) -> None:
+    """Record the verification outcome on the incident's status record, leaving its processing status."""
+    incident_table.update_item(
+        Key={'incidentId': incident_id, 'timestamp': 0},
+        UpdateExpression='SET verification = :outcome, verifiedAt = :verified_at',
+        ExpressionAttributeValues={
+            ':outcome': outcome,
+            ':verified_at': now.isoformat()
+        }
+    )
+
+def send_alert(message: str, severity: str = 'medium') -> None:
+    """Send alert notification via SNS."""
+    try:
+        subject = f"🚨 DevOps Agent Alert ({severity.upper()})"
+
+        sns_client.publish(
+            TopicArn=ALERT_TOPIC_ARN,
+            Message=message,
+            Subject=subject
+        )
+
+        print(f"Alert sent: {message}")
+
+    except Exception as e:
+        print(f"Error sending alert: {str(e)}")
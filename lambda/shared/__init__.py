@@ -0,0 +1,6 @@
+"""
+Shared code for the DevOps agent Lambda functions.
+
+Deployed to both functions as a Lambda layer (python/shared/), so modules are
+imported as ``shared.<module>``.
+"""
@@ -0,0 +1,110 @@
+"""
+Serialize-once Incident Envelope
+
+Carries one alarm event from the deduplicator to the incident handler. The
+alarm event is encoded exactly once; that text is reused for logging, the
+DynamoDB occurrence record and the forwarded EventBridge detail, which is
+assembled around it by string concatenation instead of re-encoding the event.
+On the handler side the detail is parsed once and the received text is kept
+for logging.
+"""
+
+from typing import Any, Dict, Optional, Union
+
+from shared import jsoncodec
+from shared.incident import InvalidEventError
+from shared.tracing import Trace
+
+
+class IncidentEnvelope:
+    """An alarm event plus the metadata forwarded with it."""
+
+    __slots__ = (
+        'incident_id', 'original_event', 'processed_at', 'recorded_at',
+        'forwarded_at', 'trace', 'flapping', 'queued_account', 'queued_slot', '_event_json', '_detail_json'
+    )
+
+    def __init__(self, incident_id: Optional[str], original_event: Dict[str, Any],
+                 event_json: Optional[str] = None, processed_at: Optional[str] = None,
+                 recorded_at: Optional[int] = None, forwarded_at: Optional[int] = None,
+                 trace: Optional[Trace] = None, detail_json: Optional[str] = None,
+                 flapping: Optional[Dict[str, Any]] = None, queued_account: Optional[str] = None,
+                 queued_slot: Optional[int] = None):
+        self.incident_id = incident_id
+        self.original_event = original_event
+        self.processed_at = processed_at
+        self.recorded_at = recorded_at
+        self.forwarded_at = forwarded_at
+        self.trace = trace
+        self.flapping = flapping
+        self.queued_account = queued_account
+        self.queued_slot = queued_slot
+        self._event_json = event_json
+        self._detail_json = detail_json
+
+    @classmethod
+    def from_detail(cls, detail: Union[str, Dict[str, Any]]) -> 'IncidentEnvelope':
+        """
+        Parse a forwarded "New Incident Detected" detail.
+
+        Args:
+            detail: Detail as the JSON text sent by the deduplicator, or already decoded
+
+        Returns:
+            Envelope keeping the received text for reuse
+
+        Raises:
+            InvalidEventError: The detail has no incident ID or original event
+        """
+        if isinstance(detail, str):
+            detail_json = detail
+            detail = jsoncodec.loads(detail)
+        else:
+            detail_json = None
+
+        for key in ('incidentId', 'originalEvent'):
+            if not detail.get(key):
+                raise InvalidEventError(f'detail.{key}', 'is missing')
+
+        return cls(
+            incident_id=detail['incidentId'],
+            original_event=detail['originalEvent'],
+            processed_at=detail.get('processedAt'),
+            recorded_at=detail.get('recordedAt'),
+            forwarded_at=detail.get('forwardedAt'),
+            trace=Trace.from_dict(detail.get('trace')),
+            detail_json=detail_json,
+            flapping=detail.get('flapping'),
+            queued_account=detail.get('queuedAccount'),
+            queued_slot=detail.get('queuedSlot')
+        )
+
+    @property
+    def event_json(self) -> str:
+        """The alarm event as JSON, encoded on first use only."""
+        if self._event_json is None:
+            self._event_json = jsoncodec.dumps(self.original_event)
+        return self._event_json
+
+    @property
+    def detail_json(self) -> str:
+        """The forwarded detail as JSON, with the alarm event spliced in pre-encoded."""
+        if self._detail_json is None:
+            metadata = {
+                'incidentId': self.incident_id,
+                'processedAt': self.processed_at,
+            }
+            if self.trace is not None:
+                metadata['trace'] = self.trace.to_dict()
+                metadata['recordedAt'] = self.recorded_at
+                metadata['forwardedAt'] = self.forwarded_at
+            if self.flapping is not None:
+                metadata['flapping'] = self.flapping
+            if self.queued_account is not None:
+                metadata['queuedAccount'] = self.queued_account
+            if self.queued_slot is not None:
+                metadata['queuedSlot'] = self.queued_slot
+
+            # '{"incidentId":...}' -> '{"originalEvent":<event>,"incidentId":...}'
+            self._detail_json = '{"originalEvent":' + self.event_json + ',' + jsoncodec.dumps(metadata)[1:]
+        return self._detail_json
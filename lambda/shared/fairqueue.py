@@ -0,0 +1,157 @@
+"""
+Per-account Fair Queueing Between the Deduplicator and the Handler
+
+With fair scheduling on, the deduplicator does not forward new incidents
+itself. It writes each one to its account's queue, an outbox partition
+``fairq#<account>``, and the fair-scheduler Lambda dispatches from the queues
+by deficit round-robin (DRR): every round each backlogged account earns
+``quantum * weight`` credit and dispatches one incident per unit of credit,
+so one noisy account gets its weighted share of handler and Bedrock capacity
+rather than all of it.
+
+Handler concurrency is bounded twice: a global in-flight limit and an
+optional cap per account. Every dispatched incident holds a slot record,
+keyed by its queue entry, until the handler releases it on whatever path it
+returns or the slot's lease runs out. The scheduler counts each account's
+live slots rather than keeping a running total, so a release that never
+comes costs one slot for one lease, and a repeated release is harmless.
+"""
+
+from typing import Any, Dict, Optional
+
+from shared.outbox import outbox_entry
+
+QUEUE_PREFIX = 'fairq#'
+
+# Reserved record listing accounts that have queued incidents, one attribute per account
+ACCOUNTS_KEY = {'incidentId': 'fairq#accounts', 'timestamp': 0}
+ACCOUNT_ATTRIBUTE_PREFIX = 'a_'
+
+
+def queue_partition(account: str) -> str:
+    return f'{QUEUE_PREFIX}{account}'
+
+
+def slot_partition(account: str) -> str:
+    """Reserved partition holding the slots of an account's incidents in the handler."""
+    return f'fairq-slot#{account}'
+
+
+def dispatch_entry(item: Dict[str, Any]) -> Dict[str, str]:
+    """PutEvents entry of a queued incident, naming the slot (queue sort key) it holds."""
+    entry = outbox_entry(item)
+    entry['Detail'] = '{"queuedSlot":' + str(int(item['timestamp'])) + ',' + entry['Detail'][1:]
+    return entry
+
+
+def register_account(table, account: str, now_ms: int) -> None:
+    """Mark an account as having queued work (its last enqueue time)."""
+    table.update_item(
+        Key=ACCOUNTS_KEY,
+        UpdateExpression='SET #account = :now',
+        ExpressionAttributeNames={'#account': ACCOUNT_ATTRIBUTE_PREFIX + account},
+        ExpressionAttributeValues={':now': now_ms}
+    )
+
+
+def registered_accounts(item: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """Account -> last enqueue time, from the accounts record."""
+    return {
+        name[len(ACCOUNT_ATTRIBUTE_PREFIX):]: int(value)
+        for name, value in (item or {}).items()
+        if name.startswith(ACCOUNT_ATTRIBUTE_PREFIX)
+    }
+
+
+def release(table, account: str, slot: int) -> None:
+    """Give back the slot an incident held; releasing twice is a no-op."""
+    table.delete_item(Key={'incidentId': slot_partition(account), 'timestamp': slot})
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """Parse 'account=weight,...' (as in FAIR_ACCOUNT_WEIGHTS) into a mapping."""
+    weights = {}
+    for part in spec.split(','):
+        if part.strip():
+            account, _, value = part.partition('=')
+            weights[account.strip()] = float(value)
+    return weights
+
+
+class DeficitRoundRobin:
+    """
+    Deficit round-robin over per-account backlogs with unit-cost incidents.
+
+    Deficits persist between plans while an account stays backlogged, so
+    fractional weights average out over time; an account whose queue empties
+    loses its credit, as in standard DRR.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, default_weight: float = 1.0,
+                 quantum: float = 1.0, caps: Optional[Dict[str, int]] = None, default_cap: Optional[int] = None):
+        if default_weight <= 0 or any(weight <= 0 for weight in (weights or {}).values()):
+            raise ValueError("Fair scheduling weights must be positive")
+        self.weights = weights or {}
+        self.default_weight = default_weight
+        self.quantum = quantum
+        self.caps = caps or {}
+        self.default_cap = default_cap
+        self.deficits: Dict[str, float] = {}
+        self._next = 0
+
+    def weight(self, account: str) -> float:
+        return self.weights.get(account, self.default_weight)
+
+    def cap(self, account: str) -> Optional[int]:
+        return self.caps.get(account, self.default_cap)
+
+    def plan(self, backlog: Dict[str, int], inflight: Dict[str, int], capacity: int) -> Dict[str, int]:
+        """
+        Decide how many incidents each account dispatches now.
+
+        Args:
+            backlog: Account -> queued incidents available to dispatch
+            inflight: Account -> incidents currently in the handler
+            capacity: Free global handler slots
+
+        Returns:
+            Account -> number to dispatch, in queue order
+        """
+        accounts = sorted(backlog)
+        for account in list(self.deficits):
+            if not backlog.get(account):
+                del self.deficits[account]
+
+        dispatch = {account: 0 for account in accounts}
+        if not accounts or capacity <= 0:
+            return {}
+
+        def eligible(account: str) -> bool:
+            cap = self.cap(account)
+            return (dispatch[account] < backlog[account]
+                    and (cap is None or inflight.get(account, 0) + dispatch[account] < cap))
+
+        # Rotate the starting account between plans so ties do not always favour the same one
+        start = self._next % len(accounts)
+        order = accounts[start:] + accounts[:start]
+        self._next += 1
+
+        while capacity > 0:
+            active = [account for account in order if eligible(account)]
+            if not active:
+                break
+            for account in active:
+                self.deficits[account] = self.deficits.get(account, 0.0) + self.quantum * self.weight(account)
+                while self.deficits[account] >= 1 and capacity > 0 and eligible(account):
+                    dispatch[account] += 1
+                    self.deficits[account] -= 1
+                    capacity -= 1
+                if capacity == 0:
+                    break
+
+        for account in accounts:
+            # Credit is only kept while the account still has work waiting
+            if dispatch[account] >= backlog[account]:
+                self.deficits.pop(account, None)
+
+        return {account: count for account, count in dispatch.items() if count}
@@ -0,0 +1,107 @@
+"""
+Validated Alarm Event Record
+
+Both Lambdas check the CloudWatch alarm event once, at the start of the
+handler and before any AWS call, and work from a compact Incident record
+instead of digging into the raw dict. A malformed event is rejected with an
+InvalidEventError naming the offending field, rather than failing halfway
+through processing.
+
+The checks are plain attribute lookups against patterns compiled at import,
+so validating an event takes a few microseconds.
+"""
+
+import re
+from typing import Any, Dict, List
+
+ALARM_STATES = frozenset(('ALARM', 'OK', 'INSUFFICIENT_DATA'))
+
+_ACCOUNT = re.compile(r'\d{12}\Z')
+_REGION = re.compile(r'[a-z]{2}(-[a-z]+)+-\d\Z')
+_MAX_ALARM_NAME = 255
+
+
+class InvalidEventError(ValueError):
+    """The event is not a well-formed CloudWatch alarm state change."""
+
+    def __init__(self, field: str, problem: str):
+        super().__init__(f"Invalid event: {field} {problem}")
+        self.field = field
+        self.problem = problem
+
+
+def _required_str(container: Dict[str, Any], key: str, field: str) -> str:
+    value = container.get(key)
+    if not isinstance(value, str) or not value:
+        raise InvalidEventError(field, 'is missing' if value is None else 'must be a non-empty string')
+    return value
+
+
+def _mapping(container: Dict[str, Any], key: str, field: str) -> Dict[str, Any]:
+    value = container.get(key)
+    if not isinstance(value, dict):
+        raise InvalidEventError(field, 'is missing' if value is None else 'must be an object')
+    return value
+
+
+class Incident:
+    """The fields of an alarm event the Lambdas use, checked and normalized."""
+
+    __slots__ = ('alarm_name', 'state', 'reason', 'state_timestamp', 'region', 'account', 'metrics', 'event')
+
+    def __init__(self, alarm_name: str, state: str, reason: str, state_timestamp: str, region: str,
+                 account: str, metrics: List[Dict[str, Any]], event: Dict[str, Any]):
+        self.alarm_name = alarm_name
+        self.state = state
+        self.reason = reason
+        self.state_timestamp = state_timestamp
+        self.region = region
+        self.account = account
+        self.metrics = metrics
+        # The raw event is kept for sinks that store or forward it whole
+        self.event = event
+
+    @classmethod
+    def from_event(cls, event: Any) -> 'Incident':
+        """
+        Validate a CloudWatch alarm state change event.
+
+        The state is upper-cased; a missing reason, state timestamp or metric
+        list becomes empty.
+
+        Raises:
+            InvalidEventError: A required field is missing or has the wrong type or format
+        """
+        if not isinstance(event, dict):
+            raise InvalidEventError('event', 'must be an object')
+
+        detail = _mapping(event, 'detail', 'detail')
+        state_detail = _mapping(detail, 'state', 'detail.state')
+
+        alarm_name = _required_str(detail, 'alarmName', 'detail.alarmName')
+        if len(alarm_name) > _MAX_ALARM_NAME:
+            raise InvalidEventError('detail.alarmName', f'is longer than {_MAX_ALARM_NAME} characters')
+
+        state = _required_str(state_detail, 'value', 'detail.state.value').upper()
+        if state not in ALARM_STATES:
+            raise InvalidEventError('detail.state.value', f"must be one of {', '.join(sorted(ALARM_STATES))}")
+
+        reason = state_detail.get('reason') or ''
+        state_timestamp = state_detail.get('timestamp') or ''
+        if not isinstance(reason, str) or not isinstance(state_timestamp, str):
+            raise InvalidEventError('detail.state', 'reason and timestamp must be strings')
+
+        region = _required_str(event, 'region', 'region')
+        if not _REGION.match(region):
+            raise InvalidEventError('region', f"is not an AWS region: {region[:32]!r}")
+
+        account = _required_str(event, 'account', 'account')
+        if not _ACCOUNT.match(account):
+            raise InvalidEventError('account', 'must be a 12-digit account ID')
+
+        configuration = detail.get('configuration') or {}
+        metrics = configuration.get('metrics') or [] if isinstance(configuration, dict) else None
+        if not isinstance(metrics, list):
+            raise InvalidEventError('detail.configuration.metrics', 'must be a list')
+
+        return cls(alarm_name, state, reason, state_timestamp, region, account, metrics, event)
@@ -0,0 +1,37 @@
+"""
+JSON encoding with an optional fast backend.
+
+Uses orjson when it is installed (add it to a function's requirements.txt to
+opt in) and falls back to the standard library otherwise. Output is always
+compact, so both backends produce interchangeable documents.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    BACKEND = 'orjson'
+
+    def dumps_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode('utf-8')
+
+    loads = orjson.loads
+else:
+    BACKEND = 'json'
+    _encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False)
+
+    def dumps(obj: Any) -> str:
+        return _encoder.encode(obj)
+
+    def dumps_bytes(obj: Any) -> bytes:
+        return _encoder.encode(obj).encode('utf-8')
+
+    loads = json.loads
@@ -0,0 +1,203 @@
+"""
+CloudWatch Metric Queries for Alarm Events
+
+Turns the metric definition carried in a CloudWatch alarm state change event
+into GetMetricData queries, so many alarms can be fetched together in one
+batched call, and recovers the alarm threshold and comparison from the
+event's state reason.
+
+Metrics are read in the region of the alarm they belong to. Alarms from
+another account (delivered through a cross-account event bus) cannot be read
+with the function's own credentials; callers get no client for them and
+report them as such instead of treating the missing data as a verdict.
+"""
+
+import json
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# GetMetricData accepts at most 500 queries per call
+MAX_QUERIES_PER_CALL = 500
+
+COMPARISONS = {
+    'greater than or equal to': 'GreaterThanOrEqualToThreshold',
+    'greater than': 'GreaterThanThreshold',
+    'less than or equal to': 'LessThanOrEqualToThreshold',
+    'less than': 'LessThanThreshold',
+}
+COMPARISON_PATTERN = re.compile(
+    r'(greater than or equal to|greater than|less than or equal to|less than) the threshold'
+)
+QUERY_ID_TOKEN = re.compile(r'\b[a-z][a-zA-Z0-9_]*\b')
+
+
+def alarm_metric_queries(metrics: List[Dict[str, Any]], prefix: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Convert an alarm event's configuration.metrics into GetMetricData queries.
+
+    Query IDs are prefixed so queries for many alarms can share one request;
+    metric math expressions are rewritten to the prefixed IDs.
+
+    Args:
+        metrics: 'configuration.metrics' from the alarm event
+        prefix: Unique prefix per alarm, starting with a lowercase letter
+
+    Returns:
+        (queries, ID of the series the alarm evaluates), or ([], None) if unsupported
+    """
+    ids = {metric['id'] for metric in metrics if 'id' in metric}
+    queries = []
+    returned = None
+
+    for metric in metrics:
+        query_id = f"{prefix}{metric.get('id', 'm')}"
+        query: Dict[str, Any] = {'Id': query_id, 'ReturnData': bool(metric.get('returnData', True))}
+
+        if 'metricStat' in metric:
+            stat = metric['metricStat']
+            query['MetricStat'] = {
+                'Metric': {
+                    'Namespace': stat['metric']['namespace'],
+                    'MetricName': stat['metric']['name'],
+                    'Dimensions': [
+                        {'Name': name, 'Value': str(value)}
+                        for name, value in stat['metric'].get('dimensions', {}).items()
+                    ]
+                },
+                'Period': int(stat['period']),
+                'Stat': stat['stat']
+            }
+        elif 'expression' in metric:
+            query['Expression'] = QUERY_ID_TOKEN.sub(
+                lambda m: prefix + m.group(0) if m.group(0) in ids else m.group(0),
+                metric['expression']
+            )
+        else:
+            return [], None
+
+        if query['ReturnData']:
+            returned = query_id
+        queries.append(query)
+
+    return queries, returned
+
+
+def alarm_threshold(state: Dict[str, Any]) -> Tuple[Optional[float], Optional[str]]:
+    """
+    Threshold and comparison operator of an alarm, from its state reason.
+
+    Args:
+        state: 'detail.state' from the alarm event (reason and reasonData)
+
+    Returns:
+        (threshold, comparison operator name), with None for what cannot be determined
+    """
+    threshold = None
+    try:
+        threshold = float(json.loads(state.get('reasonData') or '{}')['threshold'])
+    except (ValueError, KeyError, TypeError):
+        pass
+
+    match = COMPARISON_PATTERN.search(state.get('reason', ''))
+    return threshold, COMPARISONS[match.group(1)] if match else None
+
+
+def breaching(value: float, threshold: float, comparison: str) -> bool:
+    """Whether a datapoint is on the alarm side of the threshold."""
+    if comparison == 'GreaterThanOrEqualToThreshold':
+        return value >= threshold
+    if comparison == 'GreaterThanThreshold':
+        return value > threshold
+    if comparison == 'LessThanOrEqualToThreshold':
+        return value <= threshold
+    return value < threshold
+
+
+def pack_queries(query_groups: List[List[Dict[str, Any]]]) -> List[List[Dict[str, Any]]]:
+    """Pack per-alarm query groups into requests of at most 500 queries, never splitting a group."""
+    requests: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+
+    for group in query_groups:
+        if current and len(current) + len(group) > MAX_QUERIES_PER_CALL:
+            requests.append(current)
+            current = []
+        current.extend(group)
+
+    if current:
+        requests.append(current)
+    return requests
+
+
+class RegionalClients:
+    """CloudWatch clients per alarm region, created on first use and kept for the container."""
+
+    def __init__(self, home_client, make_client: Callable[[str], Any], account_id: Callable[[], str]):
+        self.home_region = home_client.meta.region_name
+        self.make_client = make_client
+        self.account_id = account_id
+        self._account: Optional[str] = None
+        self._clients: Dict[str, Any] = {self.home_region: home_client}
+        self._lock = threading.Lock()
+
+    def own_account(self) -> Optional[str]:
+        """The function's account ID, looked up once; None while the lookup fails."""
+        if self._account is None:
+            try:
+                self._account = self.account_id()
+            except Exception as e:
+                print(f"Error looking up own account: {str(e)}")
+        return self._account
+
+    def for_alarm(self, region: Optional[str], account: Optional[str]):
+        """
+        Client that can read an alarm's metrics.
+
+        Returns:
+            Client for the alarm's region, or None for an alarm in another account
+        """
+        own_account = self.own_account()
+        if account and own_account and account != own_account:
+            return None
+
+        region = region or self.home_region
+        with self._lock:
+            if region not in self._clients:
+                self._clients[region] = self.make_client(region)
+            return self._clients[region]
+
+
+def get_metric_data(cloudwatch_client, query_groups: List[List[Dict[str, Any]]], start, end) -> Dict[str, Tuple[list, list]]:
+    """
+    Fetch the queries of many alarms with as few GetMetricData calls as possible.
+
+    Args:
+        cloudwatch_client: boto3 CloudWatch client
+        query_groups: Queries per alarm, with IDs unique across all groups
+        start: Start time (datetime)
+        end: End time (datetime)
+
+    Returns:
+        Query ID -> (timestamps, values), newest first
+    """
+    series: Dict[str, Tuple[list, list]] = {}
+
+    for queries in pack_queries(query_groups):
+        kwargs = {
+            'MetricDataQueries': queries,
+            'StartTime': start,
+            'EndTime': end,
+            'ScanBy': 'TimestampDescending'
+        }
+        while True:
+            response = cloudwatch_client.get_metric_data(**kwargs)
+            for result in response['MetricDataResults']:
+                timestamps, values = series.setdefault(result['Id'], ([], []))
+                timestamps.extend(result['Timestamps'])
+                values.extend(result['Values'])
+            if not response.get('NextToken'):
+                break
+            kwargs['NextToken'] = response['NextToken']
+
+    return series
@@ -0,0 +1,95 @@
+"""
+Transactional Outbox for Forwarded Events
+
+The deduplicator writes each incident record together with an outbox entry
+holding the EventBridge event that announces it, in one DynamoDB
+transaction. The event is then sent inline when possible, and the
+outbox-sweeper Lambda sends whatever is still pending in bulk, so a failed
+forward is retried instead of being lost behind the dedup record.
+
+Outbox entries live in one reserved partition, sorted by the time they were
+written, and carry no 'alarmName' or 'status' so history exports skip them.
+"""
+
+from typing import Any, Dict, List
+
+OUTBOX_PARTITION = 'outbox#pending'
+
+# PutEvents accepts at most 10 entries and 256 KB per call
+MAX_ENTRIES_PER_CALL = 10
+MAX_BYTES_PER_CALL = 256 * 1024
+
+
+def outbox_item(incident_id: str, entry: Dict[str, str], written_at: int, ttl_seconds: int = 7 * 86400,
+                partition: str = OUTBOX_PARTITION) -> Dict[str, Any]:
+    """
+    Outbox record for one pending EventBridge entry.
+
+    Args:
+        incident_id: Incident the entry announces
+        entry: PutEvents entry (Source, DetailType, Detail)
+        written_at: Sort key, epoch milliseconds
+        ttl_seconds: How long an undeliverable entry is kept
+        partition: Outbox partition; fair scheduling keeps one queue per account
+    """
+    return {
+        'incidentId': partition,
+        'timestamp': written_at,
+        'targetIncidentId': incident_id,
+        'source': entry['Source'],
+        'detailType': entry['DetailType'],
+        'detail': entry['Detail'],
+        'ttl': written_at // 1000 + ttl_seconds
+    }
+
+
+def outbox_entry(item: Dict[str, Any]) -> Dict[str, str]:
+    """PutEvents entry stored in an outbox record."""
+    return {'Source': item['source'], 'DetailType': item['detailType'], 'Detail': item['detail']}
+
+
+def entry_size(entry: Dict[str, str]) -> int:
+    # EventBridge counts the UTF-8 bytes of Source, DetailType and Detail, plus a fixed 14 for Time
+    return sum(len(entry[field].encode('utf-8')) for field in ('Source', 'DetailType', 'Detail')) + 14
+
+
+def pack_entries(entries: List[Dict[str, str]]) -> List[List[int]]:
+    """Group entry indexes into PutEvents calls within the count and size limits."""
+    calls: List[List[int]] = []
+    current: List[int] = []
+    size = 0
+
+    for index, entry in enumerate(entries):
+        entry_bytes = entry_size(entry)
+        if current and (len(current) == MAX_ENTRIES_PER_CALL or size + entry_bytes > MAX_BYTES_PER_CALL):
+            calls.append(current)
+            current, size = [], 0
+        current.append(index)
+        size += entry_bytes
+
+    if current:
+        calls.append(current)
+    return calls
+
+
+def put_events(events_client, entries: List[Dict[str, str]]) -> List[int]:
+    """
+    Send entries with as few PutEvents calls as possible.
+
+    Returns:
+        Indexes of the entries EventBridge did not accept
+    """
+    failed: List[int] = []
+
+    for indexes in pack_entries(entries):
+        try:
+            response = events_client.put_events(Entries=[entries[i] for i in indexes])
+        except Exception as e:
+            print(f"Error sending {len(indexes)} events: {str(e)}")
+            failed.extend(indexes)
+            continue
+        if response.get('FailedEntryCount'):
+            # Result entries are in request order; failed ones carry an ErrorCode
+            failed.extend(i for i, result in zip(indexes, response['Entries']) if result.get('ErrorCode'))
+
+    return failed
@@ -0,0 +1,353 @@
+"""
+Read-side Incident Status Queries
+
+Answers "what is the state of this incident" and "which incidents are open"
+for dashboards and the CLI without handing out raw table access.
+
+    get_incident    status record, processing result and a timeline of
+                    occurrences, correlated alarms and verification, from one
+                    GetItem and two small Queries with projections
+    list_incidents  incidents seen in the last hours, newest first, filtered
+                    by status, account, region or alarm name prefix, one page
+                    at a time with an opaque cursor
+
+The table has no secondary index, so the deduplicator keeps its own listing
+index: one small entry per incident and UTC hour it was recorded in, under a
+reserved partition per hour (status-index#YYYY-MM-DDTHH). Listing queries the
+hours of the listing window in parallel, batch-reads the status records of
+the incidents found, and keeps that snapshot for a few seconds; every filter
+and page is then served from memory. Incident responses are cached the same
+way, so many operators polling during an outage cost one set of reads per
+container and cache period, not one per request, and never a table scan.
+"""
+
+import base64
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+STATUS_PROJECTION = '#status, updatedAt, #result, verification, verifiedAt, #lifecycle, lifecycleAt, resolvedAt'
+OCCURRENCE_PROJECTION = '#ts, alarmName, alarmState, #region, account, createdAt, latencyMs'
+MEMBER_PROJECTION = '#ts, memberId, memberAlarm, memberState'
+INDEX_PROJECTION = 'targetIncidentId, targetAlarmName, #region, account, lastSeen, occurrences'
+LIST_STATUS_PROJECTION = 'incidentId, #status, updatedAt'
+
+INDEX_PREFIX = 'status-index#'
+# Kept a week so the history compactor can re-export recent days
+INDEX_TTL_SECONDS = 7 * 86400
+
+MAX_PAGE_SIZE = 200
+HOUR_MS = 3600 * 1000
+
+
+class ResponseCache:
+    """Small per-container cache whose entries expire after a fixed time."""
+
+    def __init__(self, ttl_seconds: float = 10.0, max_entries: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[Any, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key: Any, load: Callable[[], Any]) -> Any:
+        """Return the cached value for a key, loading and storing it when missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        value = load()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+            self._entries[key] = (now + self.ttl_seconds, value)
+        return value
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Opaque cursor pointing just past a listed row."""
+    position = json.dumps([row['lastSeen'], row['incidentId']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    try:
+        last_seen, incident_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return int(last_seen), str(incident_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def index_bucket(epoch_ms: int) -> str:
+    """Listing index partition of the UTC hour containing a time."""
+    return INDEX_PREFIX + datetime.fromtimestamp(epoch_ms / 1000, tz=timezone.utc).strftime('%Y-%m-%dT%H')
+
+
+def index_occurrence(table, incident_id: str, recorded_ms: int, alarm_name: str,
+                     region: Optional[str], account: Optional[str]) -> None:
+    """
+    Count a recorded occurrence in its hour's listing index entry.
+
+    Entries are keyed by the incident fingerprint read as a hex number, so
+    each incident has one entry per hour. They carry no 'alarmName' or
+    'status' so history exports skip them.
+    """
+    table.update_item(
+        Key={'incidentId': index_bucket(recorded_ms), 'timestamp': int(incident_id, 16)},
+        UpdateExpression='SET targetIncidentId = :id, targetAlarmName = :alarm, #region = :region, '
+                         'account = :account, lastSeen = :seen, #ttl = :ttl ADD occurrences :one',
+        ExpressionAttributeNames={'#region': 'region', '#ttl': 'ttl'},
+        ExpressionAttributeValues={
+            ':id': incident_id,
+            ':alarm': alarm_name,
+            ':region': region,
+            ':account': account,
+            ':seen': recorded_ms,
+            ':ttl': recorded_ms // 1000 + INDEX_TTL_SECONDS,
+            ':one': 1
+        }
+    )
+
+
+def iso_ms(value: Optional[str]) -> Optional[int]:
+    """Epoch milliseconds of a stored UTC ISO time (written without an offset)."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return int((parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)).timestamp() * 1000)
+
+
+def parse_result(value: Optional[str]) -> Any:
+    """Decode a stored processing result; unreadable results are returned as text."""
+    if not value:
+        return None
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+class StatusReader:
+    """Cached incident status and listing queries over the incident history table."""
+
+    def __init__(self, table, cache_seconds: float = 10.0, list_window_hours: int = 24,
+                 page_size: int = 50, timeline_limit: int = 20, query_workers: int = 8):
+        self.table = table
+        self.cache = ResponseCache(cache_seconds)
+        self.list_window_hours = list_window_hours
+        self.page_size = page_size
+        self.timeline_limit = timeline_limit
+        self.query_workers = query_workers
+
+    @classmethod
+    def from_env(cls, table) -> 'StatusReader':
+        """Build from STATUS_* environment variables."""
+        return cls(
+            table=table,
+            cache_seconds=float(os.environ.get('STATUS_CACHE_SECONDS', '10')),
+            list_window_hours=int(os.environ.get('STATUS_LIST_WINDOW_HOURS', '24')),
+            page_size=int(os.environ.get('STATUS_PAGE_SIZE', '50')),
+            timeline_limit=int(os.environ.get('STATUS_TIMELINE_LIMIT', '20')),
+            query_workers=int(os.environ.get('STATUS_QUERY_WORKERS', '8'))
+        )
+
+    def get_incident(self, incident_id: str, include_trace: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Status, result and timeline of one incident.
+
+        Args:
+            incident_id: Incident fingerprint ID
+            include_trace: Add the latency trace of each listed occurrence
+
+        Returns:
+            Incident view, or None if the incident is unknown
+        """
+        if not incident_id or '#' in incident_id:
+            raise ValueError("Invalid incident ID")
+        return self.cache.get_or_load(('incident', incident_id, include_trace),
+                                      lambda: self._load_incident(incident_id, include_trace))
+
+    def _load_incident(self, incident_id: str, include_trace: bool) -> Optional[Dict[str, Any]]:
+        status = self.table.get_item(
+            Key={'incidentId': incident_id, 'timestamp': 0},
+            ProjectionExpression=STATUS_PROJECTION,
+            ExpressionAttributeNames={'#status': 'status', '#result': 'result', '#lifecycle': 'lifecycle'}
+        ).get('Item')
+
+        occurrences = self.table.query(
+            KeyConditionExpression='incidentId = :id AND #ts > :zero',
+            ProjectionExpression=OCCURRENCE_PROJECTION + (', #trace' if include_trace else ''),
+            ExpressionAttributeNames={'#ts': 'timestamp', '#region': 'region',
+                                      **({'#trace': 'trace'} if include_trace else {})},
+            ExpressionAttributeValues={':id': incident_id, ':zero': 0},
+            ScanIndexForward=False,
+            Limit=self.timeline_limit
+        )['Items']
+
+        if status is None and not occurrences:
+            return None
+
+        members = self.table.query(
+            KeyConditionExpression='incidentId = :members',
+            ProjectionExpression=MEMBER_PROJECTION,
+            ExpressionAttributeNames={'#ts': 'timestamp'},
+            ExpressionAttributeValues={':members': f'corr-members#{incident_id}'},
+            ScanIndexForward=False,
+            Limit=self.timeline_limit
+        )['Items']
+
+        timeline: List[Dict[str, Any]] = []
+        for item in occurrences:
+            entry = {'at': int(item['timestamp']), 'event': 'occurred', 'alarmState': item.get('alarmState')}
+            if 'latencyMs' in item:
+                entry['latencyMs'] = int(item['latencyMs'])
+            if include_trace and 'trace' in item:
+                entry['trace'] = json.loads(item['trace'])
+            timeline.append(entry)
+        for item in members:
+            timeline.append({'at': int(item['timestamp']), 'event': 'correlated', 'incidentId': item['memberId'],
+                             'alarm': item.get('memberAlarm'), 'alarmState': item.get('memberState')})
+
+        status = status or {}
+        if iso_ms(status.get('updatedAt')):
+            timeline.append({'at': iso_ms(status['updatedAt']), 'event': 'status', 'status': status.get('status')})
+        if iso_ms(status.get('lifecycleAt')):
+            timeline.append({'at': iso_ms(status['lifecycleAt']), 'event': status.get('lifecycle')})
+        if iso_ms(status.get('verifiedAt')):
+            timeline.append({'at': iso_ms(status['verifiedAt']), 'event': 'verified',
+                             'outcome': status.get('verification')})
+        timeline.sort(key=lambda entry: entry['at'])
+
+        latest = occurrences[0] if occurrences else {}
+        return {
+            'incidentId': incident_id,
+            'alarmName': latest.get('alarmName'),
+            'region': latest.get('region'),
+            'account': latest.get('account'),
+            'status': status.get('status', 'new' if occurrences else None),
+            'updatedAt': status.get('updatedAt'),
+            # Processing finished vs the alarm returning to OK (what MTTR measures)
+            'completedAt': status.get('updatedAt') if status.get('status') == 'completed' else None,
+            'lifecycle': status.get('lifecycle'),
+            'resolvedAt': status.get('resolvedAt'),
+            'verification': status.get('verification'),
+            'verifiedAt': status.get('verifiedAt'),
+            'result': parse_result(status.get('result')),
+            'timeline': timeline
+        }
+
+    def list_incidents(self, status: Optional[str] = None, account: Optional[str] = None,
+                       region: Optional[str] = None, alarm_prefix: Optional[str] = None,
+                       hours: Optional[float] = None, limit: Optional[int] = None,
+                       cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One page of incidents seen recently, newest first.
+
+        Args:
+            status, account, region: Exact matches
+            alarm_prefix: Alarm name prefix
+            hours: Only incidents seen within this many hours (at most the listing window)
+            limit: Page size, at most MAX_PAGE_SIZE
+            cursor: nextCursor of the previous page
+
+        Returns:
+            {'items': [...], 'nextCursor': str or None}
+        """
+        limit = min(MAX_PAGE_SIZE, max(1, int(limit or self.page_size)))
+        hours = self.list_window_hours if hours is None else float(hours)
+        if not 0 < hours <= self.list_window_hours:
+            raise ValueError(f"hours must be between 0 and {self.list_window_hours}")
+        after = decode_cursor(cursor) if cursor else None
+
+        seen_since = int(time.time() * 1000 - hours * 3600 * 1000)
+        items = []
+        for row in self.cache.get_or_load('snapshot', self._load_snapshot):
+            if row['lastSeen'] < seen_since:
+                # Rows are newest first; nothing later qualifies
+                break
+            if after is not None and (-row['lastSeen'], row['incidentId']) <= (-after[0], after[1]):
+                continue
+            if (status is not None and row['status'] != status) or (account is not None and row['account'] != account) \
+                    or (region is not None and row['region'] != region) \
+                    or (alarm_prefix is not None and not (row['alarmName'] or '').startswith(alarm_prefix)):
+                continue
+            items.append(row)
+            if len(items) > limit:
+                break
+
+        next_cursor = encode_cursor(items[limit - 1]) if len(items) > limit else None
+        return {'items': items[:limit], 'nextCursor': next_cursor}
+
+    def _load_snapshot(self) -> List[Dict[str, Any]]:
+        """Read the listing window's index partitions into one row per incident, newest first."""
+        now = int(time.time() * 1000)
+        window_start = now - self.list_window_hours * HOUR_MS
+        buckets = sorted({index_bucket(at) for at in range(window_start, now, HOUR_MS)} | {index_bucket(now)})
+
+        def query_bucket(bucket: str) -> List[Dict[str, Any]]:
+            items = []
+            kwargs = {
+                'KeyConditionExpression': 'incidentId = :bucket',
+                'ProjectionExpression': INDEX_PROJECTION,
+                'ExpressionAttributeNames': {'#region': 'region'},
+                'ExpressionAttributeValues': {':bucket': bucket}
+            }
+            while True:
+                response = self.table.query(**kwargs)
+                items.extend(response['Items'])
+                if 'LastEvaluatedKey' not in response:
+                    return items
+                kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+        with ThreadPoolExecutor(max(1, min(self.query_workers, len(buckets)))) as executor:
+            items = [item for bucket in executor.map(query_bucket, buckets) for item in bucket]
+
+        rows: Dict[str, Dict[str, Any]] = {}
+        for item in items:
+            incident_id = item['targetIncidentId']
+            last_seen = int(item['lastSeen'])
+            if last_seen < window_start or '#' in incident_id:
+                continue
+            row = rows.get(incident_id)
+            if row is None:
+                rows[incident_id] = row = {'incidentId': incident_id, 'occurrences': 0, 'lastSeen': 0}
+            row['occurrences'] += int(item['occurrences'])
+            if last_seen > row['lastSeen']:
+                row.update(lastSeen=last_seen, alarmName=item.get('targetAlarmName'),
+                           region=item.get('region'), account=item.get('account'))
+
+        statuses = self._load_statuses(list(rows))
+        for incident_id, row in rows.items():
+            status = statuses.get(incident_id, {})
+            row['status'] = status.get('status', 'new')
+            row['updatedAt'] = status.get('updatedAt')
+
+        return sorted(rows.values(), key=lambda row: (-row['lastSeen'], row['incidentId']))
+
+    def _load_statuses(self, incident_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Status records of the given incidents, 100 keys per BatchGetItem call."""
+        statuses: Dict[str, Dict[str, Any]] = {}
+
+        for start in range(0, len(incident_ids), 100):
+            request = {self.table.name: {
+                'Keys': [{'incidentId': incident_id, 'timestamp': 0} for incident_id in incident_ids[start:start + 100]],
+                'ProjectionExpression': LIST_STATUS_PROJECTION,
+                'ExpressionAttributeNames': {'#status': 'status'}
+            }}
+            while request:
+                response = self.table.meta.client.batch_get_item(RequestItems=request)
+                for item in response['Responses'].get(self.table.name, []):
+                    statuses[item['incidentId']] = item
+                request = response.get('UnprocessedKeys') or None
+
+        return statuses
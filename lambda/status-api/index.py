@@ -0,0 +1,93 @@
+"""
+Incident Status API Lambda Function
+
+This function serves read-only incident queries behind API Gateway (REST or
+HTTP API proxy integration) for dashboards and the CLI:
+
+    GET /incidents                 list, with ?status=&account=&region=&alarm=&hours=&limit=&cursor=
+    GET /incidents/{incidentId}    status, result and timeline, with ?trace=true for latency traces
+
+Responses come from the shared status reader's short-lived cache and carry a
+matching Cache-Control header, so pollers and any cache in front of the API
+reuse them too.
+"""
+
+import json
+import os
+import boto3
+from typing import Dict, Any, Optional
+
+from shared.status import StatusReader
+
+# Initialize AWS clients
+dynamodb = boto3.resource('dynamodb')
+
+# Environment variables
+INCIDENT_HISTORY_TABLE = os.environ['INCIDENT_HISTORY_TABLE']
+ENVIRONMENT = os.environ.get('ENVIRONMENT', 'dev')
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+
+# Initialize DynamoDB table
+incident_table = dynamodb.Table(INCIDENT_HISTORY_TABLE)
+
+# Snapshot and response cache live across warm invocations
+status_reader = StatusReader.from_env(incident_table)
+
+def lambda_handler(event: Dict[str, Any], context) -> Dict[str, Any]:
+    """
+    Main Lambda handler for status queries.
+
+    Args:
+        event: API Gateway proxy event
+        context: Lambda context
+
+    Returns:
+        API Gateway proxy response
+    """
+    method = event.get('httpMethod') or event.get('requestContext', {}).get('http', {}).get('method', 'GET')
+    path = (event.get('rawPath') or event.get('path') or '/').rstrip('/')
+    params = event.get('queryStringParameters') or {}
+
+    if method != 'GET':
+        return response(405, {'message': 'Only GET is supported'})
+
+    try:
+        parts = path.split('/')
+        if parts[-1] == 'incidents':
+            return response(200, status_reader.list_incidents(
+                status=params.get('status'),
+                account=params.get('account'),
+                region=params.get('region'),
+                alarm_prefix=params.get('alarm'),
+                hours=float(params['hours']) if params.get('hours') else None,
+                limit=int(params['limit']) if params.get('limit') else None,
+                cursor=params.get('cursor')
+            ))
+
+        if len(parts) >= 2 and parts[-2] == 'incidents':
+            incident = status_reader.get_incident(parts[-1], include_trace=params.get('trace') == 'true')
+            if incident is None:
+                return response(404, {'message': 'Incident not found', 'incidentId': parts[-1]})
+            return response(200, incident)
+
+        return response(404, {'message': f'Unknown path: {path}'})
+
+    except ValueError as e:
+        return response(400, {'message': 'Invalid request', 'error': str(e)})
+
+    except Exception as e:
+        print(f"Error reading incident status: {str(e)}")
+        return response(500, {'message': 'Error reading incident status', 'error': str(e)}, cache=False)
+
+def response(status_code: int, body: Dict[str, Any], cache: Optional[bool] = None) -> Dict[str, Any]:
+    """API Gateway proxy response; successful and client-error responses may be cached briefly."""
+    cacheable = status_code < 500 if cache is None else cache
+    max_age = int(status_reader.cache.ttl_seconds) if cacheable else 0
+    return {
+        'statusCode': status_code,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Cache-Control': f'max-age={max_age}' if max_age else 'no-store'
+        },
+        'body': json.dumps(body, default=str)
+    }
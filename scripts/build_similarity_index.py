@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Build the similar-past-incident index.
+
+Scans the incident history table for resolved incidents, vectorises each one
+with the same hashing used by the incident handler and uploads the index
+files to the incident bucket, where the handler loads them at container start.
+
+Usage:
+    python scripts/build_similarity_index.py --table <history-table> --bucket <incident-bucket>
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from typing import Any, Dict, Iterator, List
+
+import boto3
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda', 'incident-handler'))
+
+from similarity_index import (  # noqa: E402
+    DEFAULT_DIMENSIONS, INDEX_FILES, hash_features, incident_text, normalize_rows
+)
+
+
+def scan_table(table) -> Iterator[Dict[str, Any]]:
+    """Yield every item in the history table."""
+    kwargs: Dict[str, Any] = {}
+    while True:
+        response = table.scan(**kwargs)
+        yield from response['Items']
+        if 'LastEvaluatedKey' not in response:
+            return
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def collect_resolved_incidents(items: Iterator[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Join occurrence records with the status record of each incident.
+
+    Occurrence records carry the alarm and original event; the status record
+    (timestamp 0) carries the final status and result, when processing
+    completed, and when the alarm resolved if it has.
+    """
+    occurrences: Dict[str, Dict[str, Any]] = {}
+    outcomes: Dict[str, Dict[str, Any]] = {}
+
+    for item in items:
+        incident_id = item['incidentId']
+        if int(item['timestamp']) == 0:
+            if item.get('status') == 'completed' and item.get('result'):
+                outcomes[incident_id] = item
+        elif 'alarmName' in item:
+            latest = occurrences.get(incident_id)
+            if latest is None or int(item['timestamp']) > int(latest['timestamp']):
+                occurrences[incident_id] = item
+
+    incidents = []
+    for incident_id, outcome in outcomes.items():
+        occurrence = occurrences.get(incident_id)
+        if occurrence is None:
+            continue
+
+        original_event = json.loads(occurrence.get('originalEvent', '{}'))
+        result = json.loads(outcome['result'])
+        incidents.append({
+            'incidentId': incident_id,
+            'alarmName': occurrence['alarmName'],
+            'reason': original_event.get('detail', {}).get('state', {}).get('reason', ''),
+            'completedAt': outcome.get('updatedAt', ''),
+            'resolvedAt': outcome.get('resolvedAt', ''),
+            'action': result.get('action') or ','.join(result.get('actions_taken', [])),
+            'recommendation': result.get('recommendation', ''),
+        })
+
+    return incidents
+
+
+def build_index(incidents: List[Dict[str, Any]], dimensions: int, output_dir: str) -> None:
+    """Vectorise incidents and write the index files to output_dir."""
+    tf = np.zeros((len(incidents), dimensions), dtype=np.float32)
+    for row, incident in enumerate(incidents):
+        tf[row] = hash_features(incident_text(incident['alarmName'], incident['reason']), dimensions)
+
+    document_frequency = np.count_nonzero(tf, axis=0)
+    idf = (np.log((1 + len(incidents)) / (1 + document_frequency)) + 1).astype(np.float32)
+
+    np.save(os.path.join(output_dir, 'vectors.npy'), normalize_rows(tf * idf))
+    np.save(os.path.join(output_dir, 'idf.npy'), idf)
+
+    meta = [
+        {k: incident[k] for k in ('incidentId', 'alarmName', 'completedAt', 'resolvedAt', 'action', 'recommendation')}
+        for incident in incidents
+    ]
+    with open(os.path.join(output_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, separators=(',', ':'))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Build the similar-incident index')
+    parser.add_argument('--table', required=True, help='Incident history table name')
+    parser.add_argument('--bucket', help='Incident bucket to upload the index to')
+    parser.add_argument('--prefix', default='similarity-index/', help='Key prefix for the index files')
+    parser.add_argument('--dimensions', type=int, default=DEFAULT_DIMENSIONS, help='Hash buckets per vector')
+    parser.add_argument('--output-dir', help='Keep the index in this local directory')
+    args = parser.parse_args()
+
+    table = boto3.resource('dynamodb').Table(args.table)
+    incidents = collect_resolved_incidents(scan_table(table))
+    print(f"Indexing {len(incidents)} resolved incidents")
+
+    output_dir = args.output_dir or tempfile.mkdtemp()
+    os.makedirs(output_dir, exist_ok=True)
+    build_index(incidents, args.dimensions, output_dir)
+
+    if args.bucket:
+        s3_client = boto3.client('s3')
+        for name in INDEX_FILES:
+            s3_client.upload_file(os.path.join(output_dir, name), args.bucket, f"{args.prefix}{name}")
+        print(f"Index uploaded to s3://{args.bucket}/{args.prefix}")
+    else:
+        print(f"Index written to {output_dir}")
+
+
+if __name__ == '__main__':
+    main()
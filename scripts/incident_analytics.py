@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Incident volume and MTTR analytics over the columnar history rollups.
+
+Reads the daily archives written by the history-compactor Lambda from the
+incident bucket (or a local mirror of it) and prints incident counts per day
+or MTTR percentiles, without touching the DynamoDB history table.
+
+Usage:
+    python scripts/incident_analytics.py --bucket <incident-bucket> --start 2026-07-01 --end 2026-09-30 counts --by alarm
+    python scripts/incident_analytics.py --local-dir ./mirror --start 2026-07-01 --end 2026-09-30 mttr --by action
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda', 'history-compactor'))
+
+from rollups import STRING_COLUMNS, load_local, load_s3  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Query incident history rollups')
+    source_group = parser.add_mutually_exclusive_group(required=True)
+    source_group.add_argument('--bucket', help='Incident bucket holding the rollups')
+    source_group.add_argument('--local-dir', help='Local mirror of the incident bucket')
+    parser.add_argument('--cache-dir', default=os.path.expanduser('~/.cache/devops-agent-rollups'),
+                        help='Local cache for rollups downloaded from S3')
+    parser.add_argument('--start', required=True, type=date.fromisoformat, help='First day (YYYY-MM-DD)')
+    parser.add_argument('--end', required=True, type=date.fromisoformat, help='Last day (YYYY-MM-DD)')
+    parser.add_argument('--where', action='append', default=[], metavar='COLUMN=VALUE',
+                        help='Only include rows matching this value, repeatable')
+    parser.add_argument('query', choices=['counts', 'mttr'], help='Incidents per day, or MTTR percentiles')
+    parser.add_argument('--by', default=None, choices=STRING_COLUMNS, help='Column to group by')
+    args = parser.parse_args()
+
+    started = time.time()
+    if args.bucket:
+        import boto3
+        rollup = load_s3(boto3.client('s3'), args.bucket, args.start, args.end, cache_dir=args.cache_dir)
+    else:
+        rollup = load_local(args.local_dir, args.start, args.end)
+
+    filters = dict(condition.split('=', 1) for condition in args.where)
+    if filters:
+        rollup = rollup.where(**filters)
+
+    if args.query == 'counts':
+        result = rollup.counts_per_day(by=args.by or 'alarm')
+    else:
+        result = rollup.mttr_by(by=args.by or 'action')
+
+    print(json.dumps(result, indent=2))
+    print(f"{len(rollup)} incidents in {time.time() - started:.2f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Incident status from the command line.
+
+Uses the same read-side queries as the status API Lambda, directly against
+the incident history table.
+
+Usage:
+    python scripts/incident_status.py --table <history-table> list --status processing --hours 6
+    python scripts/incident_status.py --table <history-table> show 0f3a9c2b7d1e4a56 --trace
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda'))
+
+from shared.status import StatusReader  # noqa: E402
+
+
+def format_ms(value: int) -> str:
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Query incident status')
+    parser.add_argument('--table', required=True, help='Incident history table name')
+    parser.add_argument('--window-hours', type=int, default=24, help='Longest listing window')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = commands.add_parser('list', help='Incidents seen recently, newest first')
+    list_parser.add_argument('--status', help='Only incidents with this status')
+    list_parser.add_argument('--account', help='Only incidents from this account')
+    list_parser.add_argument('--region', help='Only incidents from this region')
+    list_parser.add_argument('--alarm', help='Only alarms whose name starts with this')
+    list_parser.add_argument('--hours', type=float, help='Only incidents seen within this many hours')
+    list_parser.add_argument('--limit', type=int, default=50, help='Page size')
+    list_parser.add_argument('--cursor', help='Continue from a previous page')
+    list_parser.add_argument('--all', action='store_true', help='Follow cursors to the last page')
+    list_parser.add_argument('--json', action='store_true', help='Print pages as JSON')
+
+    show_parser = commands.add_parser('show', help='Status, result and timeline of one incident')
+    show_parser.add_argument('incident_id')
+    show_parser.add_argument('--trace', action='store_true', help='Include latency traces')
+    args = parser.parse_args()
+
+    reader = StatusReader(boto3.resource('dynamodb').Table(args.table), list_window_hours=args.window_hours)
+
+    if args.command == 'show':
+        incident = reader.get_incident(args.incident_id, include_trace=args.trace)
+        if incident is None:
+            print(f"Incident not found: {args.incident_id}")
+            sys.exit(1)
+        print(json.dumps(incident, indent=2, default=str))
+        return
+
+    cursor = args.cursor
+    if not args.json:
+        print(f"{'incident':<18} {'last seen (UTC)':<20} {'seen':>5} {'status':<12} {'account':<13} alarm")
+    while True:
+        page = reader.list_incidents(status=args.status, account=args.account, region=args.region,
+                                     alarm_prefix=args.alarm, hours=args.hours, limit=args.limit, cursor=cursor)
+        if args.json:
+            print(json.dumps(page, default=str))
+        else:
+            for row in page['items']:
+                print(f"{row['incidentId']:<18} {format_ms(row['lastSeen']):<20} {row['occurrences']:>5} "
+                      f"{row['status']:<12} {row['account'] or '':<13} {row['alarmName']}")
+        cursor = page['nextCursor']
+        if not cursor or not args.all:
+            break
+
+    if cursor and not args.json:
+        print(f"More results: --cursor {cursor}")
+
+
+if __name__ == '__main__':
+    main()
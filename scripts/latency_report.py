@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Alarm-to-action latency report.
+
+Reads the traces stored on incident occurrence records for a time range and
+prints end-to-end and per-hop latency percentiles. Waiting spans (ingest:
+alarm to deduplicator, queue: forward to handler start) are summed separately
+from processing spans so queueing delay and processing time can be compared.
+
+Usage:
+    python scripts/latency_report.py --table <history-table> --start 2026-10-01 --end 2026-10-19
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Sequence
+
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda'))
+
+from shared.tracing import Trace  # noqa: E402
+
+WAITING_SPANS = ('ingest', 'queue')
+PERCENTILES = (50, 90, 99)
+
+
+def parse_time(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def scan_traces(table, start_ms: int, end_ms: int, segments: int = 8) -> List[Trace]:
+    """Parallel-scan occurrence records in the range that carry a trace."""
+
+    def scan_segment(segment: int) -> List[Trace]:
+        traces = []
+        kwargs: Dict[str, Any] = {
+            'Segment': segment,
+            'TotalSegments': segments,
+            'FilterExpression': '#ts BETWEEN :start AND :end AND attribute_exists(#trace)',
+            'ProjectionExpression': '#trace',
+            'ExpressionAttributeNames': {'#ts': 'timestamp', '#trace': 'trace'},
+            'ExpressionAttributeValues': {':start': start_ms, ':end': end_ms}
+        }
+        while True:
+            response = table.scan(**kwargs)
+            traces.extend(Trace.from_dict(json.loads(item['trace'])) for item in response['Items'])
+            if 'LastEvaluatedKey' not in response:
+                return traces
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    with ThreadPoolExecutor(segments) as executor:
+        return [trace for traces in executor.map(scan_segment, range(segments)) for trace in traces]
+
+
+def percentile(sorted_values: Sequence[float], p: float) -> float:
+    """Nearest-rank percentile of pre-sorted values."""
+    index = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize(traces: List[Trace]) -> Dict[str, List[float]]:
+    """Collect latency samples per hop, plus end-to-end, waiting and processing totals."""
+    samples: Dict[str, List[float]] = defaultdict(list)
+
+    for trace in traces:
+        waiting = processing = 0
+        for name, _, duration in trace.spans:
+            samples[name].append(duration)
+            if name in WAITING_SPANS:
+                waiting += duration
+            else:
+                processing += duration
+
+        samples['total.waiting'].append(waiting)
+        samples['total.processing'].append(processing)
+        samples['total.end_to_end'].append(trace.end_ms() - trace.origin_ms)
+
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Alarm-to-action latency percentiles')
+    parser.add_argument('--table', required=True, help='Incident history table name')
+    parser.add_argument('--start', required=True, type=parse_time, help='Range start (ISO date or datetime, UTC)')
+    parser.add_argument('--end', type=parse_time, help='Range end (default: now)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    end = args.end or datetime.now(timezone.utc)
+    if args.end and args.end.time() == datetime.min.time():
+        end = args.end + timedelta(days=1)
+
+    table = boto3.resource('dynamodb').Table(args.table)
+    traces = scan_traces(table, int(args.start.timestamp() * 1000), int(end.timestamp() * 1000))
+    samples = summarize(traces)
+
+    report = {}
+    for name, values in sorted(samples.items()):
+        values.sort()
+        report[name] = {'count': len(values), **{f'p{p}': percentile(values, p) for p in PERCENTILES}}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{len(traces)} traces from {args.start.isoformat()} to {end.isoformat()}")
+    print(f"{'hop':<20} {'count':>7} " + ' '.join(f"{f'p{p} ms':>10}" for p in PERCENTILES))
+    for name, row in report.items():
+        print(f"{name:<20} {row['count']:>7} " + ' '.join(f"{row[f'p{p}']:>10.0f}" for p in PERCENTILES))
+
+
+if __name__ == '__main__':
+    main()
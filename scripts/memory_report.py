@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Lambda memory sizing report.
+
+Aggregates the MEMORY_PROFILE lines the incident handler logs with
+MEMORY_PROFILING on, from its CloudWatch log group or from exported log
+files, and prints peak memory percentiles overall and per stage, the
+allocation sites that most often hold the most memory, and a recommended
+memory size: the chosen percentile of peak RSS plus headroom, rounded up to
+a 64 MB step.
+
+Usage:
+    python scripts/memory_report.py --log-group /aws/lambda/<handler> --start 2026-10-01
+    python scripts/memory_report.py --file exported.log --percentile 99.9 --headroom 0.3
+"""
+
+import argparse
+import json
+import math
+import sys
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+import boto3
+
+MARKER = 'MEMORY_PROFILE '
+PERCENTILES = (50, 90, 99)
+
+# Lambda memory is set in 1 MB steps from 128 MB to 10240 MB
+MIN_MEMORY_MB = 128
+MAX_MEMORY_MB = 10240
+MEMORY_STEP_MB = 64
+
+
+def parse_time(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def read_log_group(log_group: str, start_ms: int, end_ms: int) -> Iterator[str]:
+    """Yield profile lines from a CloudWatch log group."""
+    paginator = boto3.client('logs').get_paginator('filter_log_events')
+    for page in paginator.paginate(logGroupName=log_group, startTime=start_ms, endTime=end_ms,
+                                   filterPattern='"MEMORY_PROFILE"'):
+        for event in page['events']:
+            yield event['message']
+
+
+def parse_profiles(lines: Iterable[str]) -> List[Dict[str, Any]]:
+    """Decode profile lines, skipping everything else."""
+    profiles = []
+    for line in lines:
+        position = line.find(MARKER)
+        if position < 0:
+            continue
+        try:
+            profiles.append(json.loads(line[position + len(MARKER):]))
+        except ValueError:
+            continue
+    return profiles
+
+
+def percentile(sorted_values: Sequence[float], p: float) -> float:
+    """Nearest-rank percentile of pre-sorted values."""
+    index = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def recommend(peak_rss_mb: float, headroom: float) -> int:
+    """Memory size covering a peak plus headroom, in Lambda's range and rounded up to the step."""
+    needed = math.ceil(peak_rss_mb * (1 + headroom) / MEMORY_STEP_MB) * MEMORY_STEP_MB
+    return min(MAX_MEMORY_MB, max(MIN_MEMORY_MB, needed))
+
+
+def summarize(profiles: List[Dict[str, Any]], p: float, headroom: float) -> Dict[str, Any]:
+    """Percentiles of peak RSS and stage peaks, top allocation sites and the recommendation."""
+    rss = sorted(profile['rss'] for profile in profiles)
+    stages: Dict[str, List[float]] = defaultdict(list)
+    sites: Dict[str, List[float]] = defaultdict(list)
+    limits = sorted({profile.get('limit') for profile in profiles if profile.get('limit')})
+
+    for profile in profiles:
+        for name, peak_mb, _ in profile.get('s', []):
+            stages[name].append(peak_mb)
+        for site, size_mb, _ in profile.get('top', []):
+            sites[site].append(size_mb)
+
+    def row(values: List[float]) -> Dict[str, float]:
+        values.sort()
+        return {'count': len(values), **{f'p{q:g}': percentile(values, q) for q in (*PERCENTILES, p)},
+                'max': values[-1]}
+
+    top_sites = sorted(sites.items(), key=lambda item: (len(item[1]), max(item[1])), reverse=True)[:10]
+    target = percentile(rss, p)
+
+    return {
+        'invocations': len(profiles),
+        'configured_mb': limits,
+        'rss_mb': row(rss),
+        'stages_mb': {name: row(values) for name, values in sorted(stages.items())},
+        'top_sites': [{'site': site, 'seen': len(sizes), 'max_mb': max(sizes)} for site, sizes in top_sites],
+        'recommendation': {
+            'percentile': p,
+            'peak_rss_mb': target,
+            'headroom': headroom,
+            'memory_mb': recommend(target, headroom)
+        }
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Lambda memory sizing from MEMORY_PROFILE log lines')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--log-group', help='CloudWatch log group of the incident handler')
+    source.add_argument('--file', nargs='+', help="Exported log files ('-' for stdin)")
+    parser.add_argument('--start', type=parse_time, help='Range start for --log-group (ISO date or datetime, UTC)')
+    parser.add_argument('--end', type=parse_time, help='Range end (default: now)')
+    parser.add_argument('--percentile', type=float, default=99.0, help='Peak RSS percentile to size for')
+    parser.add_argument('--headroom', type=float, default=0.2, help='Fraction added on top of the peak')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    if args.log_group:
+        if args.start is None:
+            parser.error('--start is required with --log-group')
+        end = args.end or datetime.now(timezone.utc)
+        lines = read_log_group(args.log_group, int(args.start.timestamp() * 1000), int(end.timestamp() * 1000))
+    else:
+        lines = (line for path in args.file for line in (sys.stdin if path == '-' else open(path)))
+
+    profiles = parse_profiles(lines)
+    if not profiles:
+        print('No MEMORY_PROFILE lines found; is MEMORY_PROFILING enabled on the handler?')
+        sys.exit(1)
+
+    report = summarize(profiles, args.percentile, args.headroom)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    columns = [f'p{q:g}' for q in (*PERCENTILES, args.percentile)] + ['max']
+    columns = list(dict.fromkeys(columns))
+    configured = ', '.join(f'{mb} MB' for mb in report['configured_mb']) or 'unknown'
+    print(f"{report['invocations']} profiled invocations, configured memory {configured}")
+    print(f"{'peak memory (MB)':<20} {'count':>7} " + ' '.join(f'{column:>8}' for column in columns))
+    for name, row in [('rss', report['rss_mb'])] + [(f'stage.{n}', r) for n, r in report['stages_mb'].items()]:
+        print(f"{name:<20} {row['count']:>7} " + ' '.join(f'{row[column]:>8.1f}' for column in columns))
+
+    print('\nTop allocation sites (live at end of invocation)')
+    for site in report['top_sites']:
+        print(f"  {site['site']:<40} seen {site['seen']:>5}x, up to {site['max_mb']:.2f} MB")
+
+    recommendation = report['recommendation']
+    print(f"\nRecommended memory: {recommendation['memory_mb']} MB "
+          f"(p{recommendation['percentile']:g} peak RSS {recommendation['peak_rss_mb']} MB "
+          f"+ {recommendation['headroom']:.0%} headroom)")
+    print('Memory also sets CPU share; check latency_report.py before lowering it on latency-bound stages.')
+
+
+if __name__ == '__main__':
+    main()
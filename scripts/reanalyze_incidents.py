@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Bulk re-analysis of archived incidents.
+
+Re-runs decision logic over every archived incidents/<id>/context.json so the
+outcomes of a new rule file or analyzer can be compared with what happened.
+The object listing is streamed, objects are fetched on a thread pool and
+analysis runs on a process pool, with at most --max-pending batches in memory.
+Results are appended to a JSON Lines file as each batch completes; re-running
+the same command skips incidents already in the output.
+
+Usage:
+    python scripts/reanalyze_incidents.py --bucket <incident-bucket> --output results.jsonl
+    python scripts/reanalyze_incidents.py --local-dir ./archive --rules new-rules.json --output results.jsonl
+    python scripts/reanalyze_incidents.py --local-dir ./archive --analyzer my_module:analyze --output results.jsonl
+
+A custom analyzer is a function taking (incident_id, context_data) and
+returning a JSON-serialisable dict.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+HANDLER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda', 'incident-handler')
+sys.path.insert(0, HANDLER_DIR)
+
+CONTEXT_SUFFIX = '/context.json'
+
+
+class S3Source:
+    """Archived incident contexts in the incident bucket."""
+
+    def __init__(self, bucket: str, prefix: str = 'incidents/'):
+        import boto3
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.s3_client = boto3.client('s3')
+
+    def iter_keys(self) -> Iterator[str]:
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get('Contents', []):
+                if obj['Key'].endswith(CONTEXT_SUFFIX):
+                    yield obj['Key']
+
+    def fetch(self, key: str) -> bytes:
+        return self.s3_client.get_object(Bucket=self.bucket, Key=key)['Body'].read()
+
+
+class LocalSource:
+    """A local directory laid out like the bucket, used as a stand-in for S3."""
+
+    def __init__(self, root: str, prefix: str = 'incidents/'):
+        self.root = root
+        self.prefix = prefix
+
+    def iter_keys(self) -> Iterator[str]:
+        base = os.path.join(self.root, self.prefix)
+        with os.scandir(base) as entries:
+            for entry in entries:
+                if entry.is_dir() and os.path.exists(os.path.join(entry.path, 'context.json')):
+                    yield f"{self.prefix}{entry.name}{CONTEXT_SUFFIX}"
+
+    def fetch(self, key: str) -> bytes:
+        with open(os.path.join(self.root, key), 'rb') as f:
+            return f.read()
+
+
+def incident_id_from_key(key: str) -> str:
+    return key[:-len(CONTEXT_SUFFIX)].rsplit('/', 1)[-1]
+
+
+# Per-process analyzer, set up once by init_worker
+_analyzer: Optional[Callable[[str, Dict[str, Any]], Dict[str, Any]]] = None
+
+
+def init_worker(analyzer_spec: Optional[str], rules_file: str, use_logs: bool = False) -> None:
+    """Load the analyzer once per worker process."""
+    global _analyzer
+
+    if analyzer_spec:
+        module_name, function_name = analyzer_spec.split(':')
+        _analyzer = getattr(importlib.import_module(module_name), function_name)
+        return
+
+    from rule_engine import RuleEngine
+
+    engine = RuleEngine.from_file(rules_file)
+
+    def analyze(incident_id: str, context_data: Dict[str, Any]) -> Dict[str, Any]:
+        # Same decision as the handler's fallback, log gate included
+        return engine.decide(context_data, use_logs=use_logs)
+
+    _analyzer = analyze
+
+
+def analyze_batch(batch: List[Tuple[str, bytes]]) -> List[Dict[str, Any]]:
+    """Parse and analyze a batch of fetched contexts in a worker process."""
+    results = []
+    for key, body in batch:
+        incident_id = incident_id_from_key(key)
+        try:
+            context_data = json.loads(body)
+            results.append({'key': key, 'incidentId': incident_id, 'result': _analyzer(incident_id, context_data)})
+        except Exception as e:
+            results.append({'key': key, 'incidentId': incident_id, 'error': str(e)})
+    return results
+
+
+def load_completed(output_path: str) -> Set[str]:
+    """
+    Read keys already analyzed successfully and drop a torn final line.
+
+    Returns:
+        Set of object keys to skip
+    """
+    completed: Set[str] = set()
+    if not os.path.exists(output_path):
+        return completed
+
+    good_bytes = 0
+    with open(output_path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            good_bytes += len(line)
+            if 'error' not in record:
+                completed.add(record['key'])
+
+    with open(output_path, 'r+b') as f:
+        f.truncate(good_bytes)
+
+    return completed
+
+
+def batched(iterable: Iterator[str], size: int) -> Iterator[List[str]]:
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def fetch_batch(source, fetchers: ThreadPoolExecutor, keys: List[str]) -> List[Tuple[str, bytes]]:
+    """Fetch a batch of objects concurrently, skipping ones that fail to download."""
+    fetched = []
+    futures = [(key, fetchers.submit(source.fetch, key)) for key in keys]
+    for key, future in futures:
+        try:
+            fetched.append((key, future.result()))
+        except Exception as e:
+            print(f"Error fetching {key}: {str(e)}", file=sys.stderr)
+    return fetched
+
+
+def run(source, output_path: str, analyzer_spec: Optional[str], rules_file: str,
+        workers: int, fetch_workers: int, batch_size: int, max_pending: int,
+        use_logs: bool = False) -> Dict[str, int]:
+    """
+    Stream, fetch, analyze and write every incident not already in the output.
+
+    Returns:
+        Counts of analyzed, failed and skipped incidents
+    """
+    completed = load_completed(output_path)
+    stats = {'analyzed': 0, 'failed': 0, 'skipped': 0}
+
+    def pending_keys() -> Iterator[str]:
+        for key in source.iter_keys():
+            if key in completed:
+                stats['skipped'] += 1
+            else:
+                yield key
+
+    def write(out, results: List[Dict[str, Any]]) -> None:
+        for record in results:
+            stats['failed' if 'error' in record else 'analyzed'] += 1
+            out.write(json.dumps(record, separators=(',', ':')) + '\n')
+        out.flush()
+
+    with ThreadPoolExecutor(fetch_workers) as fetchers, \
+            ProcessPoolExecutor(workers, initializer=init_worker, initargs=(analyzer_spec, rules_file, use_logs)) as pool, \
+            open(output_path, 'a') as out:
+        pending = deque()
+
+        for keys in batched(pending_keys(), batch_size):
+            pending.append(pool.submit(analyze_batch, fetch_batch(source, fetchers, keys)))
+            while len(pending) >= max_pending:
+                write(out, pending.popleft().result())
+
+        while pending:
+            write(out, pending.popleft().result())
+
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Re-run decision logic over archived incidents')
+    source_group = parser.add_mutually_exclusive_group(required=True)
+    source_group.add_argument('--bucket', help='Incident bucket to read archived contexts from')
+    source_group.add_argument('--local-dir', help='Local directory laid out like the incident bucket')
+    parser.add_argument('--prefix', default='incidents/', help='Key prefix of archived incidents')
+    parser.add_argument('--output', required=True, help='JSON Lines file to append results to')
+    parser.add_argument('--rules', default=os.path.join(HANDLER_DIR, 'rules.json'), help='Fallback rule file')
+    parser.add_argument('--analyzer', help='Custom analyzer as module:function instead of the rule engine')
+    parser.add_argument('--use-logs', action='store_true',
+                        default=os.environ.get('FALLBACK_RULES_USE_LOGS', 'false').lower() == 'true',
+                        help='Match log-keyword rules, as the handler does with FALLBACK_RULES_USE_LOGS=true')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Analysis processes')
+    parser.add_argument('--fetch-workers', type=int, default=32, help='Concurrent object fetches')
+    parser.add_argument('--batch-size', type=int, default=200, help='Incidents per analysis batch')
+    parser.add_argument('--max-pending', type=int, default=4, help='Batches in flight before writing')
+    args = parser.parse_args()
+
+    if args.bucket:
+        source = S3Source(args.bucket, args.prefix)
+    else:
+        source = LocalSource(args.local_dir, args.prefix)
+
+    started = time.time()
+    stats = run(source, args.output, args.analyzer, args.rules,
+                args.workers, args.fetch_workers, args.batch_size, args.max_pending, args.use_logs)
+    elapsed = time.time() - started
+
+    print(f"Analyzed {stats['analyzed']}, failed {stats['failed']}, "
+          f"skipped {stats['skipped']} already done in {elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main()